@@ -1,25 +1,325 @@
-from fastapi import FastAPI
-from app.services.inference import forecast_batch
-from app.services.optimizer import compute_replenishment
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Optional
 
-app = FastAPI(title="SupplyChain ML API")
+from fastapi import FastAPI, HTTPException, Query, Request
+import orjson
+import pandas as pd
+from fastapi.responses import Response, StreamingResponse
+from starlette.background import BackgroundTask
+
+from app.schemas import (
+    FrontierRequest,
+    FrontierResponse,
+    ForecastRequest,
+    ForecastResponse,
+    InventoryDeltaRequest,
+    InventoryDeltaResponse,
+    NetworkPage,
+    NetworkRequest,
+    NetworkResponse,
+    NumpyORJSONResponse,
+    ReplenishPage,
+    ReplenishRequest,
+    ReplenishResponse,
+)
+from app.services import formats, runs
+from app.services.artifacts import get_store
+from app.services.cache import get_forecast_cache
+from app.services.executor import PoolSaturated, get_pool
+from app.services.inference import (
+    MICROBATCH_ENABLED,
+    STREAM_CHUNK_PAIRS,
+    STREAM_RETRY_MS,
+    MicroBatcher,
+    forecast_arrays,
+    forecast_batch,
+    iter_forecast_chunks,
+)
+from app.services.optimizer import (
+    compute_frontier,
+    compute_multi_echelon,
+    compute_replenishment_frame,
+    push_inventory_delta,
+)
+
+NDJSON = "application/x-ndjson"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # warm load sekali saat startup, lalu pantau perubahan artefak di background
+    store = get_store()
+    store.refresh()
+    store.start()
+    yield
+    store.stop()
+    get_pool().shutdown()
+
+
+app = FastAPI(title="SupplyChain ML API", lifespan=lifespan, default_response_class=NumpyORJSONResponse)
+
+
+async def _guard(awaitable):
+    """Terjemahkan pool penuh menjadi 429 (backpressure)."""
+    try:
+        return await awaitable
+    except PoolSaturated as exc:
+        raise HTTPException(status_code=429, detail=str(exc), headers={"Retry-After": "1"})
+
+
+async def _offload(fn, *args, **kwargs):
+    """Kirim kerja CPU-bound ke worker pool; 429 jika pool sudah penuh."""
+    return await _guard(get_pool().run(fn, *args, **kwargs))
+
+
+async def _pooled_forecast(pairs, horizon, art):
+    return await get_pool().run(forecast_batch, pairs, horizon, artifacts=art)
+
+
+async def _pooled_stream_chunk(pairs, horizon, art):
+    """
+    Chunk stream setelah chunk pertama: status 200 sudah terkirim, jadi saat
+    pool penuh tunggu slot kosong alih-alih memotong stream.
+    """
+    while True:
+        try:
+            return await _pooled_forecast(pairs, horizon, art)
+        except PoolSaturated:
+            await asyncio.sleep(STREAM_RETRY_MS / 1000.0)
+
+
+# opt-in: gabungkan request /forecast kecil yang datang bersamaan
+batcher = MicroBatcher(_pooled_forecast) if MICROBATCH_ENABLED else None
 
 @app.get("/health")
-def health():
-    return {"status": "ok"}
+async def health():
+    return {"status": "ok", "model_version": get_store().version}
+
+@app.get("/cache/stats")
+async def cache_stats():
+    return get_forecast_cache().stats()
+
+@app.get("/workers/stats")
+async def worker_stats():
+    stats = get_pool().stats()
+    if batcher is not None:
+        stats["microbatch"] = batcher.stats()
+    return stats
+
+def _negotiate(request: Request) -> str:
+    fmt = formats.negotiate(request.headers.get("accept"))
+    if fmt != "json" and not formats.ARROW_OK:
+        raise HTTPException(status_code=406, detail="pyarrow tidak terpasang; format kolumnar tidak tersedia")
+    return fmt
+
+
+def _table_response(table, fmt: str) -> Response:
+    body, media_type = formats.encode_table(table, fmt)
+    return Response(content=body, media_type=media_type)
+
+
+def _ndjson(chunk) -> bytes:
+    return b"".join(orjson.dumps(row) + b"\n" for row in chunk)
+
+
+async def _ndjson_lines(first, rest):
+    yield _ndjson(first)
+    async for chunk in rest:
+        yield _ndjson(chunk)
+
+
+@app.post("/forecast", response_model=ForecastResponse)
+async def forecast(req: ForecastRequest, request: Request, stream: bool = False):
+    pairs = req.pairs
+    horizon = req.horizon_weeks
+    art = get_store().current()
+    if stream or NDJSON in request.headers.get("accept", ""):
+        # satu baris JSON per pasangan, dikirim per chunk begitu selesai dihitung.
+        # Semua chunk lewat worker pool; chunk pertama dihitung sebelum header
+        # dikirim sehingga pool yang penuh tetap dibalas 429.
+        first = await _guard(_pooled_forecast(pairs[:STREAM_CHUNK_PAIRS], horizon, art))
+        rest = iter_forecast_chunks(
+            pairs[STREAM_CHUNK_PAIRS:], horizon, _pooled_stream_chunk, artifacts=art, chunk_size=STREAM_CHUNK_PAIRS
+        )
+        return StreamingResponse(
+            _ndjson_lines(first, rest),
+            media_type=NDJSON,
+            headers={"X-Model-Version": art.version, "X-Horizon-Weeks": str(horizon)},
+        )
+    fmt = _negotiate(request)
+    if fmt != "json":
+        keys, fc = await _offload(forecast_arrays, pairs, horizon, artifacts=art)
+        meta = {"model_version": art.version, "horizon_weeks": horizon}
+        return _table_response(formats.forecast_table(keys, fc, meta), fmt)
+    if batcher is not None:
+        preds = await _guard(batcher.submit(pairs, horizon, art))
+    else:
+        # baris forecast tetap np.ndarray; orjson menserialisasi buffer-nya langsung
+        keys, fc = await _offload(forecast_arrays, pairs, horizon, artifacts=art)
+        preds = [{"store_id": sid, "product_id": pid, "forecast": row} for (sid, pid), row in zip(keys, fc)]
+    return NumpyORJSONResponse({"horizon_weeks": horizon, "model_version": art.version, "forecasts": preds})
+
+@app.post("/replenish", response_model=ReplenishResponse)
+async def replenish(req: ReplenishRequest, request: Request, limit: int = Query(runs.PAGE_SIZE, ge=1, le=runs.MAX_PAGE_SIZE)):
+    target_service = req.target_service
+    capacity = req.capacity
+    art = get_store().current()
+    fmt = _negotiate(request)
+    try:
+        df = await _offload(compute_replenishment_frame, target_service=target_service, capacity=capacity, artifacts=art)
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+    meta = {"model_version": art.version, "target_service": target_service, "capacity": capacity}
+    if fmt != "json":
+        # format kolumnar: seluruh rencana order, tidak dipotong per halaman
+        return _table_response(formats.frame_table(df, meta), fmt)
+
+    # simpan seluruh rencana; halaman berikutnya via GET /replenish/{run_id}
+    store = runs.get_run_store()
+    run = store.save(df, {**meta, "kind": "replenish", "created_at": runs.now_iso()})
+    rows, total, next_cursor = runs.page(run.frame, limit=limit)
+    return NumpyORJSONResponse(
+        {
+            "run_id": run.run_id,
+            "target_service": target_service,
+            "capacity": capacity,
+            "model_version": art.version,
+            "total_rows": total,
+            "next_cursor": next_cursor,
+            "orders": formats.records(rows),
+        },
+        background=BackgroundTask(store.persist, run),
+    )
+
+
+def _run_page(run_id: str, kind: str, cursor, limit, store_id=None, product_id=None):
+    """Run tersimpan + satu halaman; 404 jika run tidak ada atau jenisnya lain."""
+    run = runs.get_run_store().get(run_id)
+    # run lama (sebelum ada tag `kind`) selalu hasil /replenish
+    if run is None or run.meta.get("kind", "replenish") != kind:
+        raise HTTPException(status_code=404, detail=f"run {kind} {run_id!r} tidak ditemukan")
+    try:
+        rows, total, next_cursor = runs.page(run.frame, cursor, limit, store_id=store_id, product_id=product_id)
+    except runs.InvalidCursor as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return run, rows, total, next_cursor
+
+
+@app.get("/replenish/{run_id}", response_model=ReplenishPage)
+async def replenish_page(
+    run_id: str,
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(runs.PAGE_SIZE, ge=1, le=runs.MAX_PAGE_SIZE),
+    store_id: Optional[str] = None,
+    product_id: Optional[str] = None,
+):
+    """Halaman rencana order dari run yang tersimpan (tanpa solve ulang)."""
+    fmt = _negotiate(request)
+    run, rows, total, next_cursor = _run_page(run_id, "replenish", cursor, limit, store_id, product_id)
+    if fmt != "json":
+        return _table_response(formats.frame_table(rows, {**run.meta, "total_rows": total, "next_cursor": next_cursor or ""}), fmt)
+    return NumpyORJSONResponse({
+        "run_id": run_id,
+        "model_version": run.meta.get("model_version", ""),
+        "target_service": float(run.meta.get("target_service", "nan")),
+        "capacity": float(run.meta.get("capacity", "nan")),
+        "total_rows": total,
+        "cursor": cursor,
+        "next_cursor": next_cursor,
+        "orders": formats.records(rows),
+    })
+
+
+@app.get("/replenish/network/{run_id}", response_model=NetworkPage)
+async def replenish_network_page(
+    run_id: str,
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: int = Query(runs.PAGE_SIZE, ge=1, le=runs.MAX_PAGE_SIZE),
+    store_id: Optional[str] = None,
+    product_id: Optional[str] = None,
+):
+    """Halaman kiriman DC -> store dari run /replenish/network yang tersimpan."""
+    fmt = _negotiate(request)
+    run, rows, total, next_cursor = _run_page(run_id, "network", cursor, limit, store_id, product_id)
+    if fmt != "json":
+        return _table_response(formats.frame_table(rows, {**run.meta, "total_rows": total, "next_cursor": next_cursor or ""}), fmt)
+    return NumpyORJSONResponse({
+        "run_id": run_id,
+        "model_version": run.meta.get("model_version", ""),
+        "total_rows": total,
+        "cursor": cursor,
+        "next_cursor": next_cursor,
+        "transfers": formats.records(rows),
+    })
+
+
+@app.post("/replenish/frontier", response_model=FrontierResponse)
+async def replenish_frontier(req: FrontierRequest):
+    art = get_store().current()
+    try:
+        df = await _offload(compute_frontier, req.budgets, req.service_levels, artifacts=art)
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+    return NumpyORJSONResponse({"model_version": art.version, "points": formats.records(df)})
+
 
-@app.post("/forecast")
-def forecast(req: dict):
-    pairs = req.get("pairs", [])
-    horizon = int(req.get("horizon_weeks", 8))
-    preds = forecast_batch(pairs, horizon)
-    return {"horizon_weeks": horizon, "forecasts": preds}
+@app.post("/replenish/network", response_model=NetworkResponse)
+async def replenish_network(req: NetworkRequest, limit: int = Query(runs.PAGE_SIZE, ge=1, le=runs.MAX_PAGE_SIZE)):
+    """
+    Rencana multi-echelon supplier -> DC -> store. Order supplier dikembalikan
+    utuh; kiriman DC -> store disimpan sebagai run (halaman berikutnya via
+    GET /replenish/network/{run_id}).
+    """
+    art = get_store().current()
+    lanes = pd.DataFrame([lane.model_dump() for lane in req.lanes]) if req.lanes else None
+    params = req.model_dump(exclude={"lanes"})
+    try:
+        orders, transfers, result = await _offload(compute_multi_echelon, **params, lanes=lanes, artifacts=art)
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
 
-@app.post("/replenish")
-def replenish(req: dict):
-    target_service = float(req.get("target_service", 0.95))
-    capacity = float(req.get("capacity", 50000.0))
-    result = compute_replenishment(target_service=target_service, capacity=capacity)
-    return {"target_service": target_service, "capacity": capacity, "orders": result}
+    store = runs.get_run_store()
+    run = store.save(transfers, {"model_version": art.version, "kind": "network", **params, "created_at": runs.now_iso()})
+    rows, total, next_cursor = runs.page(run.frame, limit=limit)
+    return NumpyORJSONResponse(
+        {
+            "model_version": art.version,
+            "run_id": run.run_id,
+            "status": result.status,
+            "message": result.message,
+            "objective": result.objective,
+            "solve_seconds": result.solve_seconds,
+            "total_rows": total,
+            "next_cursor": next_cursor,
+            "dc_orders": formats.records(orders),
+            "transfers": formats.records(rows),
+        },
+        background=BackgroundTask(store.persist, run),
+    )
 
 
+@app.post("/replenish/inventory", response_model=InventoryDeltaResponse)
+async def replenish_inventory(req: InventoryDeltaRequest):
+    """
+    Push perubahan on_hand/on_order. Rencana /replenish yang sudah dihitung
+    di-update inkremental; delta berlaku sampai snapshot inventory berikutnya.
+    """
+    pool = get_pool()
+    if pool.mode == "process":
+        # state rencana hidup di proses worker masing-masing; delta tidak bisa
+        # dijamin sampai ke worker yang akan melayani /replenish berikutnya
+        raise HTTPException(
+            status_code=409,
+            detail="update inventory inkremental butuh WORKER_POOL=thread (state rencana per proses)",
+        )
+    art = get_store().current()
+    delta = pd.DataFrame([r.model_dump() for r in req.rows])
+    try:
+        # mode thread: worker berbagi `_STATE` dengan proses API
+        stats = await _offload(push_inventory_delta, delta, artifacts=art)
+    except FileNotFoundError as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+    return NumpyORJSONResponse({"model_version": art.version, **stats})
@@ -0,0 +1,196 @@
+"""
+Request/response models untuk FastAPI service.
+
+Body request divalidasi sekali oleh pydantic-core per request. Response
+dikirim lewat `NumpyORJSONResponse` (orjson + OPT_SERIALIZE_NUMPY), jadi model
+response di sini terutama berfungsi sebagai dokumentasi OpenAPI: array NumPy
+dari inference/optimizer diserialisasi langsung tanpa konversi `float(...)`
+per elemen.
+"""
+
+from typing import Any, Dict, List, Optional
+
+import orjson
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+
+class NumpyORJSONResponse(ORJSONResponse):
+    """ORJSONResponse yang juga menerima np.ndarray / numpy scalar."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+
+class Pair(BaseModel):
+    store_id: str = "S001"
+    product_id: str = "P001"
+
+
+class ForecastRequest(BaseModel):
+    horizon_weeks: int = Field(8, ge=1, le=104)
+    pairs: List[Pair] = Field(default_factory=list)
+
+
+class ForecastRow(BaseModel):
+    store_id: str
+    product_id: str
+    forecast: List[float]
+
+
+class ForecastResponse(BaseModel):
+    model_config = ConfigDict(protected_namespaces=())
+
+    horizon_weeks: int
+    model_version: str
+    forecasts: List[ForecastRow]
+
+
+class ReplenishRequest(BaseModel):
+    target_service: float = Field(0.95, gt=0.0, lt=1.0)
+    capacity: float = Field(50000.0, ge=0.0)
+
+
+class OrderRow(BaseModel):
+    store_id: str
+    product_id: str
+    order_qty: int
+    unit_price: float
+    cost: float
+
+
+class ReplenishResponse(BaseModel):
+    model_config = ConfigDict(protected_namespaces=())
+
+    run_id: str
+    target_service: float
+    capacity: float
+    model_version: str
+    total_rows: int
+    next_cursor: Optional[str] = None
+    orders: List[OrderRow]
+
+
+class ReplenishPage(BaseModel):
+    model_config = ConfigDict(protected_namespaces=())
+
+    run_id: str
+    model_version: str
+    target_service: float
+    capacity: float
+    total_rows: int
+    cursor: Optional[str] = None
+    next_cursor: Optional[str] = None
+    orders: List[OrderRow]
+
+
+class FrontierRequest(BaseModel):
+    budgets: List[float] = Field(..., min_length=1, max_length=1000)
+    service_levels: List[float] = Field(default_factory=lambda: [0.95], min_length=1, max_length=100)
+
+    @field_validator("budgets")
+    @classmethod
+    def _non_negative(cls, v: List[float]) -> List[float]:
+        if any(b < 0 for b in v):
+            raise ValueError("budget harus >= 0")
+        return v
+
+    @field_validator("service_levels")
+    @classmethod
+    def _in_open_unit_interval(cls, v: List[float]) -> List[float]:
+        if any(not 0.0 < s < 1.0 for s in v):
+            raise ValueError("service level harus di antara 0 dan 1")
+        return v
+
+
+class FrontierPoint(BaseModel):
+    target_service: float
+    capacity: float
+    order_qty: float
+    order_cost: float
+    covered_need: float
+    total_need: float
+    shortage: float
+    fill_ratio: float
+
+
+class FrontierResponse(BaseModel):
+    model_config = ConfigDict(protected_namespaces=())
+
+    model_version: str
+    points: List[FrontierPoint]
+
+
+class InventoryRow(BaseModel):
+    store_id: str
+    product_id: str
+    on_hand: float = Field(..., ge=0.0)
+    on_order: float = Field(0.0, ge=0.0)
+
+
+class InventoryDeltaRequest(BaseModel):
+    rows: List[InventoryRow] = Field(..., min_length=1)
+
+
+class InventoryDeltaResponse(BaseModel):
+    model_config = ConfigDict(protected_namespaces=())
+
+    model_version: str
+    updated: int
+    unknown: int
+    plans_updated: int
+    allocations_touched: int
+    seconds: float
+
+
+class Lane(BaseModel):
+    store_id: str
+    lead_weeks: int = Field(..., ge=0, le=52)
+    cost: Optional[float] = Field(None, ge=0.0)
+
+
+class NetworkRequest(BaseModel):
+    target_service: float = Field(0.95, gt=0.0, lt=1.0)
+    periods: int = Field(4, ge=1, le=26)
+    supplier_lead_weeks: int = Field(2, ge=0, le=52)
+    transfer_lead_weeks: int = Field(1, ge=0, le=52)
+    transfer_cost: float = Field(1.0, ge=0.0)
+    dc_cover_weeks: float = Field(2.0, ge=0.0)
+    budget_per_period: Optional[float] = Field(None, ge=0.0)
+    lanes: List[Lane] = Field(default_factory=list)
+
+
+class TransferRow(BaseModel):
+    store_id: str
+    product_id: str
+    dc_id: str
+    period: int
+    transfer_qty: float
+    store_inventory: float
+    shortage: float
+
+
+class NetworkResponse(BaseModel):
+    model_config = ConfigDict(protected_namespaces=())
+
+    model_version: str
+    run_id: str
+    status: int
+    message: str
+    objective: float
+    solve_seconds: float
+    total_rows: int
+    next_cursor: Optional[str] = None
+    dc_orders: List[Dict[str, Any]]
+    transfers: List[TransferRow]
+
+
+class NetworkPage(BaseModel):
+    model_config = ConfigDict(protected_namespaces=())
+
+    run_id: str
+    model_version: str
+    total_rows: int
+    cursor: Optional[str] = None
+    next_cursor: Optional[str] = None
+    transfers: List[TransferRow]
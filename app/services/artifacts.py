@@ -0,0 +1,307 @@
+"""
+Process-level artifact store untuk FastAPI service.
+
+Model, statistik global, dan tabel fitur/inventory dibaca SEKALI (saat startup
+via FastAPI lifespan), lalu dipakai ulang oleh semua request. Sebuah thread
+background memantau mtime/size file; jika berubah, isi file di-hash dan bila
+kontennya memang berbeda seluruh artefak dibaca ulang ke snapshot baru yang
+kemudian di-swap secara atomik (satu assignment referensi).
+
+Setiap request sebaiknya mengambil snapshot sekali (`store.current()`) dan
+memakai snapshot itu sampai selesai, sehingga retrain di tengah request tidak
+pernah menghasilkan kombinasi model lama + fitur baru.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+
+from src.common.io import read_features
+from src.forecasting.features import SEASON_PERIOD
+from src.forecasting.index import PairIndex
+
+logger = logging.getLogger(__name__)
+
+ARTIF_DIR = Path("models/artifacts")
+PROCESSED_DIR = Path("data/processed")
+RAW_DIR = Path("data/raw")
+
+MODEL_PATH = ARTIF_DIR / "model_lgbm.pkl"
+QUANTILE_MODEL_PATH = ARTIF_DIR / "model_quantiles.pkl"
+MEAN_STD_PATH = ARTIF_DIR / "demand_stats.json"
+FEATURES_PATH = PROCESSED_DIR / "weekly_features.parquet"
+INVENTORY_PATH = PROCESSED_DIR / "inventory_latest.parquet"
+FORECAST_BASELINE_PATH = PROCESSED_DIR / "forecast_baseline.parquet"
+STORES_PATH = RAW_DIR / "stores.csv"
+
+DEFAULT_PATHS: Dict[str, Path] = {
+    "model": MODEL_PATH,
+    "quantiles": QUANTILE_MODEL_PATH,
+    "stats": MEAN_STD_PATH,
+    "features": FEATURES_PATH,
+    "inventory": INVENTORY_PATH,
+    "forecast_baseline": FORECAST_BASELINE_PATH,
+    "stores": STORES_PATH,
+}
+DEFAULT_STATS = {"mean": 5.0, "std": 2.0}
+
+POLL_SECONDS = float(os.getenv("ARTIFACT_POLL_SECONDS", "5"))
+# minggu terakhir tabel fitur yang dimuat untuk serving; 0 = seluruh riwayat.
+# Default SEASON_PERIOD + 1: buffer RecursiveForecaster (52) dan seasonal naive
+# `PairIndex.latest_lag_52` (baris t-52 -> butuh 53 baris) sama-sama terpenuhi.
+SERVING_WEEKS = int(os.getenv("FEATURES_SERVING_WEEKS", str(SEASON_PERIOD + 1)))
+
+# (exists, mtime_ns, size) per file/folder dataset -> murah dicek di setiap poll
+Signature = Dict[str, Tuple[bool, int, int]]
+
+
+@dataclass(frozen=True)
+class Artifacts:
+    """
+    Snapshot immutable dari semua artefak yang dibutuhkan serving path.
+    """
+
+    version: str
+    model: Any
+    stats: Dict[str, float]
+    features: Optional[pd.DataFrame]
+    index: Optional[PairIndex]
+    inventory: Optional[pd.DataFrame]
+    forecast_baseline: Optional[pd.DataFrame]
+    loaded_at: float
+    stores: Optional[pd.DataFrame] = None
+    # bundle `train_quantiles` (quantiles, models, feature_cols); None = belum dilatih
+    quantiles: Optional[Dict[str, Any]] = None
+
+
+def _dataset_files(path: Path):
+    """File data di folder dataset (partisi); file sementara `.`/`_` diabaikan seperti pyarrow."""
+    return sorted(
+        p for p in path.rglob("*")
+        if p.is_file() and not any(part.startswith((".", "_")) for part in p.relative_to(path).parts)
+    )
+
+
+def _file_signature(path: Path) -> Tuple[bool, int, int]:
+    """
+    (exists, mtime_ns, size). Untuk folder dataset: mtime terbaru dan total
+    ukuran semua partisi, sehingga partisi baru/terganti ikut terdeteksi.
+    """
+    try:
+        st = path.stat()
+        if not path.is_dir():
+            return (True, st.st_mtime_ns, st.st_size)
+        mtime, size = st.st_mtime_ns, 0
+        for f in _dataset_files(path):
+            fst = f.stat()
+            mtime, size = max(mtime, fst.st_mtime_ns), size + fst.st_size
+        return (True, mtime, size)
+    except FileNotFoundError:
+        # termasuk partisi yang di-rename di tengah listing -> poll berikutnya
+        return (False, 0, 0)
+
+
+# hash konten per partisi, key (path, mtime_ns, size): partisi lama tidak di-hash ulang
+_PART_HASHES: Dict[Tuple[str, int, int], str] = {}
+
+
+def _content_hash(path: Path, chunk_size: int) -> str:
+    h = hashlib.sha1()
+    with path.open("rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _file_hash(path: Path, chunk_size: int = 1 << 20) -> str:
+    if not path.exists():
+        return "missing"
+    if not path.is_dir():
+        return _content_hash(path, chunk_size)
+    if len(_PART_HASHES) > 16384:
+        _PART_HASHES.clear()
+    h = hashlib.sha1()
+    for f in _dataset_files(path):
+        st = f.stat()
+        key = (str(f), st.st_mtime_ns, st.st_size)
+        digest = _PART_HASHES.get(key)
+        if digest is None:
+            digest = _PART_HASHES[key] = _content_hash(f, chunk_size)
+        h.update(f"{f.relative_to(path).as_posix()}={digest};".encode())
+    return h.hexdigest()
+
+
+def _read_parquet(path: Path) -> Optional[pd.DataFrame]:
+    if not path.exists():
+        return None
+    return pd.read_parquet(path)
+
+
+class ArtifactStore:
+    """
+    Menyimpan snapshot `Artifacts` terbaru dan me-reload-nya di background.
+
+    Parameters
+    ----------
+    paths : dict, optional
+        Mapping nama artefak -> path (default: `DEFAULT_PATHS`).
+    poll_interval : float
+        Interval (detik) pengecekan mtime oleh thread background.
+    """
+
+    def __init__(self, paths: Optional[Dict[str, Path]] = None, poll_interval: float = POLL_SECONDS):
+        self.paths = {**DEFAULT_PATHS, **(paths or {})}
+        self.poll_interval = poll_interval
+        self._snapshot: Optional[Artifacts] = None
+        self._signature: Signature = {}
+        self._hashes: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # --- public API -------------------------------------------------------
+
+    def current(self) -> Artifacts:
+        """
+        Snapshot aktif. Jika store belum pernah di-load (mis. dipakai di luar
+        lifespan, contoh: TestClient tanpa context manager), load sinkron sekali.
+        """
+        snap = self._snapshot
+        if snap is None:
+            self.refresh()
+            snap = self._snapshot
+        return snap
+
+    @property
+    def version(self) -> str:
+        return self.current().version
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Cek perubahan file dan reload bila perlu.
+
+        Returns
+        -------
+        bool
+            True jika snapshot baru dipasang.
+        """
+        with self._lock:
+            sig = self._current_signature()
+            if not force and self._snapshot is not None and sig == self._signature:
+                return False
+
+            hashes = {
+                name: (self._hashes[name] if sig.get(name) == self._signature.get(name) and name in self._hashes
+                       else _file_hash(path))
+                for name, path in self.paths.items()
+            }
+            version = self._version_from_hashes(hashes)
+            if not force and self._snapshot is not None and version == self._snapshot.version:
+                # hanya mtime yang berubah (mis. `touch`), konten sama
+                self._signature, self._hashes = sig, hashes
+                return False
+
+            try:
+                snap = self._load(version)
+            except Exception:
+                # file bisa saja sedang ditulis ulang oleh job retrain/ETL;
+                # pertahankan snapshot lama dan coba lagi di poll berikutnya.
+                logger.exception("Artifact reload failed; keeping version %s",
+                                 self._snapshot.version if self._snapshot else None)
+                if self._snapshot is None:
+                    raise
+                return False
+
+            if self._current_signature() != sig:
+                # file berubah selama proses load -> jangan pasang snapshot setengah jadi
+                logger.info("Artifacts changed while loading; retrying on next poll")
+                if self._snapshot is not None:
+                    return False
+
+            self._signature, self._hashes = sig, hashes
+            self._snapshot = snap
+            logger.info("Artifacts loaded (version=%s)", version)
+            return True
+
+    def start(self) -> None:
+        """Mulai thread background yang mem-poll perubahan artefak."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="artifact-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval + 1)
+            self._thread = None
+
+    # --- internals --------------------------------------------------------
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Artifact watcher iteration failed")
+
+    def _current_signature(self) -> Signature:
+        return {name: _file_signature(path) for name, path in self.paths.items()}
+
+    @staticmethod
+    def _version_from_hashes(hashes: Dict[str, str]) -> str:
+        h = hashlib.sha1()
+        for name in sorted(hashes):
+            h.update(f"{name}={hashes[name]};".encode())
+        return h.hexdigest()[:12]
+
+    def _load(self, version: str) -> Artifacts:
+        model = quantiles = None
+        if self.paths["model"].exists() or self.paths["quantiles"].exists():
+            import joblib
+
+            if self.paths["model"].exists():
+                model = joblib.load(self.paths["model"])
+            if self.paths["quantiles"].exists():
+                quantiles = joblib.load(self.paths["quantiles"])
+
+        stats = dict(DEFAULT_STATS)
+        if self.paths["stats"].exists():
+            stats.update(json.loads(self.paths["stats"].read_text()))
+
+        features = read_features(self.paths["features"], last_weeks=SERVING_WEEKS)
+        return Artifacts(
+            version=version,
+            model=model,
+            stats=stats,
+            features=features,
+            index=PairIndex(features) if features is not None else None,
+            inventory=_read_parquet(self.paths["inventory"]),
+            forecast_baseline=_read_parquet(self.paths["forecast_baseline"]),
+            loaded_at=time.time(),
+            stores=pd.read_csv(self.paths["stores"]) if self.paths["stores"].exists() else None,
+            quantiles=quantiles,
+        )
+
+
+_STORE: Optional[ArtifactStore] = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_store() -> ArtifactStore:
+    """Singleton `ArtifactStore` untuk proses ini."""
+    global _STORE
+    if _STORE is None:
+        with _STORE_LOCK:
+            if _STORE is None:
+                _STORE = ArtifactStore()
+    return _STORE
@@ -0,0 +1,118 @@
+"""
+Bounded LRU + TTL cache untuk hasil forecast per SKU-location.
+
+Key: (store_id, product_id, horizon, artifact_version). Karena versi artefak
+(hash model + fitur, lihat `app/services/artifacts.py`) ikut di key, retrain
+atau ETL baru otomatis membuat entry lama tidak terpakai. Cache TIDAK
+dikosongkan saat versi berganti: selama hot-swap request in-flight masih
+memegang snapshot lama, jadi dua versi bisa bergantian; entry versi lama
+tidak lagi disentuh dan keluar sendiri lewat LRU/TTL.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+CACHE_SIZE = int(os.getenv("FORECAST_CACHE_SIZE", "100000"))
+CACHE_TTL_SECONDS = float(os.getenv("FORECAST_CACHE_TTL_SECONDS", "3600"))
+
+
+class ForecastCache:
+    """
+    Parameters
+    ----------
+    maxsize : int
+        Jumlah entry maksimum; 0 = cache nonaktif.
+    ttl : float
+        Umur maksimum entry (detik).
+    clock : callable
+        Sumber waktu (default `time.monotonic`), bisa di-inject untuk test.
+    """
+
+    def __init__(self, maxsize: int = CACHE_SIZE, ttl: float = CACHE_TTL_SECONDS,
+                 clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, Tuple[float, Tuple[float, ...]]]" = OrderedDict()
+        self._version: Optional[str] = None  # versi terakhir yang terlihat (info stats)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0
+
+    def get_many(self, keys: Sequence[Tuple[str, str]], horizon: int, version: str) -> List[Optional[Tuple[float, ...]]]:
+        """
+        Lookup batch; elemen None = miss. Entry yang kedaluwarsa dibuang.
+        """
+        if not self.enabled:
+            self.misses += len(keys)
+            return [None] * len(keys)
+
+        now = self._clock()
+        out: List[Optional[Tuple[float, ...]]] = []
+        with self._lock:
+            self._version = version
+            for sid, pid in keys:
+                k = (sid, pid, horizon, version)
+                entry = self._data.get(k)
+                if entry is not None and now - entry[0] > self.ttl:
+                    del self._data[k]
+                    self.expirations += 1
+                    entry = None
+                if entry is None:
+                    self.misses += 1
+                    out.append(None)
+                else:
+                    self._data.move_to_end(k)
+                    self.hits += 1
+                    out.append(entry[1])
+        return out
+
+    def put_many(self, keys: Sequence[Tuple[str, str]], horizon: int, version: str,
+                 values: Sequence[Sequence[float]]) -> None:
+        if not self.enabled:
+            return
+        now = self._clock()
+        with self._lock:
+            self._version = version
+            for (sid, pid), val in zip(keys, values):
+                k = (sid, pid, horizon, version)
+                self._data[k] = (now, tuple(val))
+                self._data.move_to_end(k)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, object]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "version": self._version,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / total) if total else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+_CACHE = ForecastCache()
+
+
+def get_forecast_cache() -> ForecastCache:
+    """Cache forecast level proses (dipakai oleh `forecast_batch`)."""
+    return _CACHE
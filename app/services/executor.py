@@ -0,0 +1,138 @@
+"""
+Worker pool untuk pekerjaan CPU-bound (forecast / optimizer) dari handler async.
+
+- Mode `thread`  : cocok untuk jalur yang sebagian besar waktunya di native code
+                   yang melepas GIL (LightGBM predict, HiGHS, NumPy).
+- Mode `process` : untuk jalur yang berat di pandas / Python murni. Snapshot
+                   artefak TIDAK di-pickle ke worker; tiap proses worker memakai
+                   `ArtifactStore` miliknya sendiri dan di-refresh bila versinya
+                   tertinggal dari versi yang diminta. (Cache forecast juga
+                   per proses di mode ini.)
+
+Concurrency dibatasi `max_pending` (job yang sedang jalan + antre). Jika penuh,
+`run()` langsung melempar `PoolSaturated` supaya handler bisa membalas 429
+daripada menumpuk antrean dan merusak tail latency.
+"""
+
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+WORKER_POOL = os.getenv("WORKER_POOL", "thread")
+WORKER_COUNT = int(os.getenv("WORKER_COUNT", str(os.cpu_count() or 2)))
+WORKER_MAX_PENDING = int(os.getenv("WORKER_MAX_PENDING", str(4 * WORKER_COUNT)))
+
+
+class PoolSaturated(RuntimeError):
+    """Semua slot worker (running + queue) sedang terpakai."""
+
+
+def _call_with_local_artifacts(fn: Callable, version: str, args: tuple, kwargs: dict) -> Any:
+    """Dijalankan di proses worker: resolve snapshot artefak lokal lalu panggil `fn`."""
+    from app.services.artifacts import get_store
+
+    store = get_store()
+    if store.current().version != version:
+        store.refresh()
+    return fn(*args, artifacts=store.current(), **kwargs)
+
+
+class WorkerPool:
+    """
+    Parameters
+    ----------
+    mode : str
+        "thread" atau "process".
+    workers : int
+        Jumlah worker.
+    max_pending : int
+        Batas job in-flight (running + antre) sebelum request ditolak.
+    """
+
+    def __init__(self, mode: str = WORKER_POOL, workers: int = WORKER_COUNT, max_pending: int = WORKER_MAX_PENDING):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"mode worker tidak dikenal: {mode!r}")
+        self.mode = mode
+        self.workers = workers
+        self.max_pending = max(1, max_pending)
+        self._executor: Optional[Executor] = None
+        self._inflight = 0
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.mode == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="cpu-worker")
+        return self._executor
+
+    @property
+    def inflight(self) -> int:
+        return self._inflight
+
+    def _acquire(self) -> None:
+        with self._lock:
+            if self._inflight >= self.max_pending:
+                self.rejected += 1
+                raise PoolSaturated(f"{self._inflight} job sedang berjalan/antre (max {self.max_pending})")
+            self._inflight += 1
+
+    def _release(self) -> None:
+        with self._lock:
+            self._inflight -= 1
+
+    async def run(self, fn: Callable, *args: Any, artifacts=None, **kwargs: Any) -> Any:
+        """
+        Jalankan `fn(*args, artifacts=..., **kwargs)` di pool tanpa memblok event loop.
+
+        Raises
+        ------
+        PoolSaturated
+            Jika jumlah job in-flight sudah mencapai `max_pending`.
+        """
+        self._acquire()
+        try:
+            if self.mode == "process" and artifacts is not None:
+                call = functools.partial(_call_with_local_artifacts, fn, artifacts.version, args, kwargs)
+            elif artifacts is not None:
+                call = functools.partial(fn, *args, artifacts=artifacts, **kwargs)
+            else:
+                call = functools.partial(fn, *args, **kwargs)
+            job = self._get_executor().submit(call)
+        except BaseException:
+            self._release()
+            raise
+        # slot dilepas saat job di pool selesai, bukan saat coroutine ini selesai:
+        # request yang dibatalkan (client disconnect) tidak menghentikan job-nya
+        job.add_done_callback(lambda _: self._release())
+        return await asyncio.wrap_future(job)
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "inflight": self._inflight,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+_POOL: Optional[WorkerPool] = None
+
+
+def get_pool() -> WorkerPool:
+    """Worker pool level proses (dibuat lazy saat pertama dipakai)."""
+    global _POOL
+    if _POOL is None:
+        _POOL = WorkerPool()
+    return _POOL
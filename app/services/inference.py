@@ -1,35 +1,17 @@
-import json
+import asyncio
 import os
-import numpy as np
-import pandas as pd
-from pathlib import Path
-
-ARTIF_DIR = Path("models/artifacts")
-ARTIF_DIR.mkdir(parents=True, exist_ok=True)
-MODEL_PATH = ARTIF_DIR / "model_lgbm.pkl"
-MEAN_STD_PATH = ARTIF_DIR / "demand_stats.json"
-
-try:
-    import lightgbm as lgb
-    LGB_OK = True
-except Exception:
-    LGB_OK = False
-    from sklearn.ensemble import RandomForestRegressor as RFR
-
-FEATURES_PATH = Path("data/processed/weekly_features.parquet")
 
+import numpy as np
 
-def _load_model():
-    if MODEL_PATH.exists():
-        import joblib
-        return joblib.load(MODEL_PATH)
-    return None
-
+from app.services.artifacts import Artifacts, get_store
+from app.services.cache import get_forecast_cache
+from src.forecasting.recursive import RecursiveForecaster
 
-def _load_stats():
-    if MEAN_STD_PATH.exists():
-        return json.loads(MEAN_STD_PATH.read_text())
-    return {"mean": 5.0, "std": 2.0}
+STREAM_CHUNK_PAIRS = int(os.getenv("FORECAST_STREAM_CHUNK_PAIRS", "500"))
+STREAM_RETRY_MS = float(os.getenv("FORECAST_STREAM_RETRY_MS", "20"))
+MICROBATCH_ENABLED = os.getenv("FORECAST_MICROBATCH", "0") == "1"
+MICROBATCH_MAX_WAIT_MS = float(os.getenv("FORECAST_MICROBATCH_MAX_WAIT_MS", "5"))
+MICROBATCH_MAX_PAIRS = int(os.getenv("FORECAST_MICROBATCH_MAX_PAIRS", "2000"))
 
 
 def _naive_forecast(h, mean, std):
@@ -42,73 +24,247 @@ def _naive_forecast(h, mean, std):
     return base.clip(min=0).tolist()
 
 
-def _naive_and_seasonal_from_history(sub: pd.DataFrame, h: int, mean: float, std: float):
+ID_COLS = ["units_sold", "store_id", "product_id", "year", "week"]
+
+
+def _pair_key(p):
+    """(store_id, product_id) dari dict mentah atau model `Pair` (pydantic)."""
+    if isinstance(p, dict):
+        return (p.get("store_id", "S001"), p.get("product_id", "P001"))
+    return (p.store_id, p.product_id)
+
+
+def _feature_columns(index):
+    return [c for c in index.latest.columns if c not in ID_COLS]
+
+
+def _forecast_matrix(keys, horizon, art: Artifacts) -> np.ndarray:
+    """
+    Forecast semua pasangan sekaligus -> array (len(keys), horizon).
+
+    Baris pasangan yang ditemukan di index dirakit menjadi satu matriks fitur
+    dan model dipanggil SEKALI per langkah horizon (bukan per pasangan per
+    langkah); hasilnya di-scatter kembali ke posisi baris request. Fitur
+    lag/rolling di-roll forward oleh `RecursiveForecaster` di tiap langkah.
     """
-    Baseline per SKU-location:
-    - Naive:       y_hat(t) = y(t-1)  -> ulangi nilai units_sold terakhir untuk semua horizon.
-    - Seasonal:    y_hat(t) = y(t-52) -> pakai lag_52 (jika tersedia) sebagai seasonal naive mingguan.
+    model = art.model
+    mean, std = art.stats.get("mean", 5.0), art.stats.get("std", 2.0)
+    out = np.empty((len(keys), horizon), dtype=float)
+
+    index = art.index
+    positions = index.locate(keys) if index is not None else np.full(len(keys), -1, dtype=np.int64)
+    found = positions >= 0
+
+    # tidak ada riwayat untuk pasangan ini -> global naive
+    out[~found] = _naive_forecast(horizon, mean, std)
+    if not found.any():
+        return out
+
+    pos = positions[found]
+    if model is None:
+        # Jika belum ada model terlatih, pakai baseline:
+        # - seasonal naive jika tersedia, jika tidak fallback ke naive.
+        seasonal = index.latest_lag_52[pos]
+        naive = index.latest_units[pos]
+        base = np.where(np.isnan(seasonal), naive, seasonal)
+        out[found] = np.maximum(0.0, base)[:, None]
+        return out
+
+    feature_cols = _feature_columns(index)
+    engine = RecursiveForecaster(model, feature_cols)
+    out[found] = engine.forecast(
+        history=index.history_matrix(pos, engine.buffer_weeks),
+        last_year=index.latest["year"].to_numpy()[pos],
+        last_week=index.latest["week"].to_numpy()[pos],
+        static=index.latest_matrix(feature_cols)[pos],
+        horizon=horizon,
+    )
+    return out
+
+
+def quantile_arrays(keys, artifacts: Artifacts = None):
+    """
+    Quantile demand minggu berikutnya untuk semua pasangan.
+
+    Fitur langkah pertama dirakit sekali untuk seluruh pasangan, lalu tiap
+    model quantile dipanggil SEKALI atas matriks yang sama. Quantile yang
+    bersilangan diurutkan ulang per baris supaya level naik monoton.
+
+    Returns
+    -------
+    quantiles : np.ndarray or None
+        (Q,) level quantile urut naik; None jika model quantile belum dilatih.
+    values : np.ndarray or None
+        (len(keys), Q); NaN untuk pasangan tanpa riwayat di index.
+    """
+    art = artifacts if artifacts is not None else get_store().current()
+    bundle = art.quantiles
+    if not bundle or art.index is None:
+        return None, None
+    qs = np.asarray(bundle["quantiles"], dtype=float)
+    out = np.full((len(keys), len(qs)), np.nan)
+    positions = art.index.locate(keys)
+    found = positions >= 0
+    if not found.any():
+        return qs, out
+
+    pos = positions[found]
+    index = art.index
+    engine = RecursiveForecaster(None, bundle["feature_cols"])
+    X = engine.next_features(
+        history=index.history_matrix(pos, engine.buffer_weeks),
+        last_year=index.latest["year"].to_numpy()[pos],
+        last_week=index.latest["week"].to_numpy()[pos],
+        static=index.latest_matrix(bundle["feature_cols"])[pos],
+    )
+    pred = np.column_stack([m.predict(X) for m in bundle["models"]])
+    out[found] = np.sort(np.maximum(0.0, pred), axis=1)
+    return qs, out
+
+
+def forecast_arrays(pairs, horizon, artifacts: Artifacts = None, use_cache: bool = True):
     """
-    if sub is None or len(sub) == 0:
-        # fallback ke global naive jika tidak ada riwayat
-        return _naive_forecast(h, mean, std), None
-
-    sub = sub.sort_values(["year", "week"])
-
-    # Naive: last value
-    last_units = float(sub["units_sold"].iloc[-1])
-    naive = [float(max(0.0, last_units))] * h
-
-    # Seasonal naive: gunakan lag_52 jika ada dan tidak NaN
-    seasonal = None
-    if "lag_52" in sub.columns:
-        val = sub["lag_52"].iloc[-1]
-        if not pd.isna(val):
-            seasonal_val = float(val)
-            seasonal = [float(max(0.0, seasonal_val))] * h
-
-    return naive, seasonal
-
-
-def forecast_batch(pairs, horizon):
-    model = _load_model()
-    stats = _load_stats()
-    mean, std = stats.get("mean", 5.0), stats.get("std", 2.0)
-
-    df = None
-    if FEATURES_PATH.exists():
-        df = pd.read_parquet(FEATURES_PATH)
-
-    outputs = []
-    for p in pairs:
-        sid = p.get("store_id", "S001")
-        pid = p.get("product_id", "P001")
-
-        sub = None
-        if df is not None:
-            sub = df[(df.store_id == sid) & (df.product_id == pid)]
-
-        if model is None:
-            # Jika belum ada model terlatih, pakai baseline:
-            # - seasonal naive jika tersedia, jika tidak fallback ke naive / global.
-            naive, seasonal = _naive_and_seasonal_from_history(sub, horizon, mean, std)
-            fc = seasonal if seasonal is not None else naive
-        else:
-            # minimal feature pattern: last known week features
-            if sub is None or len(sub) == 0:
-                fc = _naive_forecast(horizon, mean, std)
-            else:
-                sub_sorted = sub.sort_values(["year", "week"])
-                X_last = sub_sorted.tail(1).drop(
-                    columns=["units_sold", "store_id", "product_id", "year", "week"]
-                )
-                preds = []
-                xcur = X_last.iloc[0].values.reshape(1, -1)
-                for _ in range(horizon):
-                    y = model.predict(xcur)[0]
-                    preds.append(float(max(0.0, y)))
-                fc = preds
-
-        outputs.append({"store_id": sid, "product_id": pid, "forecast": fc})
-    return outputs
+    Versi kolumnar dari `forecast_batch`.
+
+    Returns
+    -------
+    keys : list[tuple[str, str]]
+        (store_id, product_id) sesuai urutan request.
+    forecasts : np.ndarray
+        Array (len(keys), horizon).
+
+    Dengan `use_cache`, pasangan yang sudah ada di `ForecastCache` (untuk
+    horizon & versi artefak yang sama) langsung dijawab dari cache; hanya
+    miss yang dikirim ke model.
+    """
+    art = artifacts if artifacts is not None else get_store().current()
+    keys = [_pair_key(p) for p in pairs]
+
+    if not use_cache:
+        return keys, _forecast_matrix(keys, horizon, art)
+
+    cache = get_forecast_cache()
+    cached = cache.get_many(keys, horizon, art.version)
+    miss = [i for i, r in enumerate(cached) if r is None]
+    out = np.empty((len(keys), horizon), dtype=float)
+    if len(miss) < len(keys):
+        hit = [i for i, r in enumerate(cached) if r is not None]
+        out[hit] = [cached[i] for i in hit]
+    if miss:
+        miss_keys = [keys[i] for i in miss]
+        fc = _forecast_matrix(miss_keys, horizon, art)
+        cache.put_many(miss_keys, horizon, art.version, fc.tolist())
+        out[miss] = fc
+    return keys, out
+
+
+def forecast_batch(pairs, horizon, artifacts: Artifacts = None, use_cache: bool = True):
+    """
+    Forecast untuk daftar pasangan store/product.
+
+    `artifacts` adalah snapshot dari `ArtifactStore`; jika tidak diberikan,
+    snapshot aktif diambil sekali di awal sehingga seluruh batch memakai
+    model & fitur dari versi yang sama. Riwayat tiap pasangan diambil dari
+    `PairIndex` (O(1) per pasangan, tanpa filter/sort per request).
+    """
+    keys, fc = forecast_arrays(pairs, horizon, artifacts=artifacts, use_cache=use_cache)
+    return [
+        {"store_id": sid, "product_id": pid, "forecast": row}
+        for (sid, pid), row in zip(keys, fc.tolist())
+    ]
+
+
+async def iter_forecast_chunks(pairs, horizon, run, artifacts: Artifacts = None, chunk_size: int = STREAM_CHUNK_PAIRS):
+    """
+    Async generator: forecast per potongan `chunk_size` pasangan.
+
+    Dipakai mode streaming `/forecast`: setiap chunk langsung dikirim ke
+    client setelah dihitung, sehingga memori server tetap datar meskipun
+    jumlah pasangan sangat besar.
+
+    Parameters
+    ----------
+    run : async callable
+        `await run(chunk, horizon, artifacts)` -> hasil `forecast_batch`
+        (worker pool di `app/main.py`, sama seperti `MicroBatcher`).
+    """
+    art = artifacts if artifacts is not None else get_store().current()
+    chunk_size = max(1, chunk_size)
+    for start in range(0, len(pairs), chunk_size):
+        yield await run(pairs[start : start + chunk_size], horizon, art)
+
+
+class MicroBatcher:
+    """
+    Menggabungkan request `/forecast` kecil yang datang bersamaan.
+
+    Request dikumpulkan per (horizon, versi artefak) selama paling lama
+    `max_wait_ms` atau sampai total `max_pairs` pasangan, lalu dijalankan
+    sebagai SATU `forecast_batch` dan hasilnya dibagi kembali ke tiap request.
+    Request yang sendirian sudah >= `max_pairs` langsung dijalankan.
+
+    Parameters
+    ----------
+    run : async callable
+        `await run(pairs, horizon, artifacts)` -> list hasil `forecast_batch`
+        (mis. dibungkus worker pool di `app/main.py`).
+    """
+
+    def __init__(self, run, max_wait_ms: float = MICROBATCH_MAX_WAIT_MS, max_pairs: int = MICROBATCH_MAX_PAIRS):
+        self._run = run
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_pairs = max_pairs
+        self._pending = {}  # key -> {"art", "items": [(pairs, future)], "n", "timer"}
+        self.batches = 0
+        self.requests = 0
+
+    async def submit(self, pairs, horizon, artifacts: Artifacts):
+        self.requests += 1
+        if len(pairs) >= self.max_pairs:
+            self.batches += 1
+            return await self._run(pairs, horizon, artifacts)
+
+        loop = asyncio.get_running_loop()
+        key = (id(loop), horizon, artifacts.version)
+        fut = loop.create_future()
+        slot = self._pending.get(key)
+        if slot is None:
+            slot = {"art": artifacts, "items": [], "n": 0, "timer": None}
+            self._pending[key] = slot
+            slot["timer"] = loop.call_later(self.max_wait, self._schedule_flush, key)
+        slot["items"].append((pairs, fut))
+        slot["n"] += len(pairs)
+        if slot["n"] >= self.max_pairs:
+            slot["timer"].cancel()
+            self._schedule_flush(key)
+        return await fut
+
+    def _schedule_flush(self, key) -> None:
+        slot = self._pending.pop(key, None)
+        if slot is not None:
+            asyncio.ensure_future(self._flush(key[1], slot))
 
+    async def _flush(self, horizon, slot) -> None:
+        items = slot["items"]
+        merged = [p for pairs, _ in items for p in pairs]
+        self.batches += 1
+        try:
+            result = await self._run(merged, horizon, slot["art"])
+        except Exception as exc:
+            for _, fut in items:
+                if not fut.done():
+                    fut.set_exception(exc)
+            return
+        offset = 0
+        for pairs, fut in items:
+            if not fut.done():
+                fut.set_result(result[offset : offset + len(pairs)])
+            offset += len(pairs)
 
+    def stats(self) -> dict:
+        return {
+            "max_wait_ms": self.max_wait * 1000.0,
+            "max_pairs": self.max_pairs,
+            "requests": self.requests,
+            "batches": self.batches,
+        }
@@ -1,42 +1,416 @@
+import threading
+import time
+from collections import OrderedDict
+
 import numpy as np
 import pandas as pd
-from scipy.optimize import linprog
-from pathlib import Path
+from scipy.stats import norm
+
+from app.services.artifacts import INVENTORY_PATH, FORECAST_BASELINE_PATH, Artifacts, get_store
+from app.services.inference import quantile_arrays
+from src.optimizer.allocation import budget_frontier
+from src.optimizer.incremental import IncrementalAllocator
+from src.optimizer.lot_sizing import lot_size
+from src.optimizer.multi_echelon import EchelonProblem, echelon_frames, solve_multi_echelon
+
+# Simplified replenishment: meet need = stock level - on_hand - on_order, with budget(capacity).
+# Stock level = demand quantile at target_service (quantile models) or forecast + z * demand_std.
 
-PROCESSED_DIR = Path("data/processed")
+UNIT_PRICE = 50.0  # flat unit price for demo
+ID_COLS = ["store_id", "product_id"]
+MAX_PLANS = 8  # rencana (target_service, capacity) yang disimpan untuk update inkremental
+QUANTILE_PREFIX = "demand_q"
 
-# Simplified replenishment: meet need = forecast + safety - on_hand - on_order, with budget(capacity)
 
-def compute_replenishment(target_service: float = 0.95, capacity: float = 50000.0):
-    price = 50.0  # flat unit price for demo
-    safety_z = 1.64 if target_service >= 0.95 else 1.28
+def safety_z(target_service: float) -> float:
+    """z-score safety stock untuk target service level (cycle service, normal)."""
+    return float(norm.ppf(target_service))
 
-    inv = pd.read_parquet(PROCESSED_DIR / "inventory_latest.parquet")
-    fc = pd.read_parquet(PROCESSED_DIR / "forecast_baseline.parquet")
 
+def _replenishment_inputs(artifacts: Artifacts = None) -> pd.DataFrame:
+    """
+    Inventory snapshot + forecast_next per SKU-location (sudah di-align),
+    plus kolom `demand_q<q>` bila model quantile tersedia.
+    """
+    art = artifacts if artifacts is not None else get_store().current()
+    if art.inventory is None or art.forecast_baseline is None:
+        raise FileNotFoundError(
+            f"{INVENTORY_PATH} / {FORECAST_BASELINE_PATH} tidak ditemukan. Jalankan dulu ETL: `python etl/build_features.py`."
+        )
     # align
-    df = inv.merge(fc, on=["store_id","product_id"], how="left")
+    df = art.inventory.merge(art.forecast_baseline, on=["store_id", "product_id"], how="left")
     df["forecast_next"] = df["forecast_next"].fillna(5.0)
+    df["demand_std"] = df["demand_std"].fillna(2.0)
+    qs, values = _STATE.quantiles(art)
+    if qs is not None:
+        for j, q in enumerate(qs):
+            df[f"{QUANTILE_PREFIX}{q:g}"] = values[:, j]
+    return _STATE.apply_overlay(df, art)
+
+
+def _quantile_columns(df: pd.DataFrame):
+    cols = [c for c in df.columns if c.startswith(QUANTILE_PREFIX)]
+    qs = np.array([float(c[len(QUANTILE_PREFIX):]) for c in cols])
+    order = np.argsort(qs)
+    return qs[order], [cols[i] for i in order]
+
+
+def _stock_levels(df: pd.DataFrame, service_levels) -> np.ndarray:
+    """
+    Level stok tujuan (S, n) untuk tiap target service.
+
+    Dengan model quantile, level = quantile demand pada target service
+    (interpolasi linear antar quantile terlatih, mis. 0.93 di antara P90 dan
+    P95). Target di luar rentang quantile, atau pasangan tanpa prediksi
+    quantile, memakai forecast_next + z * demand_std.
+    """
+    levels = np.atleast_1d(np.asarray(service_levels, dtype=float))
+    forecast = df["forecast_next"].to_numpy(dtype=float)
+    std = df["demand_std"].to_numpy(dtype=float)
+    out = forecast[None, :] + norm.ppf(levels)[:, None] * std[None, :]
+
+    qs, cols = _quantile_columns(df)
+    if len(qs) == 0:
+        return out
+    values = df[cols].to_numpy(dtype=float)
+    for s, level in enumerate(levels):
+        if not qs[0] - 1e-9 <= level <= qs[-1] + 1e-9:
+            continue
+        if len(qs) == 1:
+            val = values[:, 0]
+        else:
+            j = int(np.clip(np.searchsorted(qs, level), 1, len(qs) - 1))
+            w = float(np.clip((level - qs[j - 1]) / (qs[j] - qs[j - 1]), 0.0, 1.0))
+            val = (1.0 - w) * values[:, j - 1] + w * values[:, j]
+        ok = ~np.isnan(val)
+        out[s, ok] = val[ok]
+    return out
+
+
+def _need(df: pd.DataFrame, service_levels) -> np.ndarray:
+    """
+    need = level stok - on_hand - on_order (>= 0).
+    Target skalar -> (n,); array target (S,) -> (S, n).
+    """
+    base = _stock_levels(df, service_levels) - (df["on_hand"].to_numpy() + df["on_order"].to_numpy())[None, :]
+    need = np.maximum(0.0, base)
+    return need if np.ndim(service_levels) else need[0]
+
+
+class _Plan:
+    """Input + allocator inkremental untuk satu (target_service, capacity)."""
+
+    def __init__(self, df: pd.DataFrame, target_service: float, capacity: float):
+        self.keys = df[ID_COLS].reset_index(drop=True)
+        self.level = _stock_levels(df, target_service)[0]
+        self.on_hand = df["on_hand"].to_numpy(dtype=float).copy()
+        self.on_order = df["on_order"].to_numpy(dtype=float).copy()
+        # inventory tanpa kolom lot sizing -> pack 1, tanpa MOQ
+        self.case_pack = df["case_pack"].to_numpy(dtype=float) if "case_pack" in df else np.ones(len(df))
+        self.moq = df["moq"].to_numpy(dtype=float) if "moq" in df else np.zeros(len(df))
+        self.capacity = capacity
+        # satu budget tanpa constraint lain -> continuous knapsack, diselesaikan
+        # eksak dengan sort + cumsum; state-nya disimpan untuk update inkremental
+        self.allocator = IncrementalAllocator(self._need(), np.full(len(df), UNIT_PRICE), capacity)
+        self.lock = threading.Lock()
+
+    def _need(self, idx=slice(None)) -> np.ndarray:
+        base = self.level[idx] - self.on_hand[idx] - self.on_order[idx]
+        return np.maximum(0.0, base)
+
+    def update(self, pos: np.ndarray, on_hand: np.ndarray, on_order: np.ndarray) -> int:
+        with self.lock:
+            self.on_hand[pos] = on_hand
+            self.on_order[pos] = on_order
+            return len(self.allocator.update(pos, self._need(pos)))
+
+    def quantities(self) -> np.ndarray:
+        """
+        Order integer: solusi kontinu dibulatkan ke case pack / MOQ lalu
+        di-repair supaya tetap dalam budget (`src/optimizer/lot_sizing.py`).
+        """
+        with self.lock:
+            qty, need = self.allocator.x.copy(), self.allocator.need.copy()
+        return lot_size(qty, self.allocator.unit_cost, self.capacity, self.case_pack, self.moq, need=need)
+
+
+class _PlannerState:
+    """
+    State optimizer level proses: delta inventory yang sudah di-push (overlay
+    di atas `inventory_latest` dari artefak) dan rencana yang bisa di-update
+    inkremental. Keduanya dibuang begitu versi artefak berubah (snapshot
+    inventory baru menggantikan semua delta).
+
+    Rencana baru dibangun di luar lock. Delta yang masuk selama build dicatat
+    dengan nomor urut dan diputar ulang ke rencana itu saat dipasang, supaya
+    tidak hilang.
+    """
+
+    def __init__(self, max_plans: int = MAX_PLANS):
+        self.max_plans = max_plans
+        self.version = None
+        self.index = None
+        self.overlay = {}  # (store_id, product_id) -> (on_hand, on_order)
+        self._quantiles = None  # (qs, values) sejajar baris inventory, per versi artefak
+        self.plans: "OrderedDict[tuple, _Plan]" = OrderedDict()
+        self.seq = 0  # nomor urut delta terakhir
+        self._log = []  # (seq, pos, on_hand, on_order), hanya selama ada build berjalan
+        self._building = 0
+        self.lock = threading.Lock()
+
+    def _sync(self, art: Artifacts) -> None:
+        if art.version != self.version:
+            self.version = art.version
+            self.index = None if art.inventory is None else pd.MultiIndex.from_frame(art.inventory[ID_COLS])
+            self.overlay.clear()
+            self.plans.clear()
+            self._log.clear()
+            self._quantiles = None
+
+    def quantiles(self, art: Artifacts):
+        """
+        Prediksi quantile untuk semua baris inventory, dihitung sekali per
+        versi artefak (satu pass batched, lihat `inference.quantile_arrays`).
+        """
+        with self.lock:
+            self._sync(art)
+            if self._quantiles is None:
+                keys = list(zip(art.inventory["store_id"], art.inventory["product_id"]))
+                self._quantiles = quantile_arrays(keys, art)
+            return self._quantiles
 
-    # safety stock proxy from volatility
-    df["safety"] = safety_z * df["demand_std"].fillna(2.0)
+    def apply_overlay(self, df: pd.DataFrame, art: Artifacts) -> pd.DataFrame:
+        with self.lock:
+            self._sync(art)
+            if not self.overlay:
+                return df
+            keys = list(self.overlay)
+            vals = np.array(list(self.overlay.values()), dtype=float)
+        # merge left mempertahankan urutan baris inventory
+        pos = self.index.get_indexer(pd.MultiIndex.from_tuples(keys))
+        df["on_hand"] = df["on_hand"].astype(float)
+        df["on_order"] = df["on_order"].astype(float)
+        df.iloc[pos, df.columns.get_loc("on_hand")] = vals[:, 0]
+        df.iloc[pos, df.columns.get_loc("on_order")] = vals[:, 1]
+        return df
 
-    need = np.maximum(0.0, df["forecast_next"].values + df["safety"].values - df["on_hand"].values - df["on_order"].values)
-    n = len(need)
-    prices = np.full(n, price)
+    def plan(self, target_service: float, capacity: float, art: Artifacts) -> _Plan:
+        key = (art.version, float(target_service), float(capacity))
+        with self.lock:
+            self._sync(art)
+            plan = self.plans.get(key)
+            if plan is not None:
+                self.plans.move_to_end(key)
+                return plan
+            start = self.seq
+            self._building += 1
+        try:
+            plan = _Plan(_replenishment_inputs(art), target_service, capacity)
+        except BaseException:
+            with self.lock:
+                self._end_build()
+            raise
+        with self.lock:
+            if art.version == self.version:
+                # delta setelah `start` mungkin belum terlihat oleh build; nilainya
+                # absolut sehingga memutar ulang delta yang sudah ikut tetap aman
+                for _, pos, on_hand, on_order in (d for d in self._log if d[0] > start):
+                    plan.update(pos, on_hand, on_order)
+                self.plans[key] = plan
+                while len(self.plans) > self.max_plans:
+                    self.plans.popitem(last=False)
+            self._end_build()
+        return plan
 
-    # minimize cost: c·x, subject to price·x <= capacity, x >= need
-    c = prices
-    A = np.vstack([prices])
-    b = [capacity]
-    bounds = [(need[i], None) for i in range(n)]
-    res = linprog(c, A_ub=A, b_ub=b, bounds=bounds, method="highs")
-    qty = res.x if res.success else need
+    def _end_build(self) -> None:
+        self._building -= 1
+        if not self._building:
+            self._log.clear()
 
-    df_out = df[["store_id","product_id"]].copy()
-    df_out["order_qty"] = np.maximum(0, np.floor(qty)).astype(int)
+    def push(self, delta: pd.DataFrame, art: Artifacts) -> dict:
+        t0 = time.perf_counter()
+        with self.lock:
+            self._sync(art)
+            pos = self.index.get_indexer(pd.MultiIndex.from_frame(delta[ID_COLS]))
+            known = pos >= 0
+            delta = delta[known]
+            pos = pos[known]
+            on_hand = delta["on_hand"].to_numpy(dtype=float)
+            on_order = delta["on_order"].to_numpy(dtype=float)
+            for key, oh, oo in zip(zip(delta["store_id"], delta["product_id"]), on_hand, on_order):
+                self.overlay[key] = (oh, oo)
+            self.seq += 1
+            if self._building:
+                self._log.append((self.seq, pos, on_hand, on_order))
+            plans = list(self.plans.values())
+        touched = sum(p.update(pos, on_hand, on_order) for p in plans)
+        return {
+            "updated": int(known.sum()),
+            "unknown": int((~known).sum()),
+            "plans_updated": len(plans),
+            "allocations_touched": int(touched),
+            "seconds": time.perf_counter() - t0,
+        }
+
+
+_STATE = _PlannerState()
+
+
+def push_inventory_delta(delta: pd.DataFrame, artifacts: Artifacts = None) -> dict:
+    """
+    Terapkan delta inventory (store_id, product_id, on_hand, on_order).
+
+    Delta disimpan sebagai overlay untuk perhitungan berikutnya dan langsung
+    diteruskan ke rencana yang sudah ada, sehingga hanya pasangan yang berubah
+    (dan pasangan di sekitar batas budget) yang dialokasi ulang. Pasangan yang
+    tidak ada di snapshot inventory dihitung sebagai `unknown` dan diabaikan.
+    """
+    art = artifacts if artifacts is not None else get_store().current()
+    if art.inventory is None or art.forecast_baseline is None:
+        raise FileNotFoundError(
+            f"{INVENTORY_PATH} / {FORECAST_BASELINE_PATH} tidak ditemukan. Jalankan dulu ETL: `python etl/build_features.py`."
+        )
+    return _STATE.push(delta, art)
+
+
+def compute_replenishment_frame(target_service: float = 0.95, capacity: float = 50000.0, artifacts: Artifacts = None) -> pd.DataFrame:
+    """
+    Rencana order untuk SEMUA SKU-location sebagai DataFrame
+    (store_id, product_id, order_qty, unit_price, cost).
+    """
+    price = UNIT_PRICE
+    art = artifacts if artifacts is not None else get_store().current()
+    plan = _STATE.plan(target_service, capacity, art)
+    qty = plan.quantities()
+
+    df_out = plan.keys.copy()
+    df_out["order_qty"] = qty
     df_out["unit_price"] = price
     df_out["cost"] = df_out["order_qty"] * df_out["unit_price"]
+    return df_out
+
+
+def compute_replenishment(target_service: float = 0.95, capacity: float = 50000.0, artifacts: Artifacts = None):
+    df_out = compute_replenishment_frame(target_service=target_service, capacity=capacity, artifacts=artifacts)
     return df_out.head(100).to_dict(orient="records")
 
 
+def compute_frontier(budgets, service_levels, artifacts: Artifacts = None) -> pd.DataFrame:
+    """
+    Frontier biaya vs service untuk semua kombinasi (service_level, budget)
+    dalam satu pass: satu sort prioritas + prefix sum per service level.
+
+    Returns
+    -------
+    pd.DataFrame
+        Satu baris per titik: target_service, capacity, order_qty, order_cost,
+        covered_need, total_need, shortage, fill_ratio.
+    """
+    df = _replenishment_inputs(artifacts)
+    levels = np.asarray(service_levels, dtype=float)
+    budgets = np.asarray(budgets, dtype=float)
+
+    need = _need(df, levels)
+    prices = np.full(len(df), UNIT_PRICE)
+    res = budget_frontier(need, prices, budgets)
+
+    S, m = len(levels), len(budgets)
+    out = pd.DataFrame({
+        "target_service": np.repeat(levels, m),
+        "capacity": np.tile(budgets, S),
+    })
+    for key in ("order_qty", "order_cost", "covered_need", "total_need", "shortage"):
+        out[key] = res[key].ravel()
+    out["fill_ratio"] = np.divide(
+        out["covered_need"].to_numpy(), out["total_need"].to_numpy(),
+        out=np.ones(len(out)), where=out["total_need"].to_numpy() > 0,
+    )
+    return out
+
+
+def _store_dc(store_ids: pd.Series, stores) -> pd.Series:
+    """DC yang melayani tiap store: satu DC per region (`stores.csv`), fallback satu DC."""
+    if stores is None or "region" not in stores:
+        return pd.Series("DC-DEFAULT", index=store_ids.index)
+    region = store_ids.map(stores.set_index("store_id")["region"])
+    return ("DC-" + region.astype("string")).fillna("DC-DEFAULT").astype(str)
+
+
+def compute_multi_echelon(
+    target_service: float = 0.95,
+    periods: int = 4,
+    supplier_lead_weeks: int = 2,
+    transfer_lead_weeks: int = 1,
+    transfer_cost: float = 1.0,
+    dc_cover_weeks: float = 2.0,
+    budget_per_period: float = None,
+    lanes: pd.DataFrame = None,
+    artifacts: Artifacts = None,
+):
+    """
+    Rencana supplier -> DC -> store (`src/optimizer/multi_echelon.py`).
+
+    Demand per periode = `forecast_next` (rata-rata) untuk `periods` minggu.
+    Buffer service level (level stok pada `target_service` dikurangi rata-rata,
+    lihat `_stock_levels`) dihitung SEKALI sebagai target stok store di akhir
+    horizon, bukan ditambahkan ke demand tiap minggu. on_order store tiba di
+    periode 0. Store dilayani DC region-nya. Stok awal DC = `dc_cover_weeks` x
+    rata-rata demand mingguan wilayahnya (belum ada data stok DC).
+    `lanes` (store_id, lead_weeks, cost) meng-override lead time / biaya per lane.
+
+    Returns
+    -------
+    (orders, transfers, result)
+        orders: order supplier per (dc_id, product_id, period); transfers:
+        kiriman DC -> store (baris non-nol); result: `EchelonResult`.
+    """
+    df = _replenishment_inputs(artifacts)
+    art = artifacts if artifacts is not None else get_store().current()
+    n, T = len(df), int(periods)
+
+    dc = _store_dc(df["store_id"], art.stores)
+    dc_code, dc_ids = pd.factorize(dc)
+    p_code, product_ids = pd.factorize(df["product_id"])
+    D, P = len(dc_ids), len(product_ids)
+
+    weekly = np.maximum(0.0, df["forecast_next"].to_numpy(dtype=float))
+    safety = np.maximum(0.0, _stock_levels(df, target_service)[0] - weekly)
+    demand = np.repeat(weekly[:, None], T, axis=1)
+    receipts = np.zeros((n, T))
+    receipts[:, 0] = df["on_order"].to_numpy(dtype=float)
+    dc_on_hand = np.zeros((D, P))
+    np.add.at(dc_on_hand, (dc_code, p_code), dc_cover_weeks * weekly)
+
+    lead = np.full(n, int(transfer_lead_weeks))
+    lane_cost = np.full(n, float(transfer_cost))
+    if lanes is not None and len(lanes):
+        by_store = lanes.drop_duplicates("store_id", keep="last").set_index("store_id")
+        # cost None -> kolom object; cast ke float dulu supaya None menjadi NaN
+        mapped_lead = df["store_id"].map(by_store["lead_weeks"].astype(float)).to_numpy()
+        lead = np.where(np.isnan(mapped_lead), lead, mapped_lead).astype(np.int64)
+        if "cost" in by_store:
+            mapped_cost = df["store_id"].map(by_store["cost"].astype(float)).to_numpy()
+            lane_cost = np.where(np.isnan(mapped_cost), lane_cost, mapped_cost)
+
+    price = np.full(P, UNIT_PRICE)
+    problem = EchelonProblem(
+        demand=demand,
+        store_on_hand=df["on_hand"].to_numpy(dtype=float),
+        pair_product=p_code,
+        pair_dc=dc_code,
+        dc_on_hand=dc_on_hand,
+        unit_cost=price,
+        dc_holding_cost=0.01 * price,
+        store_holding_cost=0.02 * price,
+        shortage_cost=2.0 * price,
+        transfer_cost=lane_cost,
+        supplier_lead=np.full(D, int(supplier_lead_weeks)),
+        transfer_lead=lead,
+        store_receipts=receipts,
+        budget=None if budget_per_period is None else np.full(T, float(budget_per_period)),
+        safety_stock=safety,
+    )
+    result = solve_multi_echelon(problem)
+    keys = df[ID_COLS].assign(dc_id=np.asarray(dc_ids)[dc_code])
+    orders, transfers = echelon_frames(result, keys, dc_ids, product_ids)
+    return orders, transfers, result
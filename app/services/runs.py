@@ -0,0 +1,165 @@
+"""
+Penyimpanan hasil run optimizer untuk pagination `/replenish`.
+
+Setiap solve `/replenish` mendapat `run_id`; seluruh rencana order disimpan
+(LRU di memori + file Parquet di `REPLENISH_RUN_DIR`) dan halaman berikutnya
+dilayani langsung dari hasil tersimpan lewat `GET /replenish/{run_id}`,
+tanpa solve ulang. File Parquet membuat run tetap bisa dibaca setelah
+restart; hanya `REPLENISH_RUNS_KEEP` file terbaru yang dipertahankan.
+
+Cursor adalah offset baris (string) dalam view yang sudah difilter, jadi
+filter yang sama harus dikirim ulang bersama cursor.
+"""
+
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+from app.services import formats
+
+logger = logging.getLogger(__name__)
+
+RUN_DIR = Path("data/runs")  # default; `REPLENISH_RUN_DIR` dibaca saat store dibuat
+RUNS_IN_MEMORY = int(os.getenv("REPLENISH_RUNS_IN_MEMORY", "32"))
+RUNS_KEEP = int(os.getenv("REPLENISH_RUNS_KEEP", "256"))
+PAGE_SIZE = 100
+MAX_PAGE_SIZE = 5000
+
+
+@dataclass(frozen=True)
+class Run:
+    run_id: str
+    frame: pd.DataFrame
+    meta: Dict[str, str]
+
+
+class InvalidCursor(ValueError):
+    """Cursor bukan offset yang valid."""
+
+
+class RunStore:
+    """
+    Parameters
+    ----------
+    directory : Path, optional
+        Folder file Parquet; None = hanya di memori.
+    max_in_memory : int
+        Jumlah run yang disimpan sebagai DataFrame di memori.
+    keep : int
+        Jumlah file run terbaru yang dipertahankan di disk.
+    """
+
+    def __init__(self, directory: Optional[Path] = RUN_DIR, max_in_memory: int = RUNS_IN_MEMORY, keep: int = RUNS_KEEP):
+        self.directory = Path(directory) if directory is not None else None
+        self.max_in_memory = max(1, max_in_memory)
+        self.keep = keep
+        self._runs: "OrderedDict[str, Run]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, run_id: str) -> Path:
+        return self.directory / f"{run_id}.parquet"
+
+    def save(self, frame: pd.DataFrame, meta: Dict[str, object]) -> Run:
+        """Daftarkan hasil run di memori dan kembalikan `Run` dengan id baru."""
+        run_id = uuid.uuid4().hex[:16]
+        run = Run(run_id=run_id, frame=frame.reset_index(drop=True), meta={k: str(v) for k, v in meta.items()})
+        with self._lock:
+            self._runs[run_id] = run
+            while len(self._runs) > self.max_in_memory:
+                self._runs.popitem(last=False)
+        return run
+
+    def persist(self, run: Run) -> None:
+        """
+        Tulis run ke Parquet (dipanggil sebagai background task setelah
+        response dikirim) lalu pangkas file lama.
+        """
+        if self.directory is None or not formats.ARROW_OK:
+            return
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp = self._path(run.run_id).with_suffix(".tmp")
+            formats.pq.write_table(formats.frame_table(run.frame, run.meta), tmp)
+            os.replace(tmp, self._path(run.run_id))
+            files = sorted(self.directory.glob("*.parquet"), key=lambda p: p.stat().st_mtime_ns, reverse=True)
+            for old in files[self.keep:]:
+                old.unlink(missing_ok=True)
+        except OSError:
+            logger.exception("Gagal menyimpan run %s", run.run_id)
+
+    def get(self, run_id: str) -> Optional[Run]:
+        with self._lock:
+            run = self._runs.get(run_id)
+            if run is not None:
+                self._runs.move_to_end(run_id)
+                return run
+        if self.directory is None or not formats.ARROW_OK or not run_id.isalnum():
+            return None
+        path = self._path(run_id)
+        if not path.exists():
+            return None
+        table = formats.pq.read_table(path)
+        meta = {k.decode(): v.decode() for k, v in (table.schema.metadata or {}).items() if k != b"pandas"}
+        run = Run(run_id=run_id, frame=table.to_pandas(), meta=meta)
+        with self._lock:
+            self._runs[run_id] = run
+            while len(self._runs) > self.max_in_memory:
+                self._runs.popitem(last=False)
+        return run
+
+
+def page(frame: pd.DataFrame, cursor: Optional[str] = None, limit: int = PAGE_SIZE,
+         store_id: Optional[str] = None, product_id: Optional[str] = None) -> Tuple[pd.DataFrame, int, Optional[str]]:
+    """
+    Ambil satu halaman dari hasil run.
+
+    Returns
+    -------
+    (rows, total, next_cursor)
+        `total` = jumlah baris setelah filter; `next_cursor` None di halaman terakhir.
+    """
+    try:
+        start = int(cursor) if cursor else 0
+    except ValueError:
+        raise InvalidCursor(f"cursor tidak valid: {cursor!r}")
+    if start < 0:
+        raise InvalidCursor(f"cursor tidak valid: {cursor!r}")
+
+    view = frame
+    if store_id is not None:
+        view = view[view["store_id"].to_numpy() == store_id]
+    if product_id is not None:
+        view = view[view["product_id"].to_numpy() == product_id]
+    total = len(view)
+    end = start + limit
+    return view.iloc[start:end], total, (str(end) if end < total else None)
+
+
+_STORE: Optional[RunStore] = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_run_store() -> RunStore:
+    """
+    Run store level proses, dibuat lazy. Folder diambil dari env
+    `REPLENISH_RUN_DIR` saat store dibuat (bukan saat import), jadi test /
+    deployment bisa mengarahkannya ke folder lain.
+    """
+    global _STORE
+    if _STORE is None:
+        with _STORE_LOCK:
+            if _STORE is None:
+                _STORE = RunStore(Path(os.getenv("REPLENISH_RUN_DIR", str(RUN_DIR))))
+    return _STORE
+
+
+def now_iso() -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
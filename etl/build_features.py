@@ -1,55 +1,351 @@
+"""
+Bangun fitur mingguan dari data raw -> `data/processed/`.
+
+Mode:
+- full (default)  : hitung ulang seluruh riwayat. `weekly_features.parquet/`
+                    ditulis sebagai dataset hive `year=/week=` (lihat
+                    `src/common/io.py`) lalu menggantikan versi lama sekaligus.
+- `--incremental` : hanya minggu baru. State trailing (`STATE_WEEKS`
+                    observasi terakhir per pasangan, `feature_state.parquet`)
+                    + penjualan baru -> fitur minggu baru ditambahkan sebagai
+                    partisi `year=Y/week=W/`. Waktu ETL mingguan
+                    sebanding jumlah pasangan, tidak tumbuh dengan panjang riwayat.
+- `--streaming`   : full rebuild out-of-core. Store dikelompokkan menjadi
+                    shard (rentang store_id) yang muat dalam `--memory-mb`
+                    (default env `ETL_MEMORY_MB`); penjualan dibaca per shard
+                    (filter rentang store di parquet, atau CSV yang dipecah
+                    per chunk ke file spill), kalender & harga di-join lewat
+                    array lookup kecil, lalu fitur, state, baseline dan
+                    inventory ditulis bertahap per shard/potongan.
+
+Penjualan baru diambil dari `--new-sales` (CSV/parquet berisi minggu baru
+saja) atau, bila tidak diberikan, dari raw sales dengan tanggal setelah
+minggu terakhir di state. Baris yang sudah diproses diabaikan, jadi run
+ulang untuk minggu yang sama tidak menggandakan data.
+
+Contoh:
+    python etl/build_features.py
+    python etl/build_features.py --incremental --new-sales data/raw/sales_2025w02.csv
+    python etl/build_features.py --streaming --memory-mb 1024
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import time
 from pathlib import Path
-import pandas as pd
+
 import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.common.io import is_partitioned, replace_dir, write_feature_partitions  # noqa: E402
+from src.forecasting.features import (  # noqa: E402
+    MasterLookup,
+    baseline_forecast,
+    extend_features,
+    feature_frame,
+    prepare_sales,
+    trailing_state,
+    training_rows,
+)
+
+RAW = Path("data/raw"); PROC = Path("data/processed")
+FEATURES = "weekly_features.parquet"
+STATE = "feature_state.parquet"
+MEMORY_MB = int(os.getenv("ETL_MEMORY_MB", "2048"))
+# model memori mode streaming: BASE_MB (interpreter + pandas/pyarrow) +
+# BYTES_PER_ROW per baris penjualan dalam satu shard (input + kolom fitur +
+# buffer sort/salinan pandas + tabel Arrow saat ditulis); terukur ~150 MB + ~850 B/baris
+BASE_MB = 160
+BYTES_PER_ROW = 960
+READ_BATCH_ROWS = 1_000_000
+
+
+def read_table(path: Path, filters=None, **csv_kwargs) -> pd.DataFrame:
+    """Folder parquet (shard), file parquet, atau CSV; id categorical -> string biasa."""
+    if path.is_dir() or path.suffix == ".parquet":
+        df = pd.read_parquet(path, filters=filters)
+        # id disimpan sebagai dictionary -> kembalikan ke string biasa untuk groupby/merge
+        for col in df.columns[df.dtypes == "category"]:
+            df[col] = df[col].astype(str)
+        if "date" in df.columns:
+            df["date"] = pd.to_datetime(df["date"])
+        return df
+    return pd.read_csv(path, **csv_kwargs)
+
+
+def read_raw(name, raw: Path = RAW, **csv_kwargs):
+    """`data/raw/<name>/` (parquet shard dari generate_dummy --format parquet) atau `<name>.csv`."""
+    return read_table(raw/name if (raw/name).is_dir() else raw/f"{name}.csv", **csv_kwargs)
+
+
+def _write_atomic(df: pd.DataFrame, path: Path) -> None:
+    """Tulis ke file sementara lalu rename, supaya pembaca tidak melihat file setengah jadi."""
+    tmp = path.with_name(f".{path.name}.tmp")
+    df.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def _ids_to_str(df: pd.DataFrame) -> pd.DataFrame:
+    for col in df.columns[df.dtypes == "category"]:
+        df[col] = df[col].astype(str)
+    return df
+
+
+class ParquetAppender:
+    """Tulis DataFrame per potongan ke satu file parquet; file sementara di-rename saat `close()`."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.tmp = path.with_name(f".{path.name}.tmp")
+        self._writer = None
+
+    def write(self, df: pd.DataFrame) -> None:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.tmp, table.schema)
+        self._writer.write_table(table.cast(self._writer.schema))
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            os.replace(self.tmp, self.path)
+
+
+def _iter_raw(name: str, raw: Path, batch_rows: int, columns=None, ids_as_str: bool = True, **csv_kwargs):
+    """`data/raw/<name>` per potongan `batch_rows` baris (record batch parquet / chunk CSV)."""
+    if (raw/name).is_dir():
+        for batch in ds.dataset(raw/name, format="parquet").to_batches(columns=columns, batch_size=batch_rows):
+            df = batch.to_pandas()
+            yield _ids_to_str(df) if ids_as_str else df
+    else:
+        yield from pd.read_csv(raw/f"{name}.csv", usecols=columns, chunksize=batch_rows, **csv_kwargs)
+
+
+def write_inventory(raw: Path, proc: Path, products: pd.DataFrame, batch_rows: int = READ_BATCH_ROWS) -> None:
+    """inventory_latest + lot sizing per produk, dibaca & ditulis per potongan."""
+    # lot sizing per produk (master lama tanpa kolom ini -> pack 1, tanpa MOQ)
+    lots = products.reindex(columns=["product_id", "case_pack", "moq"])
+    index = pd.Index(lots["product_id"].astype(str))
+    out = ParquetAppender(proc/"inventory_latest.parquet")
+    for inv in _iter_raw("inventory_latest", raw, batch_rows):
+        pos = index.get_indexer(inv["product_id"].astype(str))
+        for col, default in (("case_pack", 1), ("moq", 0)):
+            values = lots[col].to_numpy(dtype=float)
+            inv[col] = np.where(pos >= 0, values[pos], np.nan) if len(values) else np.nan
+            inv[col] = inv[col].fillna(default).astype(int)
+        out.write(inv)
+    out.close()
+
+
+def write_outputs(proc: Path, raw: Path, products: pd.DataFrame, frame: pd.DataFrame, state: pd.DataFrame) -> None:
+    """forecast_baseline, feature_state, inventory_latest (sama untuk kedua mode)."""
+    # baseline forecast_next untuk input optimizer (mean of last 4)
+    _write_atomic(baseline_forecast(frame), proc/"forecast_baseline.parquet")
+    _write_atomic(state, proc/STATE)
+    write_inventory(raw, proc, products)
+
+
+def store_row_counts(raw: Path, batch_rows: int = READ_BATCH_ROWS) -> pd.Series:
+    """Jumlah baris penjualan per store (urut store_id); hanya kolom store_id yang dibaca."""
+    counts = pd.Series(dtype=np.int64)
+    # id categorical (shard parquet) dihitung lewat kode, tanpa konversi ke string per baris
+    for chunk in _iter_raw("sales", raw, batch_rows, columns=["store_id"], ids_as_str=False):
+        vc = chunk["store_id"].value_counts()
+        vc = vc[vc > 0]
+        vc.index = vc.index.astype(str)
+        counts = counts.add(vc, fill_value=0)
+    return counts.sort_index().astype(np.int64)
+
+
+def plan_shards(counts: pd.Series, max_rows: int):
+    """
+    Kelompokkan store berurutan menjadi shard dengan total baris <= `max_rows`
+    (store yang sendirian melebihi batas tetap menjadi satu shard).
+
+    Returns
+    -------
+    list of (lo, hi)
+        Rentang store_id inklusif per shard, urut naik.
+    """
+    shards, lo, rows = [], None, 0
+    for store, n in counts.items():
+        if lo is not None and rows + n > max_rows:
+            shards.append((lo, prev))
+            lo, rows = None, 0
+        if lo is None:
+            lo = store
+        rows += n
+        prev = store
+    if lo is not None:
+        shards.append((lo, prev))
+    return shards
+
+
+def iter_store_shards(raw: Path, shards, spill: Path, batch_rows: int = READ_BATCH_ROWS):
+    """
+    Penjualan per shard store -> (k, DataFrame).
+
+    Shard parquet dibaca dengan filter rentang store (row group/file store
+    lain dilewati lewat statistik). CSV tidak bisa difilter, jadi dibaca
+    sekali per chunk dan dipecah ke `spill/shard-k/` lebih dulu.
+    """
+    if (raw/"sales").is_dir():
+        dset = ds.dataset(raw/"sales", format="parquet")
+        for k, (lo, hi) in enumerate(shards):
+            expr = (ds.field("store_id") >= lo) & (ds.field("store_id") <= hi)
+            yield k, _ids_to_str(dset.to_table(filter=expr).to_pandas())
+        return
+
+    his = pd.Index([hi for _, hi in shards])
+    for j, chunk in enumerate(_iter_raw("sales", raw, batch_rows, parse_dates=["date"])):
+        codes, stores = pd.factorize(chunk["store_id"].astype(str))
+        shard = his.searchsorted(stores, side="left")[codes]
+        for k, part in chunk.groupby(shard, sort=False):
+            (spill/f"shard-{k:05d}").mkdir(parents=True, exist_ok=True)
+            part.to_parquet(spill/f"shard-{k:05d}"/f"chunk-{j:05d}.parquet", index=False)
+    for k in range(len(shards)):
+        if (spill/f"shard-{k:05d}").exists():
+            yield k, read_table(spill/f"shard-{k:05d}")
+
+
+def build_full(raw: Path = RAW, proc: Path = PROC) -> int:
+    """Full rebuild; mengembalikan jumlah baris fitur."""
+    proc.mkdir(parents=True, exist_ok=True)
+    sales = read_raw("sales", raw, parse_dates=["date"])
+    cal = pd.read_csv(raw/"calendar.csv", parse_dates=["date"])
+    products = pd.read_csv(raw/"products.csv")
+
+    frame = feature_frame(prepare_sales(sales, cal, products))
+    rows = training_rows(frame)
+
+    # dataset baru dirakit di folder sementara lalu menggantikan file tunggal
+    # (format lama) / dataset lama sekaligus
+    tmp = proc/f".{FEATURES}.tmp"
+    if tmp.exists():
+        shutil.rmtree(tmp)
+    write_feature_partitions(rows, tmp)
+    replace_dir(tmp, proc/FEATURES)
 
-RAW = Path("data/raw"); PROC = Path("data/processed"); PROC.mkdir(parents=True, exist_ok=True)
+    write_outputs(proc, raw, products, frame, trailing_state(frame))
+    return len(rows)
 
-sales = pd.read_csv(RAW/"sales.csv", parse_dates=["date"]) 
-cal = pd.read_csv(RAW/"calendar.csv", parse_dates=["date"]) 
-products = pd.read_csv(RAW/"products.csv")
-stores = pd.read_csv(RAW/"stores.csv")
 
-# weekly aggregate is already weekly; derive keys
-sales["year"] = sales["date"].dt.year
-sales["week"] = sales["date"].dt.isocalendar().week.astype(int)
+def build_streaming(raw: Path = RAW, proc: Path = PROC, memory_mb: int = MEMORY_MB) -> int:
+    """
+    Full rebuild out-of-core: penjualan diproses per shard store sehingga
+    puncak memori mengikuti `memory_mb`, bukan ukuran dataset. Hasil sama
+    dengan `build_full`; mengembalikan jumlah baris fitur.
+    """
+    proc.mkdir(parents=True, exist_ok=True)
+    cal = pd.read_csv(raw/"calendar.csv", parse_dates=["date"])
+    products = pd.read_csv(raw/"products.csv")
+    # master kecil di-broadcast ke setiap shard sebagai array lookup (tanpa merge)
+    lookup = MasterLookup.from_masters(cal, products)
 
-# join calendar flags
-sales = sales.merge(cal[["date","is_holiday"]], on="date", how="left")
+    max_rows = max(1, (memory_mb - BASE_MB) * 2**20 // BYTES_PER_ROW)
+    batch_rows = min(max_rows, READ_BATCH_ROWS)
+    counts = store_row_counts(raw, batch_rows)
+    shards = plan_shards(counts, max_rows)
+    over = counts[counts > max_rows]
+    if len(over):
+        print(f"{len(over)} store melebihi budget {memory_mb} MB (terbesar {over.max():,} baris); masing-masing jadi satu shard")
+    print(f"{counts.sum():,} baris penjualan, {len(counts):,} store -> {len(shards)} shard (<= {max_rows:,} baris)")
 
-# simple price proxy: map by product
-price_map = products.set_index("product_id")["price"].to_dict()
-sales["price"] = sales["product_id"].map(price_map)
+    tmp = proc/f".{FEATURES}.tmp"
+    spill = proc/".sales_spill"
+    for path in (tmp, spill):
+        if path.exists():
+            shutil.rmtree(path)
+    state_out = ParquetAppender(proc/STATE)
+    baseline_out = ParquetAppender(proc/"forecast_baseline.parquet")
+    total = 0
+    try:
+        for k, sales in iter_store_shards(raw, shards, spill, batch_rows):
+            frame = feature_frame(prepare_sales(sales, lookup=lookup))
+            del sales
+            rows = training_rows(frame)
+            # satu file per (minggu, shard); shard = rentang store, jadi statistik per file tetap sempit
+            write_feature_partitions(rows, tmp, basename=f"part-{k:05d}")
+            state_out.write(trailing_state(frame))
+            baseline_out.write(baseline_forecast(frame))
+            total += len(rows)
+            del frame, rows
+    finally:
+        shutil.rmtree(spill, ignore_errors=True)
 
-# lag features per store-product
-sales = sales.sort_values(["store_id","product_id","date"]).reset_index(drop=True)
-for lag in [1,2,4,52]:
-    sales[f"lag_{lag}"] = sales.groupby(["store_id","product_id"])['units_sold'].shift(lag)
+    replace_dir(tmp, proc/FEATURES)
+    state_out.close()
+    baseline_out.close()
+    write_inventory(raw, proc, products, batch_rows)
+    return total
 
-# rolling means
-for win in [4,8,12]:
-    sales[f"rollmean_{win}"] = sales.groupby(["store_id","product_id"])['units_sold'].shift(1).rolling(win).mean()
 
-# cyclical seasonality
-sales["woy"] = sales["week"]
-sales["sin_woy"] = np.sin(2*np.pi*sales["woy"]/52)
-sales["cos_woy"] = np.cos(2*np.pi*sales["woy"]/52)
+def build_incremental(new_sales: Path = None, raw: Path = RAW, proc: Path = PROC) -> int:
+    """Tambahkan fitur minggu baru sebagai partisi baru; mengembalikan jumlah baris baru."""
+    out = proc/FEATURES
+    if not (proc/STATE).exists() or not is_partitioned(out):
+        print("state/dataset partisi belum ada -> full rebuild")
+        return build_full(raw, proc)
 
-# drop nas for training rows
-feat_cols = ["is_holiday","price","lag_1","lag_2","lag_4","rollmean_4","rollmean_8","rollmean_12","sin_woy","cos_woy"]
-train_df = sales.dropna(subset=feat_cols + ["units_sold"]).copy()
+    state = pd.read_parquet(proc/STATE)
+    last = state["date"].max()
+    if new_sales is not None:
+        new = read_table(new_sales, parse_dates=["date"])
+    elif (raw/"sales").is_dir():
+        # shard parquet: filter tanggal didorong ke reader, row group lama dilewati
+        new = read_table(raw/"sales", filters=[("date", ">", last)])
+    else:
+        # CSV tidak bisa dilompati: dibaca per chunk dan hanya baris > last yang
+        # disimpan (memori ~ minggu baru). Tanggal ISO dibandingkan sebagai
+        # string; parse datetime hanya untuk baris yang lolos.
+        print("sales.csv di-scan penuh; pakai --new-sales atau shard parquet supaya biaya ~ minggu baru")
+        cutoff = f"{last:%Y-%m-%d}"
+        new = pd.concat(
+            [chunk[chunk["date"].str.slice(0, 10) > cutoff] for chunk in _iter_raw("sales", raw, READ_BATCH_ROWS)],
+            ignore_index=True,
+        )
+        new["date"] = pd.to_datetime(new["date"])
+    stale = int((new["date"] <= last).sum())
+    if stale and new_sales is not None:
+        print(f"{stale} baris dengan tanggal <= {last:%Y-%m-%d} diabaikan (sudah diproses)")
 
-# save features
-train_df[['store_id','product_id','year','week','units_sold'] + feat_cols].to_parquet(PROC/"weekly_features.parquet", index=False)
+    cal = pd.read_csv(raw/"calendar.csv", parse_dates=["date"])
+    products = pd.read_csv(raw/"products.csv")
+    rows, new_state, frame = extend_features(state, new, cal, products)
+    if not len(rows):
+        print("tidak ada minggu baru")
+        return 0
+    write_feature_partitions(rows, out)
+    write_outputs(proc, raw, products, frame, new_state)
+    return len(rows)
 
-# also create baseline forecast_next for optimizer input (mean of last 4)
-last4 = sales.groupby(["store_id","product_id"]).tail(4)
-base_fc = last4.groupby(["store_id","product_id"])['units_sold'].mean().reset_index(name="forecast_next")
-base_fc.to_parquet(PROC/"forecast_baseline.parquet", index=False)
 
-# inventory latest parquet
-inv = pd.read_csv(RAW/"inventory_latest.csv")
-inv.to_parquet(PROC/"inventory_latest.parquet", index=False)
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--incremental", action="store_true", help="hanya minggu baru (butuh state dari run sebelumnya)")
+    ap.add_argument("--new-sales", type=Path, default=None, help="CSV/parquet penjualan minggu baru")
+    ap.add_argument("--streaming", action="store_true", help="full rebuild per shard store dengan memori terbatas")
+    ap.add_argument("--memory-mb", type=int, default=MEMORY_MB, help="budget memori mode streaming (MB)")
+    ap.add_argument("--raw", type=Path, default=RAW)
+    ap.add_argument("--out", type=Path, default=PROC)
+    args = ap.parse_args()
 
-print("Features & processed artifacts saved to data/processed/")
+    t0 = time.perf_counter()
+    if args.incremental:
+        rows = build_incremental(args.new_sales, args.raw, args.out)
+    elif args.streaming:
+        rows = build_streaming(args.raw, args.out, args.memory_mb)
+    else:
+        rows = build_full(args.raw, args.out)
+    elapsed = time.perf_counter() - t0
+    print(f"Features & processed artifacts saved to {args.out}/ ({rows:,} feature rows, {elapsed:.1f}s)")
 
 
+if __name__ == "__main__":
+    main()
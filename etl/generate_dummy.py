@@ -1,54 +1,184 @@
+"""
+Generator data dummy (master, kalender, penjualan mingguan, inventory).
+
+Penjualan dibangkitkan vectorized per shard store: satu array
+(store, product, week) dengan broadcasting
+    units = max(0, base + amp * sin(2 pi week / 52) + holiday_boost + noise)
+lalu ditulis per shard, sehingga memori dibatasi `--shard-rows` dan tidak
+tumbuh dengan ukuran dataset (10k store x 5k SKU x 104 minggu = 5,2 miliar
+baris tetap bisa dibuat, asal disk cukup).
+
+RNG: master memakai `default_rng([seed, 0])`, shard ke-k memakai
+`default_rng([seed, 1, k])`; hasil deterministik untuk (seed, shard-rows)
+yang sama dan shard bisa dibangkitkan paralel (`--workers`, mode parquet).
+
+Output (`--format`):
+- csv     : `sales.csv` dan `inventory_latest.csv`, ditulis append per shard.
+- parquet : folder `sales/` dan `inventory_latest/` berisi `part-XXXXX.parquet`
+            per shard (id sebagai dictionary/categorical).
+
+Contoh:
+    python etl/generate_dummy.py                                   # 20 store x 50 SKU x 104 minggu
+    python etl/generate_dummy.py --stores 10000 --products 5000 --format parquet --workers 4
+"""
+
+import argparse
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+
 import numpy as np
 import pandas as pd
 
-RAW = Path("data/raw"); RAW.mkdir(parents=True, exist_ok=True)
-np.random.seed(42)
-
-# master tables
-products = []
-for i in range(1, 51):
-    products.append({"product_id": f"P{i:03d}", "category": np.random.choice(["Footwear","Apparel","Accessories"]), "brand": "Nike", "cost": float(np.random.uniform(15,35)), "price": float(np.random.uniform(40,120))})
-
-stores = []
-for i in range(1, 21):
-    stores.append({"store_id": f"S{i:03d}", "region": np.random.choice(["NW","SW","NE","SE"]), "size_tier": np.random.choice(["S","M","L"])})
-
-# calendar (104 weeks)
-weeks = pd.date_range("2023-01-02", periods=104, freq="W-MON")
-cal = pd.DataFrame({"date": weeks})
-cal["year"] = cal["date"].dt.year
-cal["week"] = cal["date"].dt.isocalendar().week.astype(int)
-cal["is_holiday"] = cal["week"].isin([47,48,49,50,51,52]).astype(int)
-cal.to_csv(RAW/"calendar.csv", index=False)
-
-pd.DataFrame(products).to_csv(RAW/"products.csv", index=False)
-pd.DataFrame(stores).to_csv(RAW/"stores.csv", index=False)
-
-# sales weekly synthetic
-rows = []
-for s in stores:
-    for p in products:
-        base = np.random.uniform(3, 15)
-        season_amp = np.random.uniform(0.5, 3.0)
-        noise = np.random.normal
-        for _, r in cal.iterrows():
-            w = r["week"]
-            season = season_amp * np.sin(2*np.pi*w/52)
-            holiday_boost = 3.0 if r["is_holiday"] else 0.0
-            units = max(0, base + season + holiday_boost + noise(0, 2))
-            rows.append({"date": r["date"].date(), "store_id": s["store_id"], "product_id": p["product_id"], "units_sold": round(units)})
-
-sales = pd.DataFrame(rows)
-sales.to_csv(RAW/"sales.csv", index=False)
-
-# inventory snapshot (latest week)
-inv_rows = []
-for s in stores:
-    for p in products:
-        inv_rows.append({"store_id": s["store_id"], "product_id": p["product_id"], "on_hand": int(np.random.uniform(0, 60)), "on_order": int(np.random.uniform(0, 20)), "demand_std": float(np.random.uniform(1.0, 4.0))})
-
-pd.DataFrame(inv_rows).to_csv(RAW/"inventory_latest.csv", index=False)
-print("Dummy data generated into data/raw/")
+RAW = Path("data/raw")
+HOLIDAY_WEEKS = [47, 48, 49, 50, 51, 52]
+SHARD_ROWS = 5_000_000
+
+
+def _ids(prefix: str, n: int) -> np.ndarray:
+    width = max(3, len(str(n)))
+    return np.array([f"{prefix}{i:0{width}d}" for i in range(1, n + 1)], dtype=object)
+
+
+def build_masters(n_stores: int, n_products: int, n_weeks: int, start: str, seed: int):
+    """products, stores, calendar sebagai DataFrame (kecil, dibuat sekali)."""
+    rng = np.random.default_rng([seed, 0])
+    products = pd.DataFrame({
+        "product_id": _ids("P", n_products),
+        "category": rng.choice(["Footwear", "Apparel", "Accessories"], n_products),
+        "brand": "Nike",
+        "cost": rng.uniform(15, 35, n_products),
+        "price": rng.uniform(40, 120, n_products),
+    })
+    products["case_pack"] = rng.choice([1, 2, 6, 12], n_products)
+    products["moq"] = products["case_pack"] * rng.choice([1, 1, 2], n_products)
+    stores = pd.DataFrame({
+        "store_id": _ids("S", n_stores),
+        "region": rng.choice(["NW", "SW", "NE", "SE"], n_stores),
+        "size_tier": rng.choice(["S", "M", "L"], n_stores),
+    })
+    cal = pd.DataFrame({"date": pd.date_range(start, periods=n_weeks, freq="W-MON")})
+    cal["year"] = cal["date"].dt.year
+    cal["week"] = cal["date"].dt.isocalendar().week.astype(int)
+    cal["is_holiday"] = cal["week"].isin(HOLIDAY_WEEKS).astype(int)
+    return products, stores, cal
+
+
+def shard_frames(k: int, store_lo: int, store_hi: int, store_ids, product_ids, cal: pd.DataFrame, seed: int):
+    """
+    Penjualan + inventory untuk store [store_lo, store_hi). Baris urut
+    (store, product, week) seperti generator lama.
+    """
+    rng = np.random.default_rng([seed, 1, k])
+    S, P, W = store_hi - store_lo, len(product_ids), len(cal)
+
+    base = rng.uniform(3, 15, (S, P, 1)).astype(np.float32)
+    amp = rng.uniform(0.5, 3.0, (S, P, 1)).astype(np.float32)
+    season = np.sin(2 * np.pi * cal["week"].to_numpy() / 52).astype(np.float32)
+    boost = np.where(cal["is_holiday"].to_numpy() == 1, 3.0, 0.0).astype(np.float32)
+    units = rng.standard_normal((S, P, W), dtype=np.float32)
+    units *= 2.0
+    units += base
+    units += amp * season
+    units += boost
+    np.maximum(units, 0.0, out=units)
+    units = np.rint(units).astype(np.int32).ravel()
+
+    store_cat = pd.CategoricalDtype(store_ids[store_lo:store_hi])
+    product_cat = pd.CategoricalDtype(product_ids)
+    store_codes = np.arange(S, dtype=np.int32)
+    product_codes = np.arange(P, dtype=np.int32)
+    sales = pd.DataFrame({
+        "date": np.tile(cal["date"].to_numpy(), S * P),
+        "store_id": pd.Categorical.from_codes(np.repeat(store_codes, P * W), dtype=store_cat),
+        "product_id": pd.Categorical.from_codes(np.tile(np.repeat(product_codes, W), S), dtype=product_cat),
+        "units_sold": units,
+    })
+    inventory = pd.DataFrame({
+        "store_id": pd.Categorical.from_codes(np.repeat(store_codes, P), dtype=store_cat),
+        "product_id": pd.Categorical.from_codes(np.tile(product_codes, S), dtype=product_cat),
+        "on_hand": rng.integers(0, 60, S * P),
+        "on_order": rng.integers(0, 20, S * P),
+        "demand_std": rng.uniform(1.0, 4.0, S * P),
+    })
+    return sales, inventory
+
+
+def _write_parquet_shard(job) -> int:
+    k, lo, hi, store_ids, product_ids, cal, seed, out = job
+    sales, inventory = shard_frames(k, lo, hi, store_ids, product_ids, cal, seed)
+    sales.to_parquet(out / "sales" / f"part-{k:05d}.parquet", index=False)
+    inventory.to_parquet(out / "inventory_latest" / f"part-{k:05d}.parquet", index=False)
+    return len(sales)
+
+
+def _reset(path: Path) -> None:
+    if path.is_dir():
+        shutil.rmtree(path)
+    elif path.exists():
+        path.unlink()
+
+
+def generate(n_stores=20, n_products=50, n_weeks=104, start="2023-01-02", seed=42,
+             fmt="csv", shard_rows=SHARD_ROWS, workers=1, out: Path = RAW) -> int:
+    """Bangkitkan seluruh dataset ke `out`; mengembalikan jumlah baris penjualan."""
+    out.mkdir(parents=True, exist_ok=True)
+    products, stores, cal = build_masters(n_stores, n_products, n_weeks, start, seed)
+    cal.to_csv(out / "calendar.csv", index=False)
+    products.to_csv(out / "products.csv", index=False)
+    stores.to_csv(out / "stores.csv", index=False)
+
+    # format lain dari run sebelumnya dihapus supaya ETL tidak membaca data basi
+    for name in ("sales", "inventory_latest"):
+        _reset(out / name)
+        _reset(out / f"{name}.csv")
+
+    per_shard = max(1, shard_rows // max(1, n_products * n_weeks))
+    store_ids = stores["store_id"].to_numpy()
+    product_ids = products["product_id"].to_numpy()
+    jobs = [
+        (k, lo, min(lo + per_shard, n_stores), store_ids, product_ids, cal, seed, out)
+        for k, lo in enumerate(range(0, n_stores, per_shard))
+    ]
+
+    if fmt == "parquet":
+        (out / "sales").mkdir()
+        (out / "inventory_latest").mkdir()
+        if workers > 1 and len(jobs) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as ex:
+                return sum(ex.map(_write_parquet_shard, jobs))
+        return sum(map(_write_parquet_shard, jobs))
+
+    total = 0
+    for job in jobs:
+        sales, inventory = shard_frames(*job[:7])
+        first = job[0] == 0
+        sales.to_csv(out / "sales.csv", mode="w" if first else "a", header=first, index=False)
+        inventory.to_csv(out / "inventory_latest.csv", mode="w" if first else "a", header=first, index=False)
+        total += len(sales)
+    return total
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--stores", type=int, default=20)
+    ap.add_argument("--products", type=int, default=50)
+    ap.add_argument("--weeks", type=int, default=104)
+    ap.add_argument("--start", default="2023-01-02", help="Senin pertama kalender")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    ap.add_argument("--shard-rows", type=int, default=SHARD_ROWS, help="batas baris penjualan per shard (memori)")
+    ap.add_argument("--workers", type=int, default=1, help="proses paralel (mode parquet)")
+    ap.add_argument("--out", type=Path, default=RAW)
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    rows = generate(args.stores, args.products, args.weeks, args.start, args.seed,
+                    args.format, args.shard_rows, args.workers, args.out)
+    elapsed = time.perf_counter() - t0
+    print(f"Dummy data generated into {args.out}/ ({rows:,} sales rows, {args.format}, {elapsed:.1f}s)")
 
 
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,150 @@
-# Placeholder for backtesting pipeline (WAPE, service level). Implement later.
-print("Backtest placeholder. Coming soon.")
+"""
+Backtest kebijakan replenishment dengan KPI inventory dari
+`docs/problem_contract.md`: fill-rate, stockout weeks, total cost
+(holding + stockout + ordering).
 
+Mode data (default): weekly_features dibagi di minggu T - horizon. Demand
+mean/std per pasangan diestimasi dari `--window` minggu training terakhir,
+lalu beberapa policy order-up-to (satu per target service, plus baseline
+tanpa safety stock) disimulasikan:
+- backtest  : demand aktual minggu holdout (satu skenario),
+- montecarlo: `--scenarios` skenario dari distribusi forecast.
 
+Mode sintetis (`--synthetic-pairs N`): hanya mengukur waktu simulasi untuk
+N pasangan x `--weeks` x `--scenarios` (mis. 100k x 52 x 100).
+
+Contoh:
+    python scripts/backtest.py --horizon 12 --scenarios 200
+    python scripts/backtest.py --synthetic-pairs 100000 --weeks 52 --scenarios 100
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from scipy.stats import norm  # noqa: E402
+
+from src.common.config import PROCESSED_DIR  # noqa: E402
+from src.common.io import read_features  # noqa: E402
+from src.optimizer.simple_policy import OrderUpToPolicy  # noqa: E402
+from src.optimizer.simulation import simulate  # noqa: E402
+
+FEAT_PATH = PROCESSED_DIR / "weekly_features.parquet"
+INV_PATH = PROCESSED_DIR / "inventory_latest.parquet"
+KEYS = ["store_id", "product_id"]
+
+
+def load_pairs(horizon: int, window: int) -> pd.DataFrame:
+    """Satu baris per pasangan: mean/std training, harga, pack/moq, aktual holdout (kolom a0..)."""
+    # hanya minggu training window + holdout yang dibaca (partisi lain dilewati)
+    df = read_features(FEAT_PATH, columns=KEYS + ["year", "week", "units_sold", "price"], last_weeks=horizon + window)
+    df["time_key"] = df["year"] * 100 + df["week"]
+    weeks = np.sort(df["time_key"].unique())
+    if len(weeks) <= horizon + 1:
+        raise SystemExit(f"butuh lebih dari {horizon + 1} minggu data, ada {len(weeks)}")
+    hold = weeks[-horizon:]
+    train = df[df["time_key"].isin(weeks[-horizon - window : -horizon])]
+
+    stats = train.groupby(KEYS).agg(mean=("units_sold", "mean"), std=("units_sold", "std"), price=("price", "last"))
+    stats["std"] = stats["std"].fillna(0.0)
+    actual = (
+        df[df["time_key"].isin(hold)]
+        .pivot_table(index=KEYS, columns="time_key", values="units_sold", aggfunc="sum")
+        .reindex(columns=hold)
+        .fillna(0.0)
+    )
+    actual.columns = [f"a{i}" for i in range(horizon)]
+    out = stats.join(actual, how="inner")
+    if INV_PATH.exists():
+        inv = pd.read_parquet(INV_PATH).set_index(KEYS)
+        for col, default in (("case_pack", 1), ("moq", 0)):
+            out[col] = inv[col].reindex(out.index).fillna(default) if col in inv.columns else default
+    else:
+        out["case_pack"], out["moq"] = 1, 0
+    return out.reset_index()
+
+
+def run_policies(pairs: pd.DataFrame, args) -> pd.DataFrame:
+    n = len(pairs)
+    lead = np.full(n, args.lead_weeks)
+    mean, std, price = (pairs[c].to_numpy(dtype=float) for c in ("mean", "std", "price"))
+    actuals = pairs[[f"a{i}" for i in range(args.horizon)]].to_numpy(dtype=float)
+    costs = dict(
+        holding_cost=args.holding_rate * price,
+        shortage_cost=args.shortage_mult * price,
+        order_cost=args.order_cost,
+        unit_cost=price,
+    )
+    rows = []
+    for service in [None] + args.service:
+        z = 0.0 if service is None else float(norm.ppf(service))
+        pol = OrderUpToPolicy.from_forecast(
+            mean, std, lead, z,
+            case_pack=pairs["case_pack"].to_numpy(dtype=float), moq=pairs["moq"].to_numpy(dtype=float),
+        )
+        # mulai dari kondisi tunak: stok awal = level tanpa pipeline
+        start = pol.levels
+        for mode, kw in (
+            ("backtest", dict(actuals=actuals)),
+            ("montecarlo", dict(demand_mean=mean, demand_std=std, scenarios=args.scenarios, seed=args.seed)),
+        ):
+            res = simulate(pol, start, lead, args.horizon, **kw, **costs)
+            rows.append({"policy": "baseline" if service is None else f"out_{service:.2f}", "mode": mode,
+                         **res.summary(), "seconds": res.seconds})
+    return pd.DataFrame(rows)
+
+
+def synthetic(args) -> None:
+    rng = np.random.default_rng(args.seed)
+    n = args.synthetic_pairs
+    mean = rng.gamma(2.0, 5.0, n)
+    std = mean * rng.uniform(0.2, 0.6, n)
+    lead = rng.integers(0, 4, n)
+    pol = OrderUpToPolicy.from_forecast(mean, std, lead, float(norm.ppf(0.95)), case_pack=rng.choice([1, 6, 12], n))
+    t0 = time.perf_counter()
+    res = simulate(pol, pol.levels, lead, args.weeks, demand_mean=mean, demand_std=std,
+                   scenarios=args.scenarios, holding_cost=0.5, shortage_cost=20.0, order_cost=5.0, seed=args.seed)
+    elapsed = time.perf_counter() - t0
+    cells = n * args.weeks * args.scenarios
+    print(f"pairs={n} weeks={args.weeks} scenarios={args.scenarios}: {elapsed:.2f}s "
+          f"({cells / elapsed / 1e6:.0f}M pair-week-scenario/s)")
+    print(pd.Series(res.summary()).to_string())
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--horizon", type=int, default=12, help="minggu holdout (mode data)")
+    ap.add_argument("--window", type=int, default=26, help="minggu training untuk mean/std")
+    ap.add_argument("--service", type=float, nargs="+", default=[0.9, 0.95, 0.98])
+    ap.add_argument("--lead-weeks", type=int, default=1)
+    ap.add_argument("--scenarios", type=int, default=100)
+    ap.add_argument("--holding-rate", type=float, default=0.02, help="holding per minggu, fraksi harga")
+    ap.add_argument("--shortage-mult", type=float, default=2.0, help="biaya lost sale, kelipatan harga")
+    ap.add_argument("--order-cost", type=float, default=10.0, help="biaya tetap per order")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", type=Path, default=None, help="simpan tabel KPI ke CSV")
+    ap.add_argument("--synthetic-pairs", type=int, default=0)
+    ap.add_argument("--weeks", type=int, default=52, help="horizon mode sintetis")
+    args = ap.parse_args()
+
+    if args.synthetic_pairs:
+        synthetic(args)
+        return
+
+    pairs = load_pairs(args.horizon, args.window)
+    table = run_policies(pairs, args)
+    with pd.option_context("display.width", 160, "display.float_format", "{:,.4f}".format):
+        print(f"pairs={len(pairs)} horizon={args.horizon} lead={args.lead_weeks} scenarios={args.scenarios}")
+        print(table.to_string(index=False))
+    if args.out is not None:
+        table.to_csv(args.out, index=False)
+
+
+if __name__ == "__main__":
+    main()
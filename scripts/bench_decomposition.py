@@ -0,0 +1,65 @@
+"""
+Benchmark dekomposisi LP replenishment per store / region
+(`src/optimizer/decomposition.py`) vs solve monolitik.
+
+Memakai instance sintetis yang sama dengan `bench_multi_period.py`; store
+dikelompokkan ke `--regions` region untuk mode region. `--workers` bisa berisi
+beberapa nilai: tiap nilai dijalankan dan speedup dilaporkan relatif ke run
+pertama. Dari run 1 worker juga dicetak batas atas speedup (Amdahl): hanya
+solve subproblem yang paralel; koordinasi harga, repair budget dan simulasi
+maju tetap serial. Jumlah worker di atas jumlah core tidak bisa diukur
+(dicetak peringatan).
+
+Contoh:
+    python scripts/bench_decomposition.py --pairs 20000 --periods 8 --workers 1 2 4 --by region
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from scripts.bench_multi_period import synthetic_problem  # noqa: E402
+from src.optimizer.decomposition import solve_decomposed  # noqa: E402
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pairs", type=int, default=5000)
+    ap.add_argument("--periods", type=int, default=8)
+    ap.add_argument("--workers", type=int, nargs="+", default=[1])
+    ap.add_argument("--by", choices=["store", "region"], default="region")
+    ap.add_argument("--regions", type=int, default=8)
+    ap.add_argument("--max-iter", type=int, default=30)
+    args = ap.parse_args()
+
+    prob = synthetic_problem(args.pairs, args.periods)
+    groups = prob.store_codes if args.by == "store" else prob.store_codes % args.regions
+    cores = os.cpu_count() or 1
+    print(f"pairs={args.pairs} periods={args.periods} by={args.by} cores={cores}")
+
+    base = None
+    for i, workers in enumerate(args.workers):
+        res = solve_decomposed(prob, groups, workers=workers, max_iter=args.max_iter, compare_monolithic=i == 0)
+        if i == 0:
+            print(f"monolithic : {res.monolithic_seconds:.2f} s, objective={res.monolithic_objective:,.0f}")
+            print(f"gap vs monolithic={res.gap_vs_monolithic:.4%} | dual gap (upper bound)={res.dual_gap:.4%}")
+            print(f"lambda={np.round(res.lambdas, 4).tolist()}")
+        solve = sum(h["solve_seconds"] for h in res.history)
+        base = base or res.seconds
+        note = f"  (> {cores} core: tidak terukur)" if workers > cores else ""
+        print(f"decomposed : workers={workers} groups={res.n_groups} {res.seconds:.2f} s, {res.iterations} iter, "
+              f"subproblem solve {solve:.2f} s ({solve / res.seconds:.0%}), speedup x{base / res.seconds:.2f}{note}")
+        if workers == 1:
+            serial = res.seconds - solve
+            bound = {k: res.seconds / (serial + solve / min(k, res.n_groups)) for k in (2, 4, 8, 16)}
+            # proyeksi wall time per jumlah core; bandingkan dengan solve monolitik
+            print("  batas Amdahl: " + ", ".join(f"{k} core x{v:.2f} ({res.seconds / v:.2f} s)" for k, v in bound.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark re-solve dingin vs inkremental setelah delta inventory
+(`src/optimizer/incremental.py`).
+
+- Budget tunggal: `greedy_allocate` dari nol (sort + cumsum) vs
+  `IncrementalAllocator.update` untuk delta berbagai ukuran.
+- LP multi-periode: `solve_multi_period` (build + solve) vs `WarmStartLP`
+  (ganti ruas kanan saja; warm start bila `highspy` terpasang).
+
+Contoh:
+    python scripts/bench_incremental.py --pairs 200000 --lp-pairs 5000
+"""
+
+import argparse
+import sys
+import time
+from dataclasses import replace
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from scripts.bench_multi_period import synthetic_problem  # noqa: E402
+from src.optimizer.allocation import greedy_allocate  # noqa: E402
+from src.optimizer.incremental import HIGHSPY_OK, IncrementalAllocator, WarmStartLP  # noqa: E402
+from src.optimizer.multi_period import solve_multi_period  # noqa: E402
+
+
+def bench_allocator(n: int, deltas, seed: int = 0) -> None:
+    rng = np.random.default_rng(seed)
+    need = rng.gamma(2.0, 5.0, n)
+    cost = rng.uniform(15, 35, n)
+    budget = 0.6 * float((need * cost).sum())
+    alloc = IncrementalAllocator(need, cost, budget)
+    print(f"[budget] pairs={n}")
+    for k in deltas:
+        idx = rng.choice(n, k, replace=False)
+        new = rng.gamma(2.0, 5.0, k)
+        t0 = time.perf_counter()
+        alloc.update(idx, new)
+        inc = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        x = greedy_allocate(alloc.need, cost, budget)
+        cold = time.perf_counter() - t0
+        err = float(np.abs(x - alloc.x).max())
+        print(f"  delta={k:>7}: cold {cold * 1e3:8.2f} ms | incremental {inc * 1e3:8.2f} ms | max diff {err:.1e}")
+
+
+def bench_lp(n: int, periods: int, k: int, seed: int = 0) -> None:
+    rng = np.random.default_rng(seed)
+    prob = synthetic_problem(n, periods, seed=seed)
+    warm = WarmStartLP(prob)
+    first = warm.solve()
+    print(f"[multi-period] pairs={n} periods={periods} delta={k} highspy={HIGHSPY_OK}")
+    print(f"  initial : build {warm.build_seconds:.3f} s + solve {first.solve_seconds:.3f} s")
+
+    idx = rng.choice(n, k, replace=False)
+    on_hand = np.asarray(prob.on_hand, dtype=float).copy()
+    on_hand[idx] = rng.uniform(0, 30, k)
+    warm.update_inventory(idx, on_hand=on_hand[idx])
+    res = warm.solve()
+    cold = solve_multi_period(replace(prob, on_hand=on_hand))
+    print(f"  cold    : build {cold.build_seconds:.3f} s + solve {cold.solve_seconds:.3f} s")
+    print(f"  re-solve: solve {res.solve_seconds:.3f} s | objective diff {abs(res.objective - cold.objective):.2e}")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pairs", type=int, default=100000)
+    ap.add_argument("--lp-pairs", type=int, default=2000)
+    ap.add_argument("--periods", type=int, default=6)
+    ap.add_argument("--lp-delta", type=int, default=50)
+    args = ap.parse_args()
+
+    bench_allocator(args.pairs, [10, 100, 1000, 10000])
+    bench_lp(args.lp_pairs, args.periods, args.lp_delta)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark pembulatan case-pack / MOQ (`src/optimizer/lot_sizing.py`).
+
+1. Waktu `lot_size` untuk n pasangan (default 100k) setelah `greedy_allocate`.
+2. Gap terhadap MILP eksak (`milp_lot_size`, HiGHS) pada instance kecil:
+   tambahan shortage heuristik dibanding optimum, sebagai % dari total need.
+
+Contoh:
+    python scripts/bench_lot_sizing.py --pairs 100000 --instances 50 --size 30
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.optimizer.allocation import greedy_allocate  # noqa: E402
+from src.optimizer.lot_sizing import lot_cost, lot_size, milp_lot_size  # noqa: E402
+
+
+def instance(rng, n: int):
+    need = rng.gamma(2.0, 5.0, n)
+    cost = rng.uniform(10, 40, n)
+    pack = rng.choice([1, 2, 6, 12], n)
+    moq = pack * rng.choice([1, 1, 2], n)
+    budget = rng.uniform(0.2, 1.2) * float((need * cost).sum())
+    return need, cost, pack, moq, budget
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pairs", type=int, default=100000)
+    ap.add_argument("--instances", type=int, default=30)
+    ap.add_argument("--size", type=int, default=25)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+    rng = np.random.default_rng(args.seed)
+
+    need, cost, pack, moq, budget = instance(rng, args.pairs)
+    qty = greedy_allocate(need, cost, budget)
+    times = []
+    for _ in range(5):
+        t0 = time.perf_counter()
+        x = lot_size(qty, cost, budget, pack, moq, need=need)
+        times.append(time.perf_counter() - t0)
+    print(f"lot_size pairs={args.pairs}: median {np.median(times) * 1e3:.1f} ms | spend/budget={float((x * cost).sum()) / budget:.4f}")
+
+    gaps, heur_s, milp_s = [], [], []
+    for _ in range(args.instances):
+        need, cost, pack, moq, budget = instance(rng, args.size)
+        ones, zeros = np.ones(args.size), np.zeros(args.size)
+        t0 = time.perf_counter()
+        x = lot_size(greedy_allocate(need, cost, budget), cost, budget, pack, moq, need=need)
+        heur_s.append(time.perf_counter() - t0)
+        t0 = time.perf_counter()
+        xm = milp_lot_size(need, cost, budget, pack, moq)
+        milp_s.append(time.perf_counter() - t0)
+        extra = lot_cost(x, need, ones, zeros) - lot_cost(xm, need, ones, zeros)
+        gaps.append(extra / need.sum())
+    gaps = np.asarray(gaps)
+    print(f"gap vs MILP ({args.instances} x {args.size} pairs): mean {gaps.mean():.2%} | p90 {np.quantile(gaps, 0.9):.2%} | max {gaps.max():.2%} of total need")
+    print(f"time per instance: heuristic {np.mean(heur_s) * 1e3:.2f} ms | MILP {np.mean(milp_s) * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
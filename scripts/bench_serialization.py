@@ -0,0 +1,75 @@
+"""
+Benchmark serialisasi response `/forecast`: jalur lama vs ORJSON + NumPy.
+
+- lama : list float Python per baris (`float(...)` per elemen), lalu
+         `jsonable_encoder` + `json.dumps` seperti default FastAPI.
+- baru : baris forecast tetap np.ndarray, diserialisasi oleh
+         `NumpyORJSONResponse` (orjson OPT_SERIALIZE_NUMPY).
+
+Contoh:
+    python scripts/bench_serialization.py --pairs 20000 --horizon 8
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+
+from app.schemas import ForecastRequest, NumpyORJSONResponse  # noqa: E402
+
+
+def _timeit(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--pairs", type=int, default=20000)
+    ap.add_argument("--horizon", type=int, default=8)
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(0)
+    keys = [(f"S{i // 50:04d}", f"P{i % 50:03d}") for i in range(args.pairs)]
+    fc = rng.gamma(5.0, 2.0, size=(args.pairs, args.horizon))
+
+    def legacy():
+        rows = [{"store_id": s, "product_id": p, "forecast": [float(max(0.0, v)) for v in row]}
+                for (s, p), row in zip(keys, fc)]
+        body = {"horizon_weeks": args.horizon, "model_version": "bench", "forecasts": rows}
+        return json.dumps(jsonable_encoder(body)).encode()
+
+    def fast():
+        rows = [{"store_id": s, "product_id": p, "forecast": row} for (s, p), row in zip(keys, fc)]
+        body = {"horizon_weeks": args.horizon, "model_version": "bench", "forecasts": rows}
+        return NumpyORJSONResponse(body).body
+
+    assert json.loads(legacy()) == json.loads(fast())
+
+    payload = {"horizon_weeks": args.horizon,
+               "pairs": [{"store_id": s, "product_id": p} for s, p in keys]}
+    raw = json.dumps(payload).encode()
+
+    t_legacy = _timeit(legacy)
+    t_fast = _timeit(fast)
+    t_validate = _timeit(lambda: ForecastRequest.model_validate_json(raw))
+
+    print(f"pairs={args.pairs} horizon={args.horizon} body={len(fast()) / 1e6:.1f} MB")
+    print(f"response legacy (float + jsonable_encoder + json): {t_legacy * 1000:8.1f} ms")
+    print(f"response orjson + numpy                         : {t_fast * 1000:8.1f} ms  ({t_legacy / t_fast:.1f}x)")
+    print(f"request validation (ForecastRequest, 1 pass)    : {t_validate * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
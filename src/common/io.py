@@ -1,11 +1,39 @@
 """
 Common I/O helpers (baca/tulis CSV, Parquet, config, dsb.).
+
+Tabel fitur mingguan (`weekly_features.parquet/`) disimpan sebagai dataset
+Parquet ber-partisi hive per minggu ISO:
+
+    weekly_features.parquet/year=2024/week=52/part-0.parquet
+
+Di dalam tiap file baris diurutkan (store_id, product_id) dan dipecah ke row
+group `ROW_GROUP_ROWS` baris, sehingga statistik min/max per row group bisa
+dipakai memangkas filter store/product. store_id sengaja TIDAK dijadikan
+partisi: jumlah file akan menjadi store x minggu.
+
+`read_features` mendorong filter store/product/waktu dan proyeksi kolom ke
+scan pyarrow: partisi minggu di luar rentang tidak dibuka sama sekali, row
+group store lain dilewati, dan hanya kolom yang diminta yang di-decode.
+File tunggal / folder `part-*.parquet` (format lama) tetap bisa dibaca.
 """
 
+import os
+import shutil
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterable, List, Optional
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+PARTITION_COLS = ["year", "week"]
+KEY_COLS = ["store_id", "product_id"]
+ROW_GROUP_ROWS = int(os.getenv("FEATURES_ROW_GROUP_ROWS", "16384"))
+MAX_EQUALITY_TERMS = 64
+
+_PARTITIONING = ds.partitioning(pa.schema([("year", pa.int64()), ("week", pa.int64())]), flavor="hive")
 
 
 def read_parquet(path: Path) -> pd.DataFrame:
@@ -16,3 +44,168 @@ def read_csv(path: Path, **kwargs: Any) -> pd.DataFrame:
     return pd.read_csv(path, **kwargs)
 
 
+def time_key(year, week):
+    """Kunci waktu year * 100 + week (ISO), sama seperti split di train/evaluate."""
+    return np.asarray(year, dtype=np.int64) * 100 + np.asarray(week, dtype=np.int64)
+
+
+def is_partitioned(path: Path) -> bool:
+    """True jika `path` adalah dataset hive `year=/week=`."""
+    return path.is_dir() and any(p.is_dir() and p.name.startswith("year=") for p in path.iterdir())
+
+
+def feature_dataset(path: Path) -> ds.Dataset:
+    if is_partitioned(path):
+        return ds.dataset(path, format="parquet", partitioning=_PARTITIONING)
+    return ds.dataset(path, format="parquet")
+
+
+def feature_weeks(path: Path) -> np.ndarray:
+    """
+    Kunci waktu (`time_key`) yang tersedia, urut naik. Untuk dataset
+    ber-partisi dibaca dari path partisi saja, tanpa membuka file data.
+    """
+    dset = feature_dataset(path)
+    if is_partitioned(path):
+        keys = []
+        for frag in dset.get_fragments():
+            part = ds.get_partition_keys(frag.partition_expression)
+            keys.append(int(part["year"]) * 100 + int(part["week"]))
+        return np.unique(np.asarray(keys, dtype=np.int64))
+    table = dset.to_table(columns=PARTITION_COLS)
+    return np.unique(time_key(table["year"].to_numpy(), table["week"].to_numpy()))
+
+
+def _any_of(column: str, values: Iterable[str]) -> ds.Expression:
+    """
+    `column` salah satu dari `values`. Untuk daftar pendek dipakai OR dari
+    kesamaan karena pyarrow hanya memangkas row group lewat statistik
+    min/max untuk perbandingan, bukan `isin`.
+    """
+    values = list(values)
+    if not values or len(values) > MAX_EQUALITY_TERMS:
+        return ds.field(column).isin(values)
+    expr = ds.field(column) == values[0]
+    for v in values[1:]:
+        expr = expr | (ds.field(column) == v)
+    return expr
+
+
+def _after(key: int) -> ds.Expression:
+    y, w = divmod(int(key), 100)
+    return (ds.field("year") > y) | ((ds.field("year") == y) & (ds.field("week") >= w))
+
+
+def _before(key: int) -> ds.Expression:
+    y, w = divmod(int(key), 100)
+    return (ds.field("year") < y) | ((ds.field("year") == y) & (ds.field("week") <= w))
+
+
+def feature_filter(stores: Optional[Iterable[str]] = None, products: Optional[Iterable[str]] = None,
+                   start: Optional[int] = None, end: Optional[int] = None) -> Optional[ds.Expression]:
+    """Ekspresi filter pyarrow; `start`/`end` adalah `time_key` inklusif."""
+    parts = []
+    if stores is not None:
+        parts.append(_any_of("store_id", stores))
+    if products is not None:
+        parts.append(_any_of("product_id", products))
+    if start is not None:
+        parts.append(_after(start))
+    if end is not None:
+        parts.append(_before(end))
+    if not parts:
+        return None
+    expr = parts[0]
+    for p in parts[1:]:
+        expr = expr & p
+    return expr
+
+
+def read_features(path: Path, columns: Optional[List[str]] = None, stores: Optional[Iterable[str]] = None,
+                  products: Optional[Iterable[str]] = None, start: Optional[int] = None,
+                  end: Optional[int] = None, last_weeks: Optional[int] = None) -> Optional[pd.DataFrame]:
+    """
+    Baca tabel fitur dengan filter & proyeksi didorong ke scan.
+
+    Parameters
+    ----------
+    columns : list, optional
+        Kolom yang dibaca (default semua, urutan store_id, product_id, year,
+        week, lalu kolom lain).
+    stores, products : iterable, optional
+        Hanya pasangan dengan store/product ini.
+    start, end : int, optional
+        Rentang `time_key` (year * 100 + week) inklusif.
+    last_weeks : int, optional
+        Hanya `last_weeks` minggu terakhir yang ada di dataset (digabung
+        dengan `start`).
+
+    Returns
+    -------
+    pd.DataFrame or None
+        None jika dataset belum ada.
+    """
+    if not path.exists():
+        return None
+    dset = feature_dataset(path)
+    if last_weeks:
+        weeks = feature_weeks(path)
+        if len(weeks) > last_weeks:
+            start = max(int(weeks[-last_weeks]), start or 0)
+    if columns is None:
+        names = dset.schema.names
+        columns = [c for c in KEY_COLS + PARTITION_COLS if c in names]
+        columns += [c for c in names if c not in columns]
+    table = dset.to_table(columns=list(columns), filter=feature_filter(stores, products, start, end))
+    return table.to_pandas()
+
+
+def write_feature_partitions(df: pd.DataFrame, path: Path, basename: str = "part-0") -> int:
+    """
+    Tulis `df` ke `path/year=Y/week=W/<basename>.parquet`, satu file per
+    minggu, urut (store_id, product_id). Tiap file ditulis ke nama sementara
+    berawalan titik lalu di-rename (pembaca & ArtifactStore mengabaikannya).
+    File minggu yang sama dengan `basename` sama diganti.
+
+    Returns
+    -------
+    int
+        Jumlah file yang ditulis.
+    """
+    if not len(df):
+        return 0
+    # satu konversi ke Arrow + satu lexsort integer (minggu, store, product);
+    # tiap partisi minggu lalu berupa slice zero-copy dari tabel terurut
+    store = pd.factorize(df["store_id"], sort=True)[0]
+    product = pd.factorize(df["product_id"], sort=True)[0]
+    key = time_key(df["year"].to_numpy(), df["week"].to_numpy())
+    order = np.lexsort((product, store, key))
+    table = pa.Table.from_pandas(df.drop(columns=PARTITION_COLS), preserve_index=False).take(order)
+    key = key[order]
+    bounds = np.flatnonzero(np.diff(key)) + 1
+    starts, stops = np.r_[0, bounds], np.r_[bounds, len(key)]
+    for lo, hi in zip(starts, stops):
+        year, week = divmod(int(key[lo]), 100)
+        target = path / f"year={year}" / f"week={week}"
+        target.mkdir(parents=True, exist_ok=True)
+        tmp = target / f".{basename}.parquet.tmp"
+        pq.write_table(table.slice(lo, hi - lo), tmp, row_group_size=ROW_GROUP_ROWS)
+        os.replace(tmp, target / f"{basename}.parquet")
+    return len(starts)
+
+
+def _remove(path: Path) -> None:
+    if path.is_dir():
+        shutil.rmtree(path)
+    elif path.exists():
+        path.unlink()
+
+
+def replace_dir(src: Path, dst: Path) -> None:
+    """Ganti folder/file `dst` dengan folder `src` (rename, lalu hapus yang lama)."""
+    old = dst.with_name(f".{dst.name}.old")
+    _remove(old)
+    if dst.exists():
+        os.replace(dst, old)
+    os.replace(src, dst)
+    _remove(old)
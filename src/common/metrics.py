@@ -3,7 +3,8 @@ Common metrics for forecasting & inventory evaluation.
 
 Target utama:
 - WAPE, MASE untuk forecasting.
-- Fill-rate, stockout days, total cost untuk inventory/ops.
+- Fill-rate, total cost untuk inventory/ops (stockout weeks diakumulasi
+  per langkah di `src/optimizer/simulation.py`).
 """
 
 from typing import Iterable, Sequence
@@ -52,3 +53,34 @@ def mase(
     return float(np.mean(np.abs(y_true_arr - y_pred_arr)) / naive_err)
 
 
+def fill_rate(demand, served) -> np.ndarray:
+    """
+    Proporsi demand yang terlayani dari stok (served / demand), elementwise.
+    Jumlahkan dulu atas periode/pasangan untuk fill-rate agregat. Tanpa demand
+    dianggap 1.0 (tidak ada yang gagal dilayani).
+    """
+    demand = np.asarray(demand, dtype=float)
+    served = np.asarray(served, dtype=float)
+    return np.divide(served, demand, out=np.ones(np.broadcast(served, demand).shape), where=demand > 0)
+
+
+def total_cost(holding_units, lost_units, n_orders, holding_cost, shortage_cost, order_cost=0.0) -> np.ndarray:
+    """
+    Total biaya inventory = holding + stockout + ordering.
+
+    Parameters
+    ----------
+    holding_units : array-like
+        Akumulasi unit x periode stok akhir.
+    lost_units : array-like
+        Total demand yang tidak terlayani.
+    n_orders : array-like
+        Jumlah order yang ditempatkan.
+    holding_cost, shortage_cost, order_cost : float or array-like
+        Biaya per unit-periode, per unit lost sale, per order (di-broadcast).
+    """
+    return (
+        np.asarray(holding_units) * holding_cost
+        + np.asarray(lost_units) * shortage_cost
+        + np.asarray(n_orders) * order_cost
+    )
@@ -20,6 +20,7 @@ import json
 import pandas as pd
 
 from ..common.config import PROCESSED_DIR
+from ..common.io import feature_weeks, read_features
 from ..common.metrics import mase, wape
 
 
@@ -30,15 +31,11 @@ STATS_PATH = ART_DIR / "demand_stats.json"
 PRED_PATH = PROCESSED_DIR / "predictions.csv"
 
 
-def _make_time_splits(df: pd.DataFrame):
+def _split_weeks(weeks) -> Tuple[list, list, list]:
     """
-    Replikasi skema split dari `train.py`, berbasis (year, week).
+    Replikasi skema split dari `train.py` atas daftar time_key (year * 100 + week) urut naik.
     """
-    if "time_key" not in df.columns:
-        df = df.copy()
-        df["time_key"] = df["year"] * 100 + df["week"]
-
-    weeks = sorted(df["time_key"].unique())
+    weeks = list(weeks)
     n = len(weeks)
 
     if n >= 12:
@@ -51,12 +48,7 @@ def _make_time_splits(df: pd.DataFrame):
         train_weeks = weeks[:n_train]
         val_weeks = weeks[n_train : n_train + n_val]
         test_weeks = weeks[n_train + n_val :]
-
-    train_mask = df["time_key"].isin(train_weeks)
-    val_mask = df["time_key"].isin(val_weeks)
-    test_mask = df["time_key"].isin(test_weeks)
-
-    return df[train_mask].copy(), df[val_mask].copy(), df[test_mask].copy()
+    return train_weeks, val_weeks, test_weeks
 
 
 def _load_model():
@@ -85,16 +77,17 @@ def evaluate() -> None:
             f"{FEAT_PATH} tidak ditemukan. Jalankan dulu ETL: `python etl/build_features.py`."
         )
 
-    df = pd.read_parquet(FEAT_PATH)
-
     label_col = "units_sold"
     id_cols = ["store_id", "product_id", "year", "week"]
-    feature_cols = [c for c in df.columns if c not in id_cols + [label_col]]
 
-    train_df, val_df, test_df = _make_time_splits(df)
-
-    if len(test_df) == 0:
+    # split dihitung dari daftar minggu (path partisi), lalu hanya minggu test
+    # yang dibaca dengan semua kolom; riwayat cukup label saja (untuk MASE)
+    test_weeks = _split_weeks(feature_weeks(FEAT_PATH))[2]
+    if len(test_weeks) == 0:
         raise RuntimeError("Test split kosong; data historis belum cukup untuk skema T-8/T-4/T.")
+    test_df = read_features(FEAT_PATH, start=int(test_weeks[0])).sort_values(id_cols, ignore_index=True)
+    df = read_features(FEAT_PATH, columns=id_cols + [label_col])
+    feature_cols = [c for c in test_df.columns if c not in id_cols + [label_col]]
 
     stats = _load_stats(df)
     global_mean = stats.get("mean", 5.0)
@@ -147,17 +140,17 @@ def evaluate() -> None:
     for m in methods:
         results_global[m] = wape(test_df["y_true"], test_df[m])
 
+    # Insample untuk MASE: pakai seluruh histori kombinasi ini, sebelum test period
+    history = {
+        pair: grp[label_col].tolist()
+        for pair, grp in df.sort_values(id_cols).groupby(["store_id", "product_id"])
+    }
+
     # Per SKU-location
     for (sid, pid), grp in test_df.groupby(["store_id", "product_id"]):
         key = f"{sid}|{pid}"
         y_true = grp["y_true"].tolist()
-
-        # Insample untuk MASE: pakai seluruh histori kombinasi ini, sebelum test period
-        hist = (
-            df[(df["store_id"] == sid) & (df["product_id"] == pid)]
-            .sort_values(["year", "week"])
-        )
-        insample = hist[label_col].tolist()
+        insample = history.get((sid, pid), [])
 
         pair_metrics: Dict[str, float] = {}
         for m in methods:
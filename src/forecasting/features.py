@@ -1,17 +1,65 @@
 """
 Feature engineering utilities for demand forecasting.
 
-Catatan:
-- Saat ini pipeline asli masih berada di `etl/build_features.py`.
-- Modul ini disiapkan sebagai rumah baru untuk logika feature engineering
-  (mis. baca raw data, agregasi mingguan, lag/rolling features, dsb).
+Satu engine lag/rolling dipakai ETL (`etl/build_features.py`) dan inference
+rekursif (`recursive.py`):
+
+- Batch (`add_lag_features`): tabel di-sort SEKALI per (store, product,
+  waktu) sehingga tiap pasangan jadi slice kontigu; semua lag dan rolling
+  mean dihitung dalam satu pass dari offset grup dan satu prefix sum
+  (sum jendela = c[i] - c[i - w]). Baris yang jendelanya melewati awal grup
+  di-mask NaN, jadi tidak ada nilai yang bocor antar pasangan.
+- Online (`recent_window_features`): dari matriks observasi terbaru
+  (terbaru dulu), lag = satu kolom, rolling mean = prefix sum sepanjang baris.
+
+Rolling mean mengikuti ETL lama: rata-rata `w` observasi SEBELUM minggu
+target (shift 1), NaN bila riwayat kurang dari `w` minggu.
+
+Build inkremental (`extend_features`): fitur minggu baru hanya butuh
+`STATE_WEEKS` observasi terakhir per pasangan (lag terbesar), jadi ETL
+mingguan cukup menyimpan state itu dan menghitung baris minggu baru saja;
+hasilnya identik dengan full rebuild.
 """
 
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional, Sequence
 
+import numpy as np
 import pandas as pd
 
+# Definisi fitur yang dipakai ETL (`etl/build_features.py`) dan inference.
+LAGS = (1, 2, 4, 52)
+ROLL_WINDOWS = (4, 8, 12)
+SEASON_PERIOD = 52
+HOLIDAY_WEEKS = (47, 48, 49, 50, 51, 52)
+FEATURE_COLS = [
+    "is_holiday",
+    "price",
+    "lag_1",
+    "lag_2",
+    "lag_4",
+    "rollmean_4",
+    "rollmean_8",
+    "rollmean_12",
+    "sin_woy",
+    "cos_woy",
+]
+
+
+# kolom & dtype tabel fitur yang ditulis ETL (konsisten antar partisi)
+OUTPUT_DTYPES = {
+    "store_id": str,
+    "product_id": str,
+    "year": "int64",
+    "week": "int64",
+    "units_sold": "float64",
+    **{c: ("int64" if c == "is_holiday" else "float64") for c in FEATURE_COLS},
+}
+# observasi terakhir per pasangan yang cukup untuk menghitung semua fitur minggu berikutnya
+STATE_WEEKS = max(max(LAGS), max(ROLL_WINDOWS))
+STATE_COLS = ["store_id", "product_id", "date", "units_sold"]
+
 
 def load_processed_features(path: Path = Path("data/processed/weekly_features.parquet")) -> Optional[pd.DataFrame]:
     """
@@ -22,3 +70,268 @@ def load_processed_features(path: Path = Path("data/processed/weekly_features.pa
     return pd.read_parquet(path)
 
 
+def calendar_features(week) -> Dict[str, np.ndarray]:
+    """`sin_woy`, `cos_woy`, `is_holiday` dari minggu ISO."""
+    week = np.asarray(week)
+    return {
+        "sin_woy": np.sin(2 * np.pi * week / SEASON_PERIOD),
+        "cos_woy": np.cos(2 * np.pi * week / SEASON_PERIOD),
+        "is_holiday": np.isin(week, HOLIDAY_WEEKS).astype(float),
+    }
+
+
+def group_lag_features(
+    values: np.ndarray,
+    starts: np.ndarray,
+    lags: Sequence[int] = LAGS,
+    windows: Sequence[int] = ROLL_WINDOWS,
+) -> Dict[str, np.ndarray]:
+    """
+    Lag & rolling mean untuk deret yang sudah urut per grup.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        (N,) nilai urut (grup, waktu); NaN diperlakukan sebagai hilang.
+    starts : np.ndarray
+        (G,) indeks baris awal tiap grup (naik, `starts[0] == 0`).
+    lags, windows : Sequence[int]
+        Lag dan panjang jendela rolling.
+
+    Returns
+    -------
+    dict
+        `lag_<k>` dan `rollmean_<w>` -> array (N,) float64.
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    starts = np.asarray(starts, dtype=np.int64)
+    # posisi baris di dalam grupnya
+    pos = np.arange(n) - np.repeat(starts, np.diff(np.append(starts, n)))
+    out: Dict[str, np.ndarray] = {}
+
+    for k in lags:
+        col = np.full(n, np.nan)
+        col[k:] = values[:-k] if k else values
+        col[pos < k] = np.nan
+        out[f"lag_{k}"] = col
+
+    if windows:
+        missing = np.isnan(values)
+        csum = np.zeros(n + 1)
+        np.cumsum(np.where(missing, 0.0, values), out=csum[1:])
+        cmiss = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(missing, out=cmiss[1:])
+        for w in windows:
+            # jendela = baris [i - w, i) -> c[i] - c[i - w]
+            col = np.full(n, np.nan)
+            col[w:] = (csum[w:n] - csum[: n - w]) / w
+            col[pos < w] = np.nan
+            if cmiss[-1]:
+                col[w:][cmiss[w:n] - cmiss[: n - w] > 0] = np.nan
+            out[f"rollmean_{w}"] = col
+    return out
+
+
+def recent_window_features(
+    recent: np.ndarray,
+    lags: Sequence[int] = LAGS,
+    windows: Sequence[int] = ROLL_WINDOWS,
+) -> Dict[str, np.ndarray]:
+    """
+    Lag & rolling mean untuk SATU minggu target per baris (serving).
+
+    Parameters
+    ----------
+    recent : np.ndarray
+        (n, K) observasi terbaru dulu: `recent[:, k - 1]` = k minggu sebelum
+        minggu target; K >= lag/jendela terbesar. NaN = tidak ada riwayat.
+    """
+    recent = np.asarray(recent, dtype=float)
+    out = {f"lag_{k}": recent[:, k - 1] for k in lags}
+    if windows:
+        csum = np.cumsum(recent[:, : max(windows)], axis=1)
+        for w in windows:
+            out[f"rollmean_{w}"] = csum[:, w - 1] / w
+    return out
+
+
+def sort_groups(df: pd.DataFrame, keys: Sequence[str] = ("store_id", "product_id"),
+                time_cols: Sequence[str] = ("year", "week")):
+    """
+    Urutkan tabel per (keys, waktu) sekali dan kembalikan offset grup.
+
+    Key dan kolom waktu di-factorize (urut) menjadi satu kode int64, jadi sort
+    hanya satu argsort integer; tabel yang sudah urut tidak disalin ulang.
+
+    Returns
+    -------
+    (frame, starts)
+        Frame terurut (index di-reset) dan (G,) indeks baris awal tiap grup.
+    """
+    def combined(cols):
+        code, size = np.zeros(len(df), dtype=np.int64), 1
+        for col in cols:
+            # factorize tanpa sort lalu ranking uniques: lebih murah dari sort=True
+            codes, uniques = pd.factorize(df[col])
+            rank = np.empty(len(uniques), dtype=np.int64)
+            rank[np.argsort(np.asarray(uniques), kind="stable")] = np.arange(len(uniques))
+            code, size = code * len(uniques) + rank[codes], size * len(uniques)
+        return code, size
+
+    group, n_groups = combined(keys)
+    tcode, n_times = combined(time_cols)
+    key = group * max(1, n_times) + tcode
+    n = len(key)
+    if n and not np.all(key[1:] >= key[:-1]):
+        order = None
+        space = n_groups * max(1, n_times)
+        if space <= 4 * n:
+            # panel mingguan: satu baris per (grup, minggu) -> key unik & padat,
+            # posisi tujuan langsung dari prefix count (O(n), tanpa argsort)
+            counts = np.bincount(key, minlength=space)
+            if counts.max() <= 1:
+                order = np.empty(n, dtype=np.int64)
+                order[np.cumsum(counts)[key] - 1] = np.arange(n)
+        if order is None:
+            order = np.argsort(key, kind="stable")
+        df = df.iloc[order]
+        group = group[order]
+    df = df.reset_index(drop=True)
+    change = np.ones(len(df), dtype=bool)
+    change[1:] = group[1:] != group[:-1]
+    return df, np.flatnonzero(change)
+
+
+def add_lag_features(
+    df: pd.DataFrame,
+    value_col: str = "units_sold",
+    keys: Sequence[str] = ("store_id", "product_id"),
+    time_cols: Sequence[str] = ("year", "week"),
+    lags: Sequence[int] = LAGS,
+    windows: Sequence[int] = ROLL_WINDOWS,
+) -> pd.DataFrame:
+    """
+    Tambahkan kolom `lag_<k>` dan `rollmean_<w>` (group-correct) ke tabel
+    mingguan; hasil terurut per (keys, waktu).
+    """
+    df, starts = sort_groups(df, keys, time_cols)
+    feats = group_lag_features(df[value_col].to_numpy(dtype=float), starts, lags, windows)
+    return df.assign(**feats)
+
+
+@dataclass(frozen=True)
+class MasterLookup:
+    """
+    Master kecil (kalender, harga produk) sebagai array lookup.
+
+    Join ke penjualan dilakukan dengan `Index.get_indexer` + take posisional,
+    tanpa merge/map pandas; objek ini dibuat sekali lalu dipakai ulang untuk
+    setiap shard pada ETL streaming.
+    """
+
+    dates: pd.Index
+    holiday: np.ndarray
+    products: pd.Index
+    price: np.ndarray
+
+    @classmethod
+    def from_masters(cls, calendar: pd.DataFrame, products: pd.DataFrame) -> "MasterLookup":
+        return cls(
+            dates=pd.Index(pd.to_datetime(calendar["date"])),
+            holiday=calendar["is_holiday"].to_numpy(dtype=float),
+            products=pd.Index(products["product_id"].astype(str)),
+            price=products["price"].to_numpy(dtype=float),
+        )
+
+    @staticmethod
+    def _take(index: pd.Index, values: np.ndarray, keys) -> np.ndarray:
+        pos = index.get_indexer(keys)
+        if not len(values):
+            return np.full(len(pos), np.nan)
+        return np.where(pos >= 0, values[pos], np.nan)
+
+    def is_holiday(self, dates, weeks) -> np.ndarray:
+        """Flag kalender; tanggal di luar kalender memakai `HOLIDAY_WEEKS`."""
+        flag = self._take(self.dates, self.holiday, dates)
+        missing = np.isnan(flag)
+        flag[missing] = calendar_features(np.asarray(weeks)[missing])["is_holiday"]
+        return flag.astype(np.int64)
+
+    def product_price(self, product_ids) -> np.ndarray:
+        return self._take(self.products, self.price, product_ids)
+
+
+def prepare_sales(sales: pd.DataFrame, calendar: Optional[pd.DataFrame] = None,
+                  products: Optional[pd.DataFrame] = None, lookup: Optional[MasterLookup] = None) -> pd.DataFrame:
+    """
+    Tambahkan year/week (ISO), is_holiday (kalender; minggu di luar kalender
+    memakai `HOLIDAY_WEEKS`) dan price (proxy per produk) ke penjualan mingguan.
+
+    `year` adalah tahun ISO (bukan tahun kalender) supaya (year, week) urut
+    kronologis, sama seperti `advance_weeks` di serving path dan partisi
+    `year=/week=` dataset fitur (mis. Senin 2024-12-30 -> 2025 minggu 1).
+
+    `lookup` (dari `MasterLookup.from_masters`) menggantikan `calendar` &
+    `products` bila master sudah disiapkan sekali di luar (ETL streaming).
+    """
+    if lookup is None:
+        lookup = MasterLookup.from_masters(calendar, products)
+    sales = sales.copy(deep=False)
+    iso = sales["date"].dt.isocalendar()
+    sales["year"] = iso["year"].to_numpy(dtype=np.int64)
+    sales["week"] = iso["week"].to_numpy(dtype=np.int64)
+    sales["is_holiday"] = lookup.is_holiday(sales["date"], sales["week"].to_numpy())
+    sales["price"] = lookup.product_price(sales["product_id"])
+    return sales
+
+
+def feature_frame(sales: pd.DataFrame) -> pd.DataFrame:
+    """Semua baris + fitur lag/rolling/siklus, urut (store, product, date); baris belum di-dropna."""
+    out = add_lag_features(sales, time_cols=("date",))
+    cyc = calendar_features(out["week"].to_numpy())
+    out["sin_woy"] = cyc["sin_woy"]
+    out["cos_woy"] = cyc["cos_woy"]
+    return out
+
+
+def training_rows(frame: pd.DataFrame) -> pd.DataFrame:
+    """Baris yang fiturnya lengkap, dengan kolom & dtype `OUTPUT_DTYPES`."""
+    rows = frame.dropna(subset=FEATURE_COLS + ["units_sold"])
+    return rows[list(OUTPUT_DTYPES)].astype(OUTPUT_DTYPES).reset_index(drop=True)
+
+
+def trailing_state(frame: pd.DataFrame, weeks: int = STATE_WEEKS) -> pd.DataFrame:
+    """`weeks` observasi terakhir per pasangan (frame harus urut per pasangan & waktu)."""
+    state = frame.groupby(["store_id", "product_id"], sort=False).tail(weeks)
+    return state[STATE_COLS].astype({"units_sold": "float64"}).reset_index(drop=True)
+
+
+def baseline_forecast(frame: pd.DataFrame, weeks: int = 4) -> pd.DataFrame:
+    """forecast_next = rata-rata `weeks` minggu terakhir per pasangan (input optimizer)."""
+    last = frame.groupby(["store_id", "product_id"], sort=False).tail(weeks)
+    return last.groupby(["store_id", "product_id"])["units_sold"].mean().reset_index(name="forecast_next")
+
+
+def extend_features(state: pd.DataFrame, new_sales: pd.DataFrame, calendar: pd.DataFrame,
+                    products: pd.DataFrame):
+    """
+    Fitur untuk minggu baru saja, dari state trailing + penjualan baru.
+
+    Baris baru yang tanggalnya <= minggu terakhir di state diabaikan (sudah
+    diproses). Pasangan baru tanpa state mulai dari riwayat kosong, sama
+    seperti di full rebuild.
+
+    Returns
+    -------
+    (rows, new_state, combined)
+        rows: baris fitur minggu baru (`training_rows`); new_state: state
+        trailing terbaru; combined: state + minggu baru dengan fitur (untuk
+        baseline forecast).
+    """
+    last = state["date"].max() if len(state) else pd.Timestamp.min
+    fresh = new_sales[new_sales["date"] > last][STATE_COLS]
+    combined = pd.concat([state[STATE_COLS], fresh], ignore_index=True)
+    frame = feature_frame(prepare_sales(combined, calendar, products))
+    rows = training_rows(frame[frame["date"] > last])
+    return rows, trailing_state(frame), frame
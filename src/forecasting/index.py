@@ -0,0 +1,113 @@
+"""
+Lookup index per SKU-location untuk tabel fitur mingguan.
+
+Tabel fitur di-sort SEKALI berdasarkan (store_id, product_id, year, week),
+sehingga riwayat setiap pasangan menjadi slice baris yang kontigu
+`[starts[i], stops[i])`. Dari situ:
+
+- `latest`   : satu baris terakhir per pasangan (siap dipakai sebagai input model).
+- `locate()` : (store_id, product_id) -> posisi pasangan, O(1) via dict.
+- `history()`: slice riwayat tanpa boolean scan / sort per request.
+
+Index dibangun saat startup (lihat `app/services/artifacts.py`) atau ETL,
+bukan di serving path.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+KEY_COLS = ["store_id", "product_id"]
+TIME_COLS = ["year", "week"]
+SEASONAL_LAG = 52
+
+
+class PairIndex:
+    """
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Tabel fitur dengan minimal kolom `store_id`, `product_id`, `year`,
+        `week`, `units_sold`.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        frame = df.sort_values(KEY_COLS + TIME_COLS, kind="mergesort").reset_index(drop=True)
+        n = len(frame)
+
+        sid = frame["store_id"].to_numpy()
+        pid = frame["product_id"].to_numpy()
+        change = np.ones(n, dtype=bool)
+        if n > 1:
+            change[1:] = (sid[1:] != sid[:-1]) | (pid[1:] != pid[:-1])
+
+        self.frame = frame
+        self.starts = np.flatnonzero(change)
+        self.stops = np.append(self.starts[1:], n).astype(self.starts.dtype)
+        self.keys: List[Tuple[str, str]] = list(zip(sid[self.starts], pid[self.starts]))
+        self._pos: Dict[Tuple[str, str], int] = {k: i for i, k in enumerate(self.keys)}
+
+        self.latest = frame.iloc[self.stops - 1].reset_index(drop=True) if n else frame.copy()
+        self.latest_units = self.latest["units_sold"].to_numpy(dtype=float)
+        self.latest_lag_52 = self._latest_seasonal()
+        self._matrices: Dict[Tuple[str, ...], np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _latest_seasonal(self) -> np.ndarray:
+        """
+        Nilai lag_52 pada baris terakhir tiap pasangan.
+
+        Pakai kolom `lag_52` jika ada; jika tidak, ambil `units_sold` 52 baris
+        sebelum baris terakhir di slice yang sama (NaN bila histori < 53 minggu).
+        """
+        if "lag_52" in self.latest.columns:
+            return self.latest["lag_52"].to_numpy(dtype=float)
+        out = np.full(len(self.keys), np.nan)
+        if len(self.keys) == 0:
+            return out
+        src = self.stops - 1 - SEASONAL_LAG
+        ok = src >= self.starts
+        units = self.frame["units_sold"].to_numpy(dtype=float)
+        out[ok] = units[src[ok]]
+        return out
+
+    def position(self, store_id: str, product_id: str) -> Optional[int]:
+        return self._pos.get((store_id, product_id))
+
+    def locate(self, pairs: Iterable[Tuple[str, str]]) -> np.ndarray:
+        """
+        Posisi untuk setiap (store_id, product_id); -1 jika pasangan tidak dikenal.
+        """
+        get = self._pos.get
+        return np.fromiter((get(k, -1) for k in pairs), dtype=np.int64)
+
+    def latest_matrix(self, columns: List[str]) -> np.ndarray:
+        """
+        Matriks fitur baris terakhir (pairs x len(columns)), di-cache per urutan kolom.
+        """
+        key = tuple(columns)
+        mat = self._matrices.get(key)
+        if mat is None:
+            mat = self.latest[list(columns)].to_numpy(dtype=float)
+            self._matrices[key] = mat
+        return mat
+
+    def history_matrix(self, positions: np.ndarray, weeks: int, column: str = "units_sold") -> np.ndarray:
+        """
+        `weeks` nilai terakhir `column` untuk tiap posisi -> array (len(positions), weeks),
+        urut terlama -> terbaru. Histori yang lebih pendek di-pad NaN di depan.
+        """
+        values = self.frame[column].to_numpy(dtype=float)
+        stops = self.stops[positions]
+        rows = stops[:, None] - weeks + np.arange(weeks)[None, :]
+        valid = rows >= self.starts[positions][:, None]
+        out = np.full(rows.shape, np.nan)
+        out[valid] = values[rows[valid]]
+        return out
+
+    def history(self, pos: int) -> pd.DataFrame:
+        """Slice riwayat (sudah terurut waktu) untuk pasangan di posisi `pos`."""
+        return self.frame.iloc[self.starts[pos] : self.stops[pos]]
@@ -0,0 +1,134 @@
+"""
+Recursive multi-step forecasting (vectorized untuk banyak SKU-location sekaligus).
+
+Skema:
+- Setiap pasangan punya ring buffer `units_sold` 52 minggu terakhir; semua
+  buffer disimpan dalam satu array 2-D (pairs x 52).
+- Di setiap langkah horizon, fitur dinamis (lag_1/2/4/52, rollmean_4/8/12,
+  sin_woy/cos_woy, is_holiday) dihitung ulang untuk SEMUA pasangan dengan
+  engine yang sama dengan ETL (`features.recent_window_features` /
+  `calendar_features`), model dipanggil sekali, lalu prediksi di-push ke
+  buffer sebagai "observasi" untuk langkah berikutnya.
+
+Biaya: H panggilan `predict` batched, bukan pairs x H panggilan skalar.
+Fitur lain (mis. `price`) diperlakukan statis: nilai baris terakhir dipakai ulang.
+"""
+
+from datetime import date
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from .features import LAGS, ROLL_WINDOWS, SEASON_PERIOD, calendar_features, recent_window_features
+
+
+def advance_weeks(year: np.ndarray, week: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Geser pasangan ISO (year, week) sejauh `k` minggu (tahun 53 minggu ikut ditangani).
+    """
+    year = np.asarray(year, dtype=int)
+    week = np.asarray(week, dtype=int)
+    keys, inverse = np.unique(year * 100 + week, return_inverse=True)
+    new_year = np.empty(len(keys), dtype=int)
+    new_week = np.empty(len(keys), dtype=int)
+    for i, key in enumerate(keys):
+        d = date.fromordinal(date.fromisocalendar(int(key // 100), int(key % 100), 1).toordinal() + 7 * k)
+        iso = d.isocalendar()
+        new_year[i], new_week[i] = iso[0], iso[1]
+    return new_year[inverse], new_week[inverse]
+
+
+class RecursiveForecaster:
+    """
+    Parameters
+    ----------
+    model : object
+        Model dengan method `predict(X)` (LightGBM / RandomForest / dsb).
+    feature_cols : Sequence[str]
+        Urutan kolom fitur yang diharapkan model.
+    buffer_weeks : int
+        Panjang ring buffer; minimal lag/jendela terbesar (default 52).
+    """
+
+    def __init__(self, model, feature_cols: Sequence[str], buffer_weeks: int = SEASON_PERIOD):
+        needed = max(max(LAGS), max(ROLL_WINDOWS))
+        if buffer_weeks < needed:
+            raise ValueError(f"buffer_weeks harus >= {needed}")
+        self.model = model
+        self.feature_cols: List[str] = list(feature_cols)
+        self.buffer_weeks = buffer_weeks
+        self._col = {c: i for i, c in enumerate(self.feature_cols)}
+        self._lags = [k for k in LAGS if f"lag_{k}" in self._col]
+        self._windows = [w for w in ROLL_WINDOWS if f"rollmean_{w}" in self._col]
+        self._depth = max(self._lags + self._windows, default=1)
+
+    def _step_features(self, buf: np.ndarray, head: int, year: np.ndarray, week: np.ndarray, X: np.ndarray) -> None:
+        """
+        Tulis fitur dinamis untuk minggu target ke `X` (in-place).
+
+        `buf[:, (head - k) % B]` adalah observasi k minggu sebelum minggu target.
+        """
+        B = self.buffer_weeks
+        col = self._col
+        # hanya lag/jendela yang memang dipakai model -> gather sekecil mungkin
+        recent = buf[:, (head - 1 - np.arange(self._depth)) % B]
+        feats = recent_window_features(recent, self._lags, self._windows)
+        feats.update(calendar_features(week))
+        for name, values in feats.items():
+            if name in col:
+                X[:, col[name]] = values
+
+    def next_features(self, history: np.ndarray, last_year: np.ndarray, last_week: np.ndarray,
+                      static: np.ndarray) -> np.ndarray:
+        """
+        Matriks fitur minggu berikutnya (langkah pertama `forecast`) tanpa
+        memanggil model; dipakai untuk prediksi quantile satu langkah.
+        """
+        X = np.array(static, dtype=float, copy=True)
+        if len(X):
+            year, week = advance_weeks(last_year, last_week, 1)
+            self._step_features(np.asarray(history, dtype=float), 0, year, week, X)
+        return X
+
+    def forecast(
+        self,
+        history: np.ndarray,
+        last_year: np.ndarray,
+        last_week: np.ndarray,
+        static: np.ndarray,
+        horizon: int,
+    ) -> np.ndarray:
+        """
+        Parameters
+        ----------
+        history : np.ndarray
+            (pairs, buffer_weeks) units_sold terakhir, urut terlama -> terbaru (NaN = tidak ada).
+        last_year, last_week : np.ndarray
+            Minggu ISO observasi terakhir per pasangan.
+        static : np.ndarray
+            (pairs, len(feature_cols)) baris fitur terakhir; kolom non-dinamis dipakai apa adanya.
+        horizon : int
+            Jumlah minggu ke depan.
+
+        Returns
+        -------
+        np.ndarray
+            (pairs, horizon) prediksi, di-clip >= 0.
+        """
+        n = history.shape[0]
+        out = np.empty((n, horizon), dtype=float)
+        if n == 0 or horizon <= 0:
+            return out
+
+        buf = np.array(history, dtype=float, copy=True)
+        head = 0  # slot yang akan ditimpa berikutnya == observasi terlama
+        X = np.array(static, dtype=float, copy=True)
+
+        for step in range(horizon):
+            year, week = advance_weeks(last_year, last_week, step + 1)
+            self._step_features(buf, head, year, week, X)
+            y = np.maximum(0.0, self.model.predict(X))
+            out[:, step] = y
+            buf[:, head] = y
+            head = (head + 1) % self.buffer_weeks
+        return out
@@ -7,15 +7,25 @@ Time split (weekly):
 - Test  : (T-4, T]   → dipakai terutama oleh modul evaluate.
 
 Tidak ada random split; semua berdasarkan urutan waktu.
+
+Opsional (`--quantiles 0.5 0.9 0.95`): satu model quantile per level
+(LightGBM `objective="quantile"`), disimpan bersama di
+`models/artifacts/model_quantiles.pkl`. Optimizer memakai quantile yang
+cocok dengan `target_service` sebagai level stok, menggantikan
+forecast + z * demand_std.
 """
 
+import argparse
 from pathlib import Path
+from typing import Optional, Sequence
 
 import joblib
+import numpy as np
 import pandas as pd
 from sklearn.metrics import mean_absolute_error
 
 from ..common.config import PROCESSED_DIR
+from ..common.io import read_features
 
 
 FEAT_PATH = PROCESSED_DIR / "weekly_features.parquet"
@@ -23,6 +33,8 @@ ART_DIR = Path("models/artifacts")
 ART_DIR.mkdir(parents=True, exist_ok=True)
 MODEL_PATH = ART_DIR / "model_lgbm.pkl"
 STATS_PATH = ART_DIR / "demand_stats.json"
+QUANTILE_PATH = ART_DIR / "model_quantiles.pkl"
+DEFAULT_QUANTILES = (0.5, 0.9, 0.95)
 
 
 def _make_time_splits(df: pd.DataFrame):
@@ -58,13 +70,64 @@ def _make_time_splits(df: pd.DataFrame):
     return df[train_mask].copy(), df[val_mask].copy(), df[test_mask].copy()
 
 
-def train():
+def _quantile_model(q: float):
+    """LightGBM quantile regressor; fallback ke HistGradientBoosting (loss quantile)."""
+    try:
+        import lightgbm as lgb
+
+        return lgb.LGBMRegressor(objective="quantile", alpha=q, n_estimators=400, learning_rate=0.05,
+                                 num_leaves=31, verbose=-1)
+    except Exception:
+        from sklearn.ensemble import HistGradientBoostingRegressor
+
+        return HistGradientBoostingRegressor(loss="quantile", quantile=q, max_iter=300, random_state=42)
+
+
+def train_quantiles(
+    train_df: pd.DataFrame,
+    eval_df: pd.DataFrame,
+    feature_cols: Sequence[str],
+    quantiles: Sequence[float] = DEFAULT_QUANTILES,
+    label_col: str = "units_sold",
+) -> dict:
+    """
+    Latih satu model per quantile.
+
+    Returns
+    -------
+    dict
+        Bundle artefak: `quantiles` (urut naik), `models` (sejajar),
+        `feature_cols`, dan `coverage` (proporsi aktual <= prediksi di
+        `eval_df`, idealnya ~= quantile).
+    """
+    qs = sorted({float(q) for q in quantiles})
+    if not qs or qs[0] <= 0 or qs[-1] >= 1:
+        raise ValueError(f"quantile harus di (0, 1): {quantiles}")
+    models, coverage = [], {}
+    for q in qs:
+        model = _quantile_model(q)
+        model.fit(train_df[feature_cols], train_df[label_col])
+        models.append(model)
+        if len(eval_df) > 0:
+            pred = model.predict(eval_df[feature_cols])
+            coverage[q] = float(np.mean(eval_df[label_col].to_numpy() <= pred))
+            print(f"Quantile P{q * 100:g}: coverage {coverage[q]:.3f} (n={len(eval_df)})")
+    return {"quantiles": qs, "models": models, "feature_cols": list(feature_cols), "coverage": coverage}
+
+
+def train(quantiles: Optional[Sequence[float]] = None):
     """
     Train forecasting model dengan time-based split dan simpan artefak.
 
+    Parameters
+    ----------
+    quantiles : Sequence[float], optional
+        Jika diisi, latih juga model quantile (mis. 0.5, 0.9, 0.95).
+
     Output:
     - `models/artifacts/model_lgbm.pkl`
     - `models/artifacts/demand_stats.json`
+    - `models/artifacts/model_quantiles.pkl` (hanya jika `quantiles`)
     - Ringkasan MAE di terminal (val dan test).
     """
     if not FEAT_PATH.exists():
@@ -72,7 +135,7 @@ def train():
             f"{FEAT_PATH} tidak ditemukan. Jalankan dulu ETL: `python etl/build_features.py`."
         )
 
-    df = pd.read_parquet(FEAT_PATH)
+    df = read_features(FEAT_PATH)
 
     # Label & fitur
     label_col = "units_sold"
@@ -126,7 +189,17 @@ def train():
     print(f"Saved model to {MODEL_PATH}")
     print(f"Saved stats to {STATS_PATH}")
 
+    if quantiles:
+        bundle = train_quantiles(train_df, pd.concat([val_df, test_df]), feature_cols, quantiles, label_col)
+        joblib.dump(bundle, QUANTILE_PATH)
+        print(f"Saved quantile models {bundle['quantiles']} to {QUANTILE_PATH}")
+
 
 if __name__ == "__main__":
-    train()
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--quantiles", type=float, nargs="*", default=None,
+                    help=f"latih model quantile, mis. --quantiles {' '.join(map(str, DEFAULT_QUANTILES))}")
+    args = ap.parse_args()
+    quantiles = DEFAULT_QUANTILES if args.quantiles == [] else args.quantiles
+    train(quantiles=quantiles)
 
@@ -0,0 +1,158 @@
+"""
+Alokasi budget tunggal tanpa LP solver.
+
+Masalah replenishment di `compute_replenishment` (satu baris budget, x >= need)
+adalah continuous knapsack dengan satu constraint kopling:
+
+    max  sum_i w_i * x_i
+    s.t. sum_i c_i * x_i <= B,   0 <= x_i <= need_i
+
+Solusi eksaknya greedy: urutkan pasangan berdasarkan nilai per rupiah
+(w_i / c_i) menurun, lalu isi penuh sampai budget habis (pasangan di batas
+mendapat alokasi parsial). Dengan NumPy ini cukup satu argsort + cumsum,
+O(n log n), tanpa membangun model LP.
+
+- Jika budget cukup untuk semua need, hasilnya x = need (identik dengan LP
+  "minimize c.x s.t. x >= need").
+- `priority` (mis. shortage cost per unit) menentukan siapa yang didahulukan
+  ketika budget tidak cukup; default 1 per unit = maksimalkan unit tercover.
+
+Constraint tambahan (kapasitas store, multi-periode) ditangani model LP di
+`multi_period.py` / `multi_echelon.py`, bukan di sini.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+
+def priority_order(unit_cost: np.ndarray, priority: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Urutan pasangan berdasarkan nilai per rupiah menurun (stabil untuk tie).
+    """
+    unit_cost = np.asarray(unit_cost, dtype=float)
+    w = np.ones_like(unit_cost) if priority is None else np.asarray(priority, dtype=float)
+    ratio = np.divide(w, unit_cost, out=np.full_like(unit_cost, np.inf), where=unit_cost > 0)
+    return np.argsort(-ratio, kind="stable")
+
+
+def greedy_allocate(
+    need: np.ndarray,
+    unit_cost: np.ndarray,
+    budget: float,
+    priority: Optional[np.ndarray] = None,
+    order: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Solusi eksak continuous knapsack satu budget (lihat docstring modul).
+
+    Parameters
+    ----------
+    need : np.ndarray
+        (n,) kebutuhan order (>= 0).
+    unit_cost : np.ndarray
+        (n,) harga per unit.
+    budget : float
+        Batas total belanja.
+    priority : np.ndarray, optional
+        (n,) nilai per unit yang tercover (mis. shortage cost).
+    order : np.ndarray, optional
+        Urutan prioritas yang sudah dihitung (`priority_order`), untuk dipakai ulang.
+
+    Returns
+    -------
+    np.ndarray
+        (n,) kuantitas order kontinu, 0 <= x <= need.
+    """
+    need = np.maximum(0.0, np.asarray(need, dtype=float))
+    unit_cost = np.asarray(unit_cost, dtype=float)
+    spend = need * unit_cost
+    if spend.sum() <= budget:
+        return need.copy()
+
+    if order is None:
+        order = priority_order(unit_cost, priority)
+    csum = np.cumsum(spend[order])
+    k = int(np.searchsorted(csum, budget, side="right"))  # jumlah pasangan yang terisi penuh
+
+    x = np.zeros_like(need)
+    x[order[:k]] = need[order[:k]]
+    if k < len(order):
+        j = order[k]
+        left = budget - (csum[k - 1] if k > 0 else 0.0)
+        if unit_cost[j] > 0 and left > 0:
+            x[j] = min(need[j], left / unit_cost[j])
+    return x
+
+
+def budget_frontier(
+    need: np.ndarray,
+    unit_cost: np.ndarray,
+    budgets: np.ndarray,
+    priority: Optional[np.ndarray] = None,
+) -> dict:
+    """
+    Efficient frontier biaya vs need tercover untuk banyak budget sekaligus.
+
+    Urutan prioritas tidak bergantung pada need/budget, jadi cukup satu sort;
+    untuk tiap baris need (mis. satu per service level) dihitung prefix sum
+    spend & need, lalu semua budget dijawab dengan satu `searchsorted`.
+    Hasilnya identik dengan memanggil `greedy_allocate` per titik.
+
+    Parameters
+    ----------
+    need : np.ndarray
+        (S, n) need per skenario (mis. per target service level) atau (n,).
+    unit_cost : np.ndarray
+        (n,) harga per unit.
+    budgets : np.ndarray
+        (m,) daftar budget.
+    priority : np.ndarray, optional
+        (n,) nilai per unit tercover.
+
+    Returns
+    -------
+    dict
+        Array (S, m): "order_qty", "order_cost", "covered_need", "total_need",
+        "shortage". Order hanya menutup need, jadi order_qty == covered_need.
+    """
+    need = np.maximum(0.0, np.atleast_2d(np.asarray(need, dtype=float)))
+    unit_cost = np.asarray(unit_cost, dtype=float)
+    budgets = np.maximum(0.0, np.asarray(budgets, dtype=float))
+    S, n = need.shape
+    m = len(budgets)
+
+    covered = np.zeros((S, m))
+    spent = np.zeros((S, m))
+    total_need = need.sum(axis=1)
+    if n > 0:
+        order = priority_order(unit_cost, priority)
+        need_o = need[:, order]
+        cost_o = unit_cost[order]
+        zero = np.zeros((S, 1))
+        # prefix sum dengan 0 di depan: csum[:, k] = total k pasangan teratas
+        csum_spend = np.concatenate([zero, np.cumsum(need_o * cost_o, axis=1)], axis=1)
+        csum_need = np.concatenate([zero, np.cumsum(need_o, axis=1)], axis=1)
+
+        for s in range(S):
+            k = np.searchsorted(csum_spend[s], budgets, side="right") - 1  # pasangan terisi penuh
+            prev_spend = csum_spend[s][k]
+            # pasangan berikutnya mendapat alokasi parsial dari sisa budget
+            j = np.minimum(k, n - 1)
+            c_j = cost_o[j]
+            ok = (k < n) & (c_j > 0)
+            partial = np.zeros(m)
+            partial[ok] = np.minimum(need_o[s, j[ok]], (budgets[ok] - prev_spend[ok]) / c_j[ok])
+            covered[s] = csum_need[s][k] + partial
+            spent[s] = prev_spend + partial * c_j
+        total_need = csum_need[:, -1]
+
+    total = np.repeat(total_need[:, None], m, axis=1)
+    covered = np.minimum(covered, total)
+    return {
+        "order_qty": covered,
+        "order_cost": spent,
+        "covered_need": covered,
+        "total_need": total,
+        "shortage": np.maximum(0.0, total - covered),
+    }
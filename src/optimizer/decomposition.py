@@ -0,0 +1,272 @@
+"""
+Dekomposisi LP replenishment multi-periode per store / region.
+
+Satu-satunya constraint yang mengikat antar store adalah budget per periode
+(kapasitas sudah per store). Constraint itu di-relaksasi secara Lagrangian:
+
+    L(lam) = sum_g  min_{x_g} [ cost_g(x_g) + sum_t lam_t * spend_{g,t}(x_g) ]  -  sum_t lam_t * B_t
+
+Untuk lam tetap, setiap grup (store atau region) adalah LP kecil yang
+independen (`build_lp` tanpa budget, biaya order periode t dikali (1 + lam_t))
+dan diselesaikan paralel di process pool. Harga dual lam di-update dengan
+projected subgradient terhadap pelanggaran budget.
+
+Solusi primal dipulihkan dari solusi subproblem: order di periode yang
+melanggar budget di-scale turun, lalu inventory/shortage dihitung ulang
+dengan simulasi maju (tetap feasible untuk balance, kapasitas dan shelf-life
+karena inventory hanya bisa turun). Hasil melaporkan lower bound dual dan,
+bila diminta, gap terhadap solve monolitik.
+"""
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import linprog
+
+from .multi_period import MultiPeriodProblem, build_lp, solve_multi_period
+
+
+@dataclass
+class DecomposedResult:
+    orders: np.ndarray
+    inventory: np.ndarray
+    shortage: np.ndarray
+    objective: float
+    dual_bound: float
+    lambdas: np.ndarray
+    iterations: int
+    n_groups: int
+    seconds: float
+    monolithic_objective: Optional[float] = None
+    monolithic_seconds: Optional[float] = None
+    history: List[Dict[str, float]] = field(default_factory=list)
+
+    @property
+    def dual_gap(self) -> float:
+        """(primal - lower bound) / |primal|; batas atas gap optimalitas."""
+        return (self.objective - self.dual_bound) / max(abs(self.objective), 1e-9)
+
+    @property
+    def gap_vs_monolithic(self) -> Optional[float]:
+        if self.monolithic_objective is None:
+            return None
+        return (self.objective - self.monolithic_objective) / max(abs(self.monolithic_objective), 1e-9)
+
+
+def group_codes_from_regions(store_ids: np.ndarray, stores: pd.DataFrame, column: str = "region") -> np.ndarray:
+    """
+    Kode grup integer per pasangan berdasarkan kolom `stores.csv` (mis. region).
+    Store yang tidak ada di master data mendapat grup sendiri ("__unknown__").
+    """
+    mapping = stores.set_index("store_id")[column]
+    labels = pd.Series(store_ids).map(mapping).fillna("__unknown__").to_numpy()
+    return pd.factorize(labels)[0]
+
+
+def _subproblem(problem: MultiPeriodProblem, idx: np.ndarray) -> MultiPeriodProblem:
+    """Potong masalah ke subset pasangan `idx`, tanpa constraint budget."""
+    store_codes = store_capacity = None
+    if problem.store_codes is not None and problem.store_capacity is not None:
+        codes = np.asarray(problem.store_codes)[idx]
+        uniq, local = np.unique(codes, return_inverse=True)
+        store_codes = local
+        store_capacity = np.asarray(problem.store_capacity)[uniq]
+
+    def cut(a):
+        return None if a is None else np.asarray(a)[idx]
+
+    return MultiPeriodProblem(
+        demand=cut(problem.demand),
+        on_hand=cut(problem.on_hand),
+        unit_cost=cut(problem.unit_cost),
+        holding_cost=cut(problem.holding_cost),
+        shortage_cost=cut(problem.shortage_cost),
+        lead_time=cut(problem.lead_time),
+        receipts=cut(problem.receipts),
+        store_codes=store_codes,
+        store_capacity=store_capacity,
+        budget=None,
+        shelf_life=problem.shelf_life,
+        disposal_cost=cut(problem.disposal_cost),
+    )
+
+
+def _solve_priced(sub: MultiPeriodProblem, lam: np.ndarray):
+    """
+    Solve subproblem dengan harga dual lam -> (orders (n_g, T), objective Lagrangian).
+    """
+    n, T = sub.shape
+    lp = build_lp(sub)
+    t_idx = np.tile(np.arange(T), n)
+    c = lp.c.copy()
+    c[: n * T] *= 1.0 + lam[t_idx]
+    res = linprog(c, A_ub=lp.A_ub, b_ub=lp.b_ub, A_eq=lp.A_eq, b_eq=lp.b_eq, bounds=lp.bounds, method="highs")
+    if res.status != 0:
+        raise RuntimeError(f"Subproblem gagal: {res.message}")
+    return res.x[: n * T].reshape(n, T), float(res.fun)
+
+
+# --- process pool: subproblem dikirim sekali lewat initializer, per iterasi hanya lam ---
+_WORKER_SUBS: List[MultiPeriodProblem] = []
+
+
+def _init_worker(subs: List[MultiPeriodProblem]) -> None:
+    global _WORKER_SUBS
+    _WORKER_SUBS = subs
+
+
+def _solve_group(args):
+    gid, lam = args
+    return _solve_priced(_WORKER_SUBS[gid], lam)
+
+
+def simulate_orders(problem: MultiPeriodProblem, orders: np.ndarray):
+    """
+    Simulasi maju untuk order tetap -> (inventory, shortage, total cost).
+    Lost sales: demand yang tidak terlayani hilang.
+    """
+    d = np.asarray(problem.demand, dtype=float)
+    n, T = d.shape
+    L = np.asarray(problem.lead_time, dtype=np.int64)
+    receipts = np.zeros((n, T)) if problem.receipts is None else np.asarray(problem.receipts, dtype=float)
+    arrivals = receipts.copy()
+    rows = np.arange(n)
+    for t in range(T):
+        src = t - L
+        ok = src >= 0
+        arrivals[rows[ok], t] += orders[rows[ok], src[ok]]
+
+    inv = np.zeros((n, T))
+    short = np.zeros((n, T))
+    level = np.asarray(problem.on_hand, dtype=float).copy()
+    for t in range(T):
+        avail = level + arrivals[:, t]
+        short[:, t] = np.maximum(0.0, d[:, t] - avail)
+        level = np.maximum(0.0, avail - d[:, t])
+        inv[:, t] = level
+
+    cost = (
+        (orders * np.asarray(problem.unit_cost)[:, None]).sum()
+        + (inv * np.asarray(problem.holding_cost)[:, None]).sum()
+        + (short * np.asarray(problem.shortage_cost)[:, None]).sum()
+    )
+    return inv, short, float(cost)
+
+
+def _repair_budget(problem: MultiPeriodProblem, orders: np.ndarray) -> np.ndarray:
+    """Scale turun order di periode yang melanggar budget."""
+    if problem.budget is None:
+        return orders
+    spend = (orders * np.asarray(problem.unit_cost)[:, None]).sum(axis=0)
+    budget = np.asarray(problem.budget, dtype=float)
+    scale = np.where(spend > budget, budget / np.maximum(spend, 1e-12), 1.0)
+    return orders * scale[None, :]
+
+
+def solve_decomposed(
+    problem: MultiPeriodProblem,
+    groups: np.ndarray,
+    workers: Optional[int] = None,
+    max_iter: int = 30,
+    step: float = 0.5,
+    tol: float = 1e-3,
+    compare_monolithic: bool = False,
+) -> DecomposedResult:
+    """
+    Parameters
+    ----------
+    problem : MultiPeriodProblem
+        Masalah lengkap (dengan `budget` per periode sebagai constraint kopling).
+    groups : np.ndarray
+        (n,) kode grup per pasangan (mis. `store_codes` atau `group_codes_from_regions`).
+    workers : int, optional
+        Jumlah proses; None/1 = solve berurutan di proses ini.
+    max_iter : int
+        Iterasi subgradient maksimum.
+    step : float
+        Step awal (relatif terhadap biaya order); menurun 1/sqrt(k).
+    tol : float
+        Berhenti jika dual gap relatif < tol.
+    compare_monolithic : bool
+        Jika True, solve juga LP monolitik untuk melaporkan gap aktual.
+    """
+    t_start = time.perf_counter()
+    n, T = problem.shape
+    groups = np.asarray(groups)
+    uniq = np.unique(groups)
+    members = [np.flatnonzero(groups == g) for g in uniq]
+    subs = [_subproblem(problem, idx) for idx in members]
+    unit_cost = np.asarray(problem.unit_cost, dtype=float)
+    budget = None if problem.budget is None else np.asarray(problem.budget, dtype=float)
+
+    pool = None
+    if workers and workers > 1 and len(subs) > 1:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(subs,))
+
+    def solve_all(lam):
+        if pool is not None:
+            return list(pool.map(_solve_group, [(g, lam) for g in range(len(subs))], chunksize=max(1, len(subs) // (4 * workers))))
+        return [_solve_priced(sub, lam) for sub in subs]
+
+    lam = np.zeros(T)
+    best = avg = None
+    best_bound = -np.inf
+    history: List[Dict[str, float]] = []
+    it = 0
+    try:
+        for it in range(1, max_iter + 1):
+            t_solve = time.perf_counter()
+            parts = solve_all(lam)
+            solve_seconds = time.perf_counter() - t_solve
+            orders = np.zeros((n, T))
+            for idx, (x_g, _) in zip(members, parts):
+                orders[idx] = x_g
+
+            lag_obj = sum(obj for _, obj in parts)
+            bound = lag_obj - (float(lam @ budget) if budget is not None else 0.0)
+            best_bound = max(best_bound, bound)
+
+            # rata-rata ergodik iterasi subproblem konvergen ke solusi primal LP
+            avg = orders if avg is None else avg + (orders - avg) / it
+            for cand in (orders, avg):
+                feasible = _repair_budget(problem, cand)
+                inv, short, primal = simulate_orders(problem, feasible)
+                if best is None or primal < best[0]:
+                    best = (primal, feasible, inv, short)
+
+            gap = (best[0] - best_bound) / max(abs(best[0]), 1e-9)
+            history.append({"iter": it, "primal": best[0], "bound": bound, "gap": gap, "solve_seconds": solve_seconds})
+            if budget is None or gap < tol:
+                break
+
+            spend = (orders * unit_cost[:, None]).sum(axis=0)
+            g = (spend - budget) / np.maximum(budget, 1e-9)
+            if np.all(g <= 0) and np.all(lam * g == 0):
+                break  # complementary slackness terpenuhi
+            lam = np.maximum(0.0, lam + step / np.sqrt(it) * g / max(np.linalg.norm(g), 1e-12))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    primal, orders, inv, short = best
+    result = DecomposedResult(
+        orders=orders,
+        inventory=inv,
+        shortage=short,
+        objective=primal,
+        dual_bound=best_bound,
+        lambdas=lam,
+        iterations=it,
+        n_groups=len(subs),
+        seconds=time.perf_counter() - t_start,
+        history=history,
+    )
+    if compare_monolithic:
+        mono = solve_multi_period(problem)
+        result.monolithic_objective = mono.objective
+        result.monolithic_seconds = mono.build_seconds + mono.solve_seconds
+    return result
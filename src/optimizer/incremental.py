@@ -0,0 +1,260 @@
+"""
+Re-optimisasi inkremental ketika hanya inventory (on_hand / on_order) berubah.
+
+1. Budget tunggal (`IncrementalAllocator`)
+   Urutan prioritas greedy (lihat `allocation.py`) hanya bergantung pada harga
+   dan priority, bukan pada need, jadi tetap valid saat inventory berubah.
+   Spend per pasangan disimpan dalam Fenwick tree menurut urutan prioritas:
+   - update need k pasangan : O(k log n) (vectorized per level tree),
+   - cari batas budget      : O(log n) (binary lifting),
+   - hanya pasangan yang berubah dan pasangan di antara batas lama/baru yang
+     alokasinya ditulis ulang.
+   Hasilnya identik dengan `greedy_allocate` pada data terbaru.
+
+2. LP multi-periode (`WarmStartLP`)
+   Inventory hanya muncul di ruas kanan baris balance (t = 0 untuk on_hand,
+   semua t untuk receipts), jadi matriks tidak perlu dibangun ulang: cukup
+   ubah b_eq baris yang terdampak. Jika `highspy` terpasang, model HiGHS
+   disimpan dan hanya row bounds yang diganti, sehingga solve berikutnya
+   mulai dari basis sebelumnya (warm start). Tanpa `highspy`, solve ulang
+   memakai `linprog` dengan matriks yang sama (tanpa biaya build).
+"""
+
+import time
+from typing import Optional
+
+import numpy as np
+from scipy.optimize import linprog
+
+from .allocation import priority_order
+from .multi_period import MultiPeriodProblem, MultiPeriodResult, build_lp, split_solution
+
+try:
+    import highspy
+
+    HIGHSPY_OK = True
+except ImportError:  # pragma: no cover - optional dependency
+    highspy = None
+    HIGHSPY_OK = False
+
+# delta yang menyentuh lebih dari fraksi ini -> bangun ulang tree sekaligus
+REBUILD_FRACTION = 0.25
+
+
+class IncrementalAllocator:
+    """
+    Continuous knapsack satu budget yang bisa di-update per pasangan.
+
+    Parameters
+    ----------
+    need : np.ndarray
+        (n,) kebutuhan order awal.
+    unit_cost : np.ndarray
+        (n,) harga per unit.
+    budget : float
+        Batas total belanja.
+    priority : np.ndarray, optional
+        (n,) nilai per unit tercover (sama seperti `greedy_allocate`).
+    """
+
+    def __init__(self, need: np.ndarray, unit_cost: np.ndarray, budget: float, priority: Optional[np.ndarray] = None):
+        self.need = np.maximum(0.0, np.asarray(need, dtype=float)).copy()
+        self.unit_cost = np.asarray(unit_cost, dtype=float)
+        self.budget = float(budget)
+        self.order = priority_order(self.unit_cost, priority)
+        self.rank = np.empty_like(self.order)
+        self.rank[self.order] = np.arange(len(self.order))
+        self.x = np.zeros_like(self.need)
+        self._rebuild()
+
+    def __len__(self) -> int:
+        return len(self.need)
+
+    # --- Fenwick tree (1-based) atas spend dalam urutan prioritas ---
+    def _rebuild(self) -> None:
+        n = len(self.need)
+        spend_o = (self.need * self.unit_cost)[self.order]
+        csum = np.concatenate([[0.0], np.cumsum(spend_o)])
+        i = np.arange(1, n + 1)
+        self._tree = np.zeros(n + 1)
+        self._tree[1:] = csum[i] - csum[i - (i & -i)]
+        self._k, self._left = self._search(self.budget)
+        self.x[:] = 0.0
+        full = self.order[: self._k]
+        self.x[full] = self.need[full]
+        self._set_partial()
+
+    def _add(self, ranks: np.ndarray, delta: np.ndarray) -> None:
+        n = len(self.need)
+        pos = ranks + 1
+        while pos.size:
+            np.add.at(self._tree, pos, delta)
+            pos = pos + (pos & -pos)
+            keep = pos <= n
+            pos, delta = pos[keep], delta[keep]
+
+    def _search(self, budget: float):
+        """(k, sisa): k = jumlah pasangan teratas yang terisi penuh dalam budget."""
+        n = len(self.need)
+        pos, rem = 0, budget
+        step = 1 << max(0, n.bit_length() - 1) if n else 0
+        while step:
+            nxt = pos + step
+            if nxt <= n and self._tree[nxt] <= rem:
+                pos = nxt
+                rem -= self._tree[nxt]
+            step >>= 1
+        return pos, rem
+
+    def _set_partial(self) -> None:
+        if self._k < len(self.order):
+            j = self.order[self._k]
+            c = self.unit_cost[j]
+            self.x[j] = min(self.need[j], self._left / c) if c > 0 and self._left > 0 else 0.0
+
+    def _refresh(self, idx: np.ndarray, k_old: int) -> np.ndarray:
+        """Tulis ulang x untuk pasangan berubah + pasangan di antara batas lama/baru."""
+        lo, hi = min(k_old, self._k), max(k_old, self._k)
+        span = self.order[lo : min(hi + 1, len(self.order))]
+        touched = np.unique(np.concatenate([np.asarray(idx, dtype=np.int64), span]))
+        r = self.rank[touched]
+        self.x[touched] = np.where(r < self._k, self.need[touched], 0.0)
+        self._set_partial()
+        return touched
+
+    def update(self, idx: np.ndarray, need: np.ndarray) -> np.ndarray:
+        """
+        Ganti need pasangan `idx`. Mengembalikan indeks yang alokasinya
+        (mungkin) berubah.
+        """
+        idx = np.asarray(idx, dtype=np.int64)
+        need = np.maximum(0.0, np.asarray(need, dtype=float))
+        if idx.size == 0:
+            return idx
+        if idx.size > REBUILD_FRACTION * len(self.need):
+            self.need[idx] = need
+            self._rebuild()
+            return np.arange(len(self.need))
+
+        # idx bisa duplikat: pakai nilai terakhir per pasangan
+        rev_unique = len(idx) - 1 - np.unique(idx[::-1], return_index=True)[1]
+        idx, need = idx[rev_unique], need[rev_unique]
+        delta = (need - self.need[idx]) * self.unit_cost[idx]
+        self.need[idx] = need
+        self._add(self.rank[idx], delta)
+        k_old = self._k
+        self._k, self._left = self._search(self.budget)
+        return self._refresh(idx, k_old)
+
+    def set_budget(self, budget: float) -> np.ndarray:
+        """Ganti budget tanpa menyentuh need; hanya batas alokasi yang bergeser."""
+        self.budget = float(budget)
+        k_old = self._k
+        self._k, self._left = self._search(self.budget)
+        return self._refresh(np.empty(0, dtype=np.int64), k_old)
+
+
+class WarmStartLP:
+    """
+    LP multi-periode yang disimpan antar solve; update inventory hanya
+    mengubah ruas kanan baris balance.
+
+    Parameters
+    ----------
+    problem : MultiPeriodProblem
+        Masalah awal (array-nya disalin).
+    use_highspy : bool, optional
+        Default: pakai `highspy` bila terpasang.
+    """
+
+    def __init__(self, problem: MultiPeriodProblem, use_highspy: Optional[bool] = None):
+        self.problem = problem
+        n, T = problem.shape
+        self.on_hand = np.asarray(problem.on_hand, dtype=float).copy()
+        self.receipts = (
+            np.zeros((n, T)) if problem.receipts is None else np.asarray(problem.receipts, dtype=float).copy()
+        )
+        self._demand = np.asarray(problem.demand, dtype=float)
+        t0 = time.perf_counter()
+        self.lp = build_lp(problem)
+        self.build_seconds = time.perf_counter() - t0
+        self.use_highspy = HIGHSPY_OK if use_highspy is None else (use_highspy and HIGHSPY_OK)
+        self._highs = None
+        self._dirty_rows = np.empty(0, dtype=np.int64)
+
+    def update_inventory(self, idx: np.ndarray, on_hand: Optional[np.ndarray] = None,
+                         receipts: Optional[np.ndarray] = None) -> None:
+        """Ganti on_hand (n_k,) dan/atau receipts (n_k, T) untuk pasangan `idx`."""
+        idx = np.asarray(idx, dtype=np.int64)
+        T = self._demand.shape[1]
+        if on_hand is not None:
+            self.on_hand[idx] = on_hand
+        if receipts is not None:
+            self.receipts[idx] = receipts
+        rows = (idx[:, None] * T + np.arange(T)).ravel()
+        b = self.receipts[idx] - self._demand[idx]
+        b[:, 0] += self.on_hand[idx]
+        self.lp.b_eq[rows] = b.ravel()
+        self._dirty_rows = np.union1d(self._dirty_rows, rows)
+
+    def _highs_model(self):
+        import scipy.sparse as sp
+
+        lp = self.lp
+        inf = highspy.kHighsInf
+        A = lp.A_eq if lp.A_ub is None else sp.vstack([lp.A_eq, lp.A_ub])
+        A = A.tocsc()
+        row_lo = np.concatenate([lp.b_eq] + ([np.full(len(lp.b_ub), -inf)] if lp.A_ub is not None else []))
+        row_hi = np.concatenate([lp.b_eq] + ([lp.b_ub] if lp.A_ub is not None else []))
+        model = highspy.HighsLp()
+        model.num_col_ = A.shape[1]
+        model.num_row_ = A.shape[0]
+        model.col_cost_ = lp.c
+        model.col_lower_ = lp.bounds[:, 0]
+        model.col_upper_ = np.where(np.isinf(lp.bounds[:, 1]), inf, lp.bounds[:, 1])
+        model.row_lower_ = row_lo
+        model.row_upper_ = row_hi
+        model.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+        model.a_matrix_.start_ = A.indptr
+        model.a_matrix_.index_ = A.indices
+        model.a_matrix_.value_ = A.data
+        h = highspy.Highs()
+        h.setOptionValue("output_flag", False)
+        h.passModel(model)
+        return h
+
+    def solve(self) -> MultiPeriodResult:
+        n, T = self.problem.shape
+        lp = self.lp
+        t0 = time.perf_counter()
+        if self.use_highspy:
+            if self._highs is None:
+                self._highs = self._highs_model()
+            elif self._dirty_rows.size:
+                vals = lp.b_eq[self._dirty_rows]
+                self._highs.changeRowsBounds(len(self._dirty_rows), self._dirty_rows, vals, vals)
+            self._highs.run()
+            ok = self._highs.getModelStatus() == highspy.HighsModelStatus.kOptimal
+            x = np.asarray(self._highs.getSolution().col_value) if ok else np.zeros(lp.c.size)
+            objective = self._highs.getInfo().objective_function_value if ok else float("nan")
+            status, message = (0, "Optimal (warm start)") if ok else (4, str(self._highs.getModelStatus()))
+        else:
+            res = linprog(lp.c, A_ub=lp.A_ub, b_ub=lp.b_ub, A_eq=lp.A_eq, b_eq=lp.b_eq,
+                          bounds=lp.bounds, method="highs")
+            x = res.x if res.x is not None else np.zeros(lp.c.size)
+            objective = float(res.fun) if res.fun is not None else float("nan")
+            status, message = int(res.status), str(res.message)
+        solve_seconds = time.perf_counter() - t0
+        self._dirty_rows = np.empty(0, dtype=np.int64)
+
+        n_cons = lp.A_eq.shape[0] + (lp.A_ub.shape[0] if lp.A_ub is not None else 0)
+        return MultiPeriodResult(
+            **split_solution(x, n, T),
+            objective=float(objective),
+            status=status,
+            message=message,
+            build_seconds=0.0,
+            solve_seconds=solve_seconds,
+            n_vars=int(lp.c.size),
+            n_constraints=int(n_cons),
+        )
@@ -0,0 +1,243 @@
+"""
+Pembulatan integer order ke case-pack + MOQ tanpa MILP.
+
+Solusi kontinu dari allocator (`allocation.py`) dibulatkan dalam tiga tahap
+yang semuanya vectorized (tanpa loop per pasangan):
+
+1. Round up ke kelipatan case pack (floor bisa under-order).
+2. MOQ: order harus 0 atau >= MOQ (MOQ dibulatkan ke atas ke kelipatan
+   pack). Order di bawah MOQ dinaikkan ke MOQ jika shortage yang dicegah
+   lebih mahal daripada excess yang ditimbulkan, selain itu dibuang ke 0.
+3. Repair budget: jika total belanja melebihi budget, lot dilepas satu per
+   satu (satu pack, atau seluruh order jika sudah di MOQ) dengan biaya
+   shortage marginal per rupiah yang dihemat paling kecil terlebih dahulu.
+   Sisa budget kemudian dipakai sekali lagi untuk menambah satu lot ke
+   pasangan yang masih short (nilai per rupiah terbesar dulu).
+
+Biaya marginal per pasangan dibuat monoton (running max) sehingga langkah
+pelepasan per pasangan selalu diambil berurutan dari atas; hanya ada satu
+sort global atas maksimal 4 segmen per pasangan. `milp_lot_size`
+menyelesaikan masalah yang sama secara eksak (scipy `milp`) untuk mengukur
+gap heuristik pada instance kecil.
+"""
+
+from typing import Optional
+
+import numpy as np
+from scipy.optimize import Bounds, LinearConstraint, milp
+
+
+def _as_array(value, n: int, default: float) -> np.ndarray:
+    if value is None:
+        return np.full(n, default, dtype=float)
+    return np.broadcast_to(np.asarray(value, dtype=float), (n,)).astype(float)
+
+
+def _lot_params(n: int, case_pack, moq):
+    pack = np.maximum(1.0, np.round(_as_array(case_pack, n, 1.0)))
+    moq = np.maximum(0.0, _as_array(moq, n, 0.0))
+    # MOQ efektif: kelipatan pack terkecil yang >= MOQ (minimal satu pack)
+    min_lot = np.maximum(1.0, np.ceil(moq / pack - 1e-9)) * pack
+    return pack, min_lot
+
+
+def lot_cost(x: np.ndarray, need: np.ndarray, shortage_cost: np.ndarray, excess_cost: np.ndarray) -> float:
+    """Biaya shortage + excess untuk order `x` terhadap `need`."""
+    return float((shortage_cost * np.maximum(0.0, need - x)).sum() + (excess_cost * np.maximum(0.0, x - need)).sum())
+
+
+def lot_size(
+    qty: np.ndarray,
+    unit_cost: np.ndarray,
+    budget: Optional[float] = None,
+    case_pack=None,
+    moq=None,
+    need: Optional[np.ndarray] = None,
+    shortage_cost: Optional[np.ndarray] = None,
+    excess_cost: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Bulatkan order kontinu ke lot yang valid dan perbaiki pelanggaran budget.
+
+    Parameters
+    ----------
+    qty : np.ndarray
+        (n,) order kontinu (mis. hasil `greedy_allocate`).
+    unit_cost : np.ndarray
+        (n,) harga per unit.
+    budget : float, optional
+        Batas total belanja; None = tanpa repair budget.
+    case_pack, moq : np.ndarray or scalar, optional
+        Ukuran pack (default 1) dan minimum order quantity (default 0).
+    need : np.ndarray, optional
+        (n,) kebutuhan acuan untuk menghitung shortage; default `qty`.
+    shortage_cost : np.ndarray, optional
+        (n,) biaya per unit need yang tidak tercover; default 1 (sama dengan
+        `priority` default allocator: maksimalkan unit tercover).
+    excess_cost : np.ndarray, optional
+        (n,) biaya per unit order di atas need; default 0.
+
+    Returns
+    -------
+    np.ndarray
+        (n,) order integer: 0 atau kelipatan pack >= MOQ.
+    """
+    qty = np.maximum(0.0, np.asarray(qty, dtype=float))
+    n = len(qty)
+    unit_cost = _as_array(unit_cost, n, 0.0)
+    need = qty if need is None else np.maximum(0.0, np.asarray(need, dtype=float))
+    s_cost = _as_array(shortage_cost, n, 1.0)
+    e_cost = _as_array(excess_cost, n, 0.0)
+    pack, min_lot = _lot_params(n, case_pack, moq)
+
+    # 1) round up ke kelipatan pack (toleransi untuk noise floating point)
+    x = np.ceil(qty / pack - 1e-9) * pack
+
+    # 2) MOQ: naikkan ke min_lot atau buang ke 0, mana yang lebih murah
+    below = (x > 0) & (x < min_lot)
+    raise_cost = s_cost * np.maximum(0.0, need - min_lot) + e_cost * np.maximum(0.0, min_lot - need)
+    drop_cost = s_cost * need
+    x = np.where(below, np.where(raise_cost <= drop_cost, min_lot, 0.0), x)
+
+    if budget is None:
+        return x.astype(np.int64)
+    spend = float((x * unit_cost).sum())
+    if spend > budget:
+        x = _release(x, need, unit_cost, budget, spend, pack, min_lot, s_cost, e_cost)
+    x = _refill(x, need, unit_cost, budget, pack, min_lot, s_cost, e_cost)
+    return x.astype(np.int64)
+
+
+def _step_cost(level_from, level_to, need, s_cost, e_cost):
+    """Kenaikan biaya saat order turun dari `level_from` ke `level_to`."""
+    before = s_cost * np.maximum(0.0, need - level_from) + e_cost * np.maximum(0.0, level_from - need)
+    after = s_cost * np.maximum(0.0, need - level_to) + e_cost * np.maximum(0.0, level_to - need)
+    return after - before
+
+
+def _release(x, need, unit_cost, budget, spend, pack, min_lot, s_cost, e_cost):
+    """
+    Lepas lot dengan biaya marginal per rupiah terkecil sampai budget terpenuhi.
+
+    Langkah satu-pack per pasangan dikelompokkan menjadi maksimal 4 segmen
+    dengan biaya marginal yang sama: (A) pack yang seluruhnya excess, (B) pack
+    yang memotong need, (C) pack di bawah need sampai MOQ, (D) MOQ -> 0.
+    Segmen terakhir yang diambil boleh parsial (sebagian pack-nya saja).
+    """
+    act = np.flatnonzero(x > 0)
+    xa, na, pa, ma = x[act], need[act], pack[act], min_lot[act]
+    above = np.round((xa - ma) / pa)                              # jumlah pack di atas MOQ
+    cnt_a = np.clip(np.floor((xa - np.maximum(na, ma)) / pa + 1e-9), 0, above)
+    top_b = xa - cnt_a * pa
+    cnt_b = ((top_b > na) & (cnt_a < above)).astype(float)
+    cnt_c = above - cnt_a - cnt_b
+    top_c = top_b - cnt_b * pa
+
+    m = len(act)
+    counts = np.stack([cnt_a, cnt_b, cnt_c, np.ones(m)], axis=1)
+    tops = np.stack([xa, top_b, top_c, ma], axis=1)
+    sizes = np.stack([pa, pa, pa, ma], axis=1)
+
+    ca, sa, ea = unit_cost[act], s_cost[act], e_cost[act]
+    step_saving = sizes * ca[:, None]
+    # biaya marginal per segmen: A murni excess, C murni shortage, B & D dihitung eksplisit
+    step_cost = np.stack([
+        -ea * pa,
+        _step_cost(top_b, top_b - pa, na, sa, ea),
+        sa * pa,
+        _step_cost(ma, 0.0, na, sa, ea),
+    ], axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(step_saving > 0, step_cost / step_saving, np.inf)
+    # running max per pasangan -> segmen atas selalu dilepas lebih dulu
+    ratio = np.maximum.accumulate(np.where(counts > 0, ratio, -np.inf), axis=1)
+
+    # satu sort global atas segmen yang ada
+    flat = np.flatnonzero(counts.ravel() > 0)
+    order = flat[np.argsort(ratio.ravel()[flat])]
+    seg_saving = (counts * step_saving).ravel()[order]
+    csum = np.cumsum(seg_saving)
+    k = min(int(np.searchsorted(csum, spend - budget - 1e-9, side="left")), len(order) - 1)
+    left = spend - budget - (csum[k - 1] if k > 0 else 0.0)
+
+    # level akhir = bottom segmen terbawah yang diambil per pasangan; segmen
+    # terakhir (order[k]) bisa parsial. Jika ratio sama membuat segmen bawah
+    # terambil sebelum segmen atas, segmen atas ikut terlepas (hemat lebih banyak).
+    bottoms = (tops - counts * sizes).ravel()
+    last = order[k]
+    ss = step_saving.ravel()[last]
+    n_last = min(counts.ravel()[last], np.ceil(left / ss - 1e-9)) if ss > 0 else counts.ravel()[last]
+    bottoms[last] = tops.ravel()[last] - n_last * sizes.ravel()[last]
+    taken = np.zeros(m * 4, dtype=bool)
+    taken[order[: k + 1]] = True
+    taken = taken.reshape(m, 4)
+    deepest = 3 - np.argmax(taken[:, ::-1], axis=1)
+    hit = taken.any(axis=1)
+
+    new_level = x.copy()
+    new_level[act[hit]] = bottoms.reshape(m, 4)[np.flatnonzero(hit), deepest[hit]]
+    return new_level
+
+
+def _refill(x, need, unit_cost, budget, pack, min_lot, s_cost, e_cost):
+    """Pakai sisa budget untuk satu lot tambahan di pasangan yang masih short."""
+    left = budget - float((x * unit_cost).sum())
+    if left <= 0:
+        return x
+    step = np.where(x > 0, pack, min_lot)
+    cost = step * unit_cost
+    gain = -_step_cost(x, x + step, need, s_cost, e_cost)
+    cand = np.flatnonzero((gain > 0) & (cost <= left))
+    if cand.size == 0:
+        return x
+    ratio = np.divide(gain[cand], cost[cand], out=np.full(len(cand), np.inf), where=cost[cand] > 0)
+    cand = cand[np.argsort(-ratio, kind="stable")]
+    fits = np.cumsum(cost[cand]) <= left + 1e-9
+    x = x.copy()
+    x[cand[fits]] += step[cand[fits]]
+    return x
+
+
+def milp_lot_size(
+    need: np.ndarray,
+    unit_cost: np.ndarray,
+    budget: float,
+    case_pack=None,
+    moq=None,
+    shortage_cost: Optional[np.ndarray] = None,
+    excess_cost: Optional[np.ndarray] = None,
+    time_limit: Optional[float] = None,
+) -> np.ndarray:
+    """
+    Solusi eksak (HiGHS MILP) untuk instance kecil; dipakai sebagai acuan gap.
+
+    Variabel per pasangan: k (jumlah pack, integer), y (order atau tidak, biner),
+    u (need tercover), e (excess). x = pack * k.
+    """
+    need = np.maximum(0.0, np.asarray(need, dtype=float))
+    n = len(need)
+    unit_cost = _as_array(unit_cost, n, 0.0)
+    s_cost = _as_array(shortage_cost, n, 1.0)
+    e_cost = _as_array(excess_cost, n, 0.0)
+    pack, min_lot = _lot_params(n, case_pack, moq)
+    k_min = min_lot / pack
+    k_max = np.maximum(k_min, np.ceil(np.maximum(need, budget / np.maximum(unit_cost, 1e-9)) / pack))
+
+    # layout: [k | y | u | e]; minimisasi -s*u + e_cost*e (konstanta s*need diabaikan)
+    I = np.eye(n)
+    Z = np.zeros((n, n))
+    c = np.concatenate([np.zeros(n), np.zeros(n), -s_cost, e_cost])
+    cons = [
+        LinearConstraint(np.hstack([np.diag(pack), Z, -I, -I]), 0.0, 0.0),      # x = u + e
+        LinearConstraint(np.hstack([I, -np.diag(k_min), Z, Z]), 0.0, np.inf),   # k >= k_min * y
+        LinearConstraint(np.hstack([I, -np.diag(k_max), Z, Z]), -np.inf, 0.0),  # k <= k_max * y
+        LinearConstraint(np.concatenate([pack * unit_cost, np.zeros(3 * n)])[None, :], -np.inf, budget),
+    ]
+    lb = np.zeros(4 * n)
+    ub = np.concatenate([k_max, np.ones(n), need, np.full(n, np.inf)])
+    integrality = np.concatenate([np.ones(2 * n), np.zeros(2 * n)])
+    options = {} if time_limit is None else {"time_limit": time_limit}
+    res = milp(c, constraints=cons, integrality=integrality, bounds=Bounds(lb, ub), options=options)
+    if res.x is None:
+        raise RuntimeError(f"MILP gagal: {res.message}")
+    return np.round(res.x[:n]) * pack
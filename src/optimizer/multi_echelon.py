@@ -0,0 +1,352 @@
+"""
+Replenishment multi-echelon supplier -> DC -> store sebagai min-cost flow
+pada jaringan time-expanded (LP dengan matriks incidence `scipy.sparse`).
+
+Node (per produk, per periode t):
+- DC (d, p, t)   : stok DC,
+- store (i, t)   : pasangan store-produk i (store dilayani satu DC).
+
+Arc (semua variabel kontinu >= 0):
+- y[d,p,t]  supplier -> DC,    tiba di t + L_supplier[d],
+- J[d,p,t]  DC (d,p,t) -> (d,p,t+1)   (stok DC dibawa ke periode berikutnya),
+- z[i,t]    DC -> store,       tiba di t + L_transfer[i] (lead time per lane),
+- I[i,t]    store (i,t) -> (i,t+1),
+- s[i,t]    demand tidak terlayani (lost sales), s <= demand,
+- u[i]      kekurangan stok akhir horizon terhadap `safety_stock` (opsional).
+
+Konservasi flow (baris A_eq = matriks incidence node x arc):
+    DC    : J[t] - J[t-1] - y[t-Ls] + sum_{i dilayani d, produk p} z[i,t] = on_hand_dc * [t=0]
+    store : I[t] - I[t-1] - z[t-Lt] - s[t] = receipts[t] - demand[t] (+ on_hand * [t=0])
+
+Safety stock dimodelkan SEKALI sebagai target stok store di akhir horizon
+(soft: I[i,T-1] + u[i] >= safety_stock[i], u dikenai shortage cost), bukan
+ditambahkan ke demand setiap periode.
+
+Objective: biaya beli + holding DC + biaya transfer + holding store + shortage.
+Budget per periode atas order supplier bersifat opsional. Tanpa budget,
+produk saling independen sehingga `solve_multi_echelon` memecah LP per produk
+(masing-masing kecil dan cepat) dan menggabungkan hasilnya.
+"""
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy.optimize import linprog
+
+
+@dataclass
+class EchelonProblem:
+    """
+    Attributes
+    ----------
+    demand : np.ndarray
+        (n, T) forecast demand per pasangan store-produk.
+    store_on_hand : np.ndarray
+        (n,) stok awal store.
+    pair_product : np.ndarray
+        (n,) kode produk 0..P-1.
+    pair_dc : np.ndarray
+        (n,) kode DC 0..D-1 yang melayani store pasangan ini.
+    dc_on_hand : np.ndarray
+        (D, P) stok awal DC.
+    unit_cost : np.ndarray
+        (P,) harga beli dari supplier.
+    dc_holding_cost, store_holding_cost, shortage_cost : np.ndarray
+        (P,) biaya per unit per periode.
+    transfer_cost : np.ndarray
+        (n,) biaya kirim DC -> store per unit.
+    supplier_lead : np.ndarray
+        (D,) lead time supplier -> DC (periode).
+    transfer_lead : np.ndarray
+        (n,) lead time DC -> store per lane (periode).
+    store_receipts : np.ndarray, optional
+        (n, T) kedatangan dari order yang sudah ada (on_order).
+    budget : np.ndarray, optional
+        (T,) batas belanja order supplier per periode.
+    safety_stock : np.ndarray, optional
+        (n,) target stok store di akhir horizon (buffer service level).
+    """
+
+    demand: np.ndarray
+    store_on_hand: np.ndarray
+    pair_product: np.ndarray
+    pair_dc: np.ndarray
+    dc_on_hand: np.ndarray
+    unit_cost: np.ndarray
+    dc_holding_cost: np.ndarray
+    store_holding_cost: np.ndarray
+    shortage_cost: np.ndarray
+    transfer_cost: np.ndarray
+    supplier_lead: np.ndarray
+    transfer_lead: np.ndarray
+    store_receipts: Optional[np.ndarray] = None
+    budget: Optional[np.ndarray] = None
+    safety_stock: Optional[np.ndarray] = None
+
+    @property
+    def shape(self):
+        n, T = self.demand.shape
+        D, P = np.asarray(self.dc_on_hand).shape
+        return n, T, D, P
+
+
+@dataclass
+class EchelonResult:
+    supplier_orders: np.ndarray   # (D, P, T)
+    dc_inventory: np.ndarray      # (D, P, T)
+    transfers: np.ndarray         # (n, T)
+    store_inventory: np.ndarray   # (n, T)
+    shortage: np.ndarray          # (n, T)
+    objective: float
+    status: int
+    message: str
+    build_seconds: float
+    solve_seconds: float
+    n_vars: int
+    n_constraints: int
+
+    @property
+    def success(self) -> bool:
+        return self.status == 0
+
+
+@dataclass
+class EchelonLP:
+    c: np.ndarray
+    A_ub: Optional[sp.csr_matrix]
+    b_ub: Optional[np.ndarray]
+    A_eq: sp.csr_matrix
+    b_eq: np.ndarray
+    bounds: np.ndarray
+
+
+def build_echelon_lp(problem: EchelonProblem) -> EchelonLP:
+    """
+    Layout variabel: [y (M) | J (M) | z (nT) | I (nT) | s (nT) | u (n)] dengan
+    M = D*P*T, indeks DC (d*P + p)*T + t dan indeks pasangan i*T + t; blok u
+    hanya ada bila `safety_stock` diberikan.
+    """
+    d = np.asarray(problem.demand, dtype=float)
+    n, T, D, P = problem.shape
+    M, nT = D * P * T, n * T
+    o_y, o_J, o_z, o_I, o_s = 0, M, 2 * M, 2 * M + nT, 2 * M + 2 * nT
+    o_u = 2 * M + 3 * nT
+    n_u = 0 if problem.safety_stock is None else n
+    n_vars = o_u + n_u
+
+    # --- node DC ---
+    dc_node = np.arange(M)
+    t_dc = dc_node % T
+    Ls = np.repeat(np.asarray(problem.supplier_lead, dtype=np.int64), P * T)
+    pair_dc = np.asarray(problem.pair_dc, dtype=np.int64)
+    pair_p = np.asarray(problem.pair_product, dtype=np.int64)
+
+    # --- node store ---
+    i_idx = np.repeat(np.arange(n), T)
+    t_idx = np.tile(np.arange(T), n)
+    k = np.arange(nT)
+    Lt = np.asarray(problem.transfer_lead, dtype=np.int64)[i_idx]
+    # baris DC tempat transfer z[i,t] keluar
+    z_from = (pair_dc[i_idx] * P + pair_p[i_idx]) * T + t_idx
+
+    rows = [
+        dc_node, dc_node[t_dc > 0], dc_node[t_dc >= Ls], z_from,          # DC
+        M + k, M + k[t_idx > 0], M + k[t_idx >= Lt], M + k,                # store
+    ]
+    cols = [
+        o_J + dc_node, o_J + dc_node[t_dc > 0] - 1, o_y + (dc_node - Ls)[t_dc >= Ls], o_z + k,
+        o_I + k, o_I + k[t_idx > 0] - 1, o_z + (k - Lt)[t_idx >= Lt], o_s + k,
+    ]
+    vals = [
+        np.ones(M), -np.ones(int((t_dc > 0).sum())), -np.ones(int((t_dc >= Ls).sum())), np.ones(nT),
+        np.ones(nT), -np.ones(int((t_idx > 0).sum())), -np.ones(int((t_idx >= Lt).sum())), -np.ones(nT),
+    ]
+    A_eq = sp.csr_matrix(
+        (np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+        shape=(M + nT, n_vars),
+    )
+    b_dc = np.zeros((D * P, T))
+    b_dc[:, 0] = np.asarray(problem.dc_on_hand, dtype=float).ravel()
+    receipts = np.zeros((n, T)) if problem.store_receipts is None else np.asarray(problem.store_receipts, dtype=float)
+    b_st = receipts - d
+    b_st[:, 0] += np.asarray(problem.store_on_hand, dtype=float)
+    b_eq = np.concatenate([b_dc.ravel(), b_st.ravel()])
+
+    ub_blocks, ub_rhs = [], []
+    unit_cost = np.asarray(problem.unit_cost, dtype=float)
+    p_dc = (dc_node // T) % P
+    if problem.budget is not None:
+        ub_blocks.append(sp.csr_matrix((unit_cost[p_dc], (t_dc, o_y + dc_node)), shape=(T, n_vars)))
+        ub_rhs.append(np.asarray(problem.budget, dtype=float))
+    if n_u:
+        # -I[i,T-1] - u[i] <= -safety_stock[i]
+        i_all = np.arange(n)
+        ub_blocks.append(sp.csr_matrix(
+            (-np.ones(2 * n), (np.tile(i_all, 2), np.concatenate([o_I + i_all * T + T - 1, o_u + i_all]))),
+            shape=(n, n_vars),
+        ))
+        ub_rhs.append(-np.asarray(problem.safety_stock, dtype=float))
+    A_ub = sp.vstack(ub_blocks, format="csr") if ub_blocks else None
+    b_ub = np.concatenate(ub_rhs) if ub_rhs else None
+
+    bounds = np.zeros((n_vars, 2))
+    bounds[:, 1] = np.inf
+    # order / transfer yang tiba setelah horizon tidak berguna -> dikunci 0
+    bounds[o_y : o_y + M, 1] = np.where(t_dc + Ls >= T, 0.0, np.inf)
+    bounds[o_z : o_z + nT, 1] = np.where(t_idx + Lt >= T, 0.0, np.inf)
+    bounds[o_s : o_s + nT, 1] = d.ravel()
+
+    c = np.concatenate([
+        unit_cost[p_dc],
+        np.asarray(problem.dc_holding_cost, dtype=float)[p_dc],
+        np.broadcast_to(np.asarray(problem.transfer_cost, dtype=float), (n,))[i_idx],
+        np.asarray(problem.store_holding_cost, dtype=float)[pair_p][i_idx],
+        np.asarray(problem.shortage_cost, dtype=float)[pair_p][i_idx],
+        np.asarray(problem.shortage_cost, dtype=float)[pair_p][:n_u],
+    ])
+    return EchelonLP(c=c, A_ub=A_ub, b_ub=b_ub, A_eq=A_eq, b_eq=b_eq, bounds=bounds)
+
+
+def _solve_single(problem: EchelonProblem, method: str = "highs") -> EchelonResult:
+    n, T, D, P = problem.shape
+    M, nT = D * P * T, n * T
+    t0 = time.perf_counter()
+    lp = build_echelon_lp(problem)
+    build_seconds = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    res = linprog(lp.c, A_ub=lp.A_ub, b_ub=lp.b_ub, A_eq=lp.A_eq, b_eq=lp.b_eq, bounds=lp.bounds, method=method)
+    solve_seconds = time.perf_counter() - t0
+
+    x = res.x if res.x is not None else np.zeros(lp.c.size)
+    n_cons = lp.A_eq.shape[0] + (lp.A_ub.shape[0] if lp.A_ub is not None else 0)
+    return EchelonResult(
+        supplier_orders=x[:M].reshape(D, P, T),
+        dc_inventory=x[M : 2 * M].reshape(D, P, T),
+        transfers=x[2 * M : 2 * M + nT].reshape(n, T),
+        store_inventory=x[2 * M + nT : 2 * M + 2 * nT].reshape(n, T),
+        shortage=x[2 * M + 2 * nT : 2 * M + 3 * nT].reshape(n, T),
+        objective=float(res.fun) if res.fun is not None else float("nan"),
+        status=int(res.status),
+        message=str(res.message),
+        build_seconds=build_seconds,
+        solve_seconds=solve_seconds,
+        n_vars=int(lp.c.size),
+        n_constraints=int(n_cons),
+    )
+
+
+def _product_subproblem(problem: EchelonProblem, p: int, idx: np.ndarray) -> EchelonProblem:
+    def one(a):
+        return np.asarray(a)[[p]]
+
+    def cut(a):
+        return None if a is None else np.broadcast_to(np.asarray(a), (len(problem.demand),) + np.shape(a)[1:])[idx]
+
+    return EchelonProblem(
+        demand=np.asarray(problem.demand)[idx],
+        store_on_hand=np.asarray(problem.store_on_hand)[idx],
+        pair_product=np.zeros(len(idx), dtype=np.int64),
+        pair_dc=np.asarray(problem.pair_dc)[idx],
+        dc_on_hand=np.asarray(problem.dc_on_hand)[:, [p]],
+        unit_cost=one(problem.unit_cost),
+        dc_holding_cost=one(problem.dc_holding_cost),
+        store_holding_cost=one(problem.store_holding_cost),
+        shortage_cost=one(problem.shortage_cost),
+        transfer_cost=cut(problem.transfer_cost),
+        supplier_lead=problem.supplier_lead,
+        transfer_lead=cut(problem.transfer_lead),
+        store_receipts=cut(problem.store_receipts),
+        budget=None,
+        safety_stock=cut(problem.safety_stock),
+    )
+
+
+def solve_multi_echelon(problem: EchelonProblem, per_product: Optional[bool] = None,
+                        method: str = "highs", workers: Optional[int] = None) -> EchelonResult:
+    """
+    Solve LP multi-echelon.
+
+    Parameters
+    ----------
+    per_product : bool, optional
+        Pecah per produk (default: otomatis bila tidak ada budget, karena
+        tanpa constraint kopling LP per produk identik dengan LP gabungan).
+    method : str
+        Diteruskan ke `linprog`.
+    workers : int, optional
+        Jumlah proses untuk LP per produk; None/1 = berurutan.
+    """
+    n, T, D, P = problem.shape
+    if per_product is None:
+        per_product = problem.budget is None and P > 1
+    if not per_product:
+        return _solve_single(problem, method=method)
+    if problem.budget is not None:
+        raise ValueError("budget mengikat semua produk; tidak bisa dipecah per produk")
+
+    pair_p = np.asarray(problem.pair_product, dtype=np.int64)
+    out = EchelonResult(
+        supplier_orders=np.zeros((D, P, T)), dc_inventory=np.zeros((D, P, T)),
+        transfers=np.zeros((n, T)), store_inventory=np.zeros((n, T)), shortage=np.zeros((n, T)),
+        objective=0.0, status=0, message="Optimal (per product)",
+        build_seconds=0.0, solve_seconds=0.0, n_vars=0, n_constraints=0,
+    )
+    members = [np.flatnonzero(pair_p == p) for p in range(P)]
+    subs = [_product_subproblem(problem, p, idx) for p, idx in enumerate(members)]
+    if workers and workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_solve_single, subs, [method] * P))
+    else:
+        results = [_solve_single(sub, method=method) for sub in subs]
+
+    messages: List[str] = []
+    for p, (idx, res) in enumerate(zip(members, results)):
+        out.supplier_orders[:, p] = res.supplier_orders[:, 0]
+        out.dc_inventory[:, p] = res.dc_inventory[:, 0]
+        out.transfers[idx] = res.transfers
+        out.store_inventory[idx] = res.store_inventory
+        out.shortage[idx] = res.shortage
+        out.objective += res.objective
+        out.build_seconds += res.build_seconds
+        out.solve_seconds += res.solve_seconds
+        out.n_vars += res.n_vars
+        out.n_constraints += res.n_constraints
+        if not res.success:
+            out.status = res.status
+            messages.append(f"product {p}: {res.message}")
+    if messages:
+        out.message = "; ".join(messages)
+    return out
+
+
+def echelon_frames(result: EchelonResult, pair_keys: pd.DataFrame, dc_ids, product_ids):
+    """
+    Hasil dalam long format (hanya baris non-nol):
+    - supplier orders : dc_id, product_id, period, order_qty, dc_inventory
+    - transfers       : store_id, product_id, dc_id, period, transfer_qty, store_inventory, shortage
+    """
+    D, P, T = result.supplier_orders.shape
+    dd, pp, tt = np.meshgrid(np.arange(D), np.arange(P), np.arange(T), indexing="ij")
+    orders = pd.DataFrame({
+        "dc_id": np.asarray(dc_ids)[dd.ravel()],
+        "product_id": np.asarray(product_ids)[pp.ravel()],
+        "period": tt.ravel(),
+        "order_qty": result.supplier_orders.ravel(),
+        "dc_inventory": result.dc_inventory.ravel(),
+    })
+    orders = orders[(orders["order_qty"] > 1e-9) | (orders["dc_inventory"] > 1e-9)].reset_index(drop=True)
+
+    n = len(pair_keys)
+    rep = np.repeat(np.arange(n), T)
+    transfers = pair_keys[["store_id", "product_id", "dc_id"]].iloc[rep].reset_index(drop=True)
+    transfers["period"] = np.tile(np.arange(T), n)
+    transfers["transfer_qty"] = result.transfers.ravel()
+    transfers["store_inventory"] = result.store_inventory.ravel()
+    transfers["shortage"] = result.shortage.ravel()
+    nz = (transfers["transfer_qty"] > 1e-9) | (transfers["shortage"] > 1e-9)
+    return orders, transfers[nz.to_numpy()].reset_index(drop=True)
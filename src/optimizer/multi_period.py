@@ -0,0 +1,293 @@
+"""
+Multi-period replenishment LP dengan matriks constraint `scipy.sparse`.
+
+Untuk n SKU-location dan T periode, variabel keputusan (semua kontinu, >= 0):
+- x[i, t] : order yang DITEMPATKAN di periode t (tiba di t + L_i),
+- I[i, t] : inventory akhir periode t,
+- s[i, t] : demand yang tidak terpenuhi (lost sales), s <= d,
+- w[i, t] : stok yang dibuang (hanya bila shelf-life aktif).
+
+Constraint:
+- Inventory balance per pasangan per periode:
+      I[i,t] = I[i,t-1] + x[i,t-L_i] + r[i,t] - d[i,t] + s[i,t] - w[i,t]
+  dengan I[i,-1] = on_hand dan r = receipt dari on_order (pipeline).
+- Kapasitas store per periode : sum_{i in store} I[i,t] <= cap[store, t]
+- Budget per periode          : sum_i c_i * x[i,t]     <= B[t]
+- Shelf-life (opsional)       : I[i,t] <= demand `shelf_life` periode berikutnya.
+  Kelebihan di atas batas dibuang lewat w (berbiaya), sehingga on_hand awal
+  yang melebihi batas tetap feasible.
+
+Objective: minimisasi biaya order + holding + shortage (+ disposal).
+
+Catatan: MOQ / case-pack butuh variabel integer sehingga tidak dimodelkan di
+LP ini; pembulatan lot dilakukan di tahap terpisah setelah solve
+(`lot_sizing.lot_size`).
+
+Semua matriks dibangun sebagai COO -> CSR secara vectorized (tanpa loop per
+pasangan), sehingga 100k+ SKU-location x 4–8 periode tidak pernah membentuk
+matriks dense. Waktu build dan solve dilaporkan terpisah.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy.optimize import linprog
+
+# di atas ukuran ini interior point HiGHS jauh lebih cepat dari dual simplex
+IPM_MIN_VARS = 200_000
+
+
+@dataclass
+class MultiPeriodProblem:
+    """
+    Data masalah; array per pasangan berbentuk (n,), per pasangan-periode (n, T).
+
+    Attributes
+    ----------
+    demand : np.ndarray
+        (n, T) forecast demand.
+    on_hand : np.ndarray
+        (n,) stok awal.
+    unit_cost : np.ndarray
+        (n,) biaya per unit order.
+    holding_cost, shortage_cost : np.ndarray
+        (n,) biaya simpan / kehabisan stok per unit per periode.
+    lead_time : np.ndarray
+        (n,) lead time dalam periode (int >= 0).
+    receipts : np.ndarray, optional
+        (n, T) kedatangan dari order yang sudah ada (on_order).
+    store_codes : np.ndarray, optional
+        (n,) kode integer store (0..G-1) untuk constraint kapasitas.
+    store_capacity : np.ndarray, optional
+        (G, T) batas total inventory (unit) per store per periode.
+    budget : np.ndarray, optional
+        (T,) batas belanja order per periode.
+    shelf_life : int, optional
+        Batas cover inventory (periode) untuk produk yang bisa kedaluwarsa.
+    disposal_cost : np.ndarray, optional
+        (n,) biaya per unit stok yang dibuang karena shelf-life; default unit_cost.
+    """
+
+    demand: np.ndarray
+    on_hand: np.ndarray
+    unit_cost: np.ndarray
+    holding_cost: np.ndarray
+    shortage_cost: np.ndarray
+    lead_time: np.ndarray
+    receipts: Optional[np.ndarray] = None
+    store_codes: Optional[np.ndarray] = None
+    store_capacity: Optional[np.ndarray] = None
+    budget: Optional[np.ndarray] = None
+    shelf_life: Optional[int] = None
+    disposal_cost: Optional[np.ndarray] = None
+
+    @property
+    def shape(self):
+        return self.demand.shape
+
+
+@dataclass
+class MultiPeriodResult:
+    orders: np.ndarray
+    inventory: np.ndarray
+    shortage: np.ndarray
+    objective: float
+    status: int
+    message: str
+    build_seconds: float
+    solve_seconds: float
+    n_vars: int
+    n_constraints: int
+    disposal: Optional[np.ndarray] = None
+
+    @property
+    def success(self) -> bool:
+        return self.status == 0
+
+
+@dataclass
+class LPMatrices:
+    c: np.ndarray
+    A_ub: Optional[sp.csr_matrix]
+    b_ub: Optional[np.ndarray]
+    A_eq: sp.csr_matrix
+    b_eq: np.ndarray
+    bounds: np.ndarray
+
+
+def _shelf_cap(demand: np.ndarray, shelf_life: int) -> np.ndarray:
+    """
+    Batas I[i,t] = total demand periode t+1 .. t+shelf_life. Demand setelah
+    horizon diasumsikan sama dengan periode terakhir.
+    """
+    n, T = demand.shape
+    padded = np.concatenate([demand, np.repeat(demand[:, -1:], shelf_life, axis=1)], axis=1)
+    csum = np.concatenate([np.zeros((n, 1)), np.cumsum(padded, axis=1)], axis=1)
+    t = np.arange(T)
+    return csum[:, t + 1 + shelf_life] - csum[:, t + 1]
+
+
+def _n_blocks(problem: MultiPeriodProblem) -> int:
+    """Jumlah blok variabel n*T: x, I, s (+ w bila shelf-life aktif)."""
+    return 3 if problem.shelf_life is None else 4
+
+
+def split_solution(x: np.ndarray, n: int, T: int) -> dict:
+    """
+    Pecah vektor solusi `build_lp` menjadi orders/inventory/shortage (n, T) dan
+    disposal (None bila LP tanpa blok w).
+    """
+    nT = n * T
+    return {
+        "orders": x[:nT].reshape(n, T),
+        "inventory": x[nT : 2 * nT].reshape(n, T),
+        "shortage": x[2 * nT : 3 * nT].reshape(n, T),
+        "disposal": x[3 * nT : 4 * nT].reshape(n, T) if x.size > 3 * nT else None,
+    }
+
+
+def build_lp(problem: MultiPeriodProblem) -> LPMatrices:
+    """
+    Bangun vektor biaya, matriks sparse, dan bounds untuk `linprog(method="highs")`.
+
+    Layout variabel: [x (n*T) | I (n*T) | s (n*T) | w (n*T, hanya bila shelf-life)],
+    indeks pasangan-periode i*T + t.
+    """
+    d = np.asarray(problem.demand, dtype=float)
+    n, T = d.shape
+    nT = n * T
+    n_var = _n_blocks(problem) * nT
+    L = np.asarray(problem.lead_time, dtype=np.int64)
+
+    i_idx = np.repeat(np.arange(n), T)
+    t_idx = np.tile(np.arange(T), n)
+    k = i_idx * T + t_idx  # baris balance == indeks pasangan-periode
+
+    # --- inventory balance (equality) ---
+    rows = [k, k[t_idx > 0], k[t_idx >= L[i_idx]], k]
+    cols = [
+        nT + k,                                          # +I[i,t]
+        nT + k[t_idx > 0] - 1,                           # -I[i,t-1]
+        (k - L[i_idx])[t_idx >= L[i_idx]],               # -x[i,t-L_i]
+        2 * nT + k,                                      # -s[i,t]
+    ]
+    vals = [
+        np.ones(nT),
+        -np.ones(int((t_idx > 0).sum())),
+        -np.ones(int((t_idx >= L[i_idx]).sum())),
+        -np.ones(nT),
+    ]
+    if problem.shelf_life is not None:
+        rows.append(k)
+        cols.append(3 * nT + k)                          # +w[i,t]
+        vals.append(np.ones(nT))
+    A_eq = sp.csr_matrix(
+        (np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+        shape=(nT, n_var),
+    )
+    receipts = np.zeros((n, T)) if problem.receipts is None else np.asarray(problem.receipts, dtype=float)
+    b_eq = receipts - d
+    b_eq[:, 0] += np.asarray(problem.on_hand, dtype=float)
+    b_eq = b_eq.ravel()
+
+    # --- inequality: kapasitas store & budget per periode ---
+    ub_blocks, ub_rhs = [], []
+    if problem.store_capacity is not None and problem.store_codes is not None:
+        cap = np.asarray(problem.store_capacity, dtype=float)
+        G = cap.shape[0]
+        g = np.asarray(problem.store_codes, dtype=np.int64)[i_idx]
+        ub_blocks.append(sp.csr_matrix((np.ones(nT), (g * T + t_idx, nT + k)), shape=(G * T, n_var)))
+        ub_rhs.append(cap.ravel())
+    if problem.budget is not None:
+        cost = np.asarray(problem.unit_cost, dtype=float)[i_idx]
+        ub_blocks.append(sp.csr_matrix((cost, (t_idx, k)), shape=(T, n_var)))
+        ub_rhs.append(np.asarray(problem.budget, dtype=float))
+    A_ub = sp.vstack(ub_blocks, format="csr") if ub_blocks else None
+    b_ub = np.concatenate(ub_rhs) if ub_rhs else None
+
+    # --- bounds ---
+    bounds = np.zeros((n_var, 2))
+    bounds[:, 1] = np.inf
+    # order yang baru tiba setelah horizon tidak ada gunanya -> dikunci 0
+    bounds[:nT, 1] = np.where(t_idx + L[i_idx] >= T, 0.0, np.inf)
+    if problem.shelf_life is not None:
+        bounds[nT : 2 * nT, 1] = _shelf_cap(d, int(problem.shelf_life)).ravel()
+    bounds[2 * nT : 3 * nT, 1] = d.ravel()
+
+    costs = [problem.unit_cost, problem.holding_cost, problem.shortage_cost]
+    if problem.shelf_life is not None:
+        costs.append(problem.unit_cost if problem.disposal_cost is None else problem.disposal_cost)
+    c = np.concatenate([np.asarray(a, dtype=float)[i_idx] for a in costs])
+    return LPMatrices(c=c, A_ub=A_ub, b_ub=b_ub, A_eq=A_eq, b_eq=b_eq, bounds=bounds)
+
+
+def solve_multi_period(
+    problem: MultiPeriodProblem,
+    time_limit: Optional[float] = None,
+    method: Optional[str] = None,
+) -> MultiPeriodResult:
+    """
+    Build + solve LP multi-periode dengan HiGHS.
+
+    `method` diteruskan ke `linprog`; default: "highs-ipm" untuk LP besar
+    (>= `IPM_MIN_VARS` variabel), selain itu "highs".
+
+    Returns
+    -------
+    MultiPeriodResult
+        Order/inventory/shortage (n, T) serta waktu build & solve terpisah.
+        Jika solver gagal, array keputusan berisi nol dan `status != 0`.
+    """
+    n, T = problem.shape
+    t0 = time.perf_counter()
+    lp = build_lp(problem)
+    build_seconds = time.perf_counter() - t0
+
+    options = {"presolve": True}
+    if time_limit is not None:
+        options["time_limit"] = time_limit
+    if method is None:
+        method = "highs-ipm" if lp.c.size >= IPM_MIN_VARS else "highs"
+    t0 = time.perf_counter()
+    res = linprog(
+        lp.c,
+        A_ub=lp.A_ub,
+        b_ub=lp.b_ub,
+        A_eq=lp.A_eq,
+        b_eq=lp.b_eq,
+        bounds=lp.bounds,
+        method=method,
+        options=options,
+    )
+    solve_seconds = time.perf_counter() - t0
+
+    x = res.x if res.x is not None else np.zeros(lp.c.size)
+    n_cons = lp.A_eq.shape[0] + (lp.A_ub.shape[0] if lp.A_ub is not None else 0)
+    return MultiPeriodResult(
+        **split_solution(x, n, T),
+        objective=float(res.fun) if res.fun is not None else float("nan"),
+        status=int(res.status),
+        message=str(res.message),
+        build_seconds=build_seconds,
+        solve_seconds=solve_seconds,
+        n_vars=int(lp.c.size),
+        n_constraints=int(n_cons),
+    )
+
+
+def result_frame(keys: pd.DataFrame, result: MultiPeriodResult) -> pd.DataFrame:
+    """
+    Long format: satu baris per (store_id, product_id, period) dengan kolom
+    order_qty, inventory, shortage.
+    """
+    n, T = result.orders.shape
+    out = keys[["store_id", "product_id"]].iloc[np.repeat(np.arange(n), T)].reset_index(drop=True)
+    out["period"] = np.tile(np.arange(T), n)
+    out["order_qty"] = result.orders.ravel()
+    out["inventory"] = result.inventory.ravel()
+    out["shortage"] = result.shortage.ravel()
+    return out
@@ -1,9 +1,83 @@
 """
 Simple replenishment policies.
 
-Contoh yang bisa diisi ke depan:
-- Order-up-to level policy berbasis forecast + safety stock.
-- Base-stock policy dengan batas budget/capacity sederhana.
+Dipakai oleh simulasi (`simulation.py`); setiap policy menerima state
+berbentuk (S skenario, m pasangan) dan mengembalikan order minggu ini:
+- `OrderUpToPolicy`: order-up-to / base-stock berbasis forecast + safety stock.
+- `FixedOrders`: rencana order tetap, mis. hasil optimizer multi-periode.
 """
 
+from dataclasses import dataclass
+from typing import Optional, Union
 
+import numpy as np
+
+
+def _per_pair(a, n: int) -> Optional[np.ndarray]:
+    return None if a is None else np.broadcast_to(np.asarray(a, dtype=np.float32), (n,))
+
+
+@dataclass
+class OrderUpToPolicy:
+    """
+    Base-stock: order = max(0, level - inventory position), dibulatkan ke atas
+    ke kelipatan `case_pack` dan dinaikkan ke `moq` bila order > 0.
+
+    Parameters
+    ----------
+    levels : np.ndarray
+        (n,) order-up-to level per pasangan.
+    case_pack, moq : np.ndarray, optional
+        (n,) ukuran kemasan dan minimum order.
+    """
+
+    levels: np.ndarray
+    case_pack: Optional[np.ndarray] = None
+    moq: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_forecast(cls, mean, std, lead_time, z: float, review: int = 1, **kwargs) -> "OrderUpToPolicy":
+        """Level = (L + R) * mean + z * std * sqrt(L + R), R = periode review."""
+        cover = np.asarray(lead_time, dtype=float) + review
+        return cls(cover * np.asarray(mean, dtype=float) + z * np.asarray(std, dtype=float) * np.sqrt(cover), **kwargs)
+
+    def select(self, cols: slice) -> "OrderUpToPolicy":
+        n = len(self.levels)
+        pack, moq = _per_pair(self.case_pack, n), _per_pair(self.moq, n)
+        return OrderUpToPolicy(
+            np.asarray(self.levels, dtype=np.float32)[cols],
+            None if pack is None else pack[cols],
+            None if moq is None else moq[cols],
+        )
+
+    def order(self, t: int, on_hand: np.ndarray, position: np.ndarray) -> np.ndarray:
+        q = np.subtract(self.levels, position, dtype=np.float32)
+        np.maximum(q, 0.0, out=q)
+        if self.case_pack is not None:
+            q /= self.case_pack
+            np.ceil(q, out=q)
+            q *= self.case_pack
+        if self.moq is not None:
+            q = np.where(q > 0, np.maximum(q, self.moq), np.float32(0.0))
+        return q
+
+
+@dataclass
+class FixedOrders:
+    """
+    Parameters
+    ----------
+    orders : np.ndarray
+        (n, H) order per pasangan per minggu, sama untuk semua skenario.
+    """
+
+    orders: np.ndarray
+
+    def select(self, cols: slice) -> "FixedOrders":
+        return FixedOrders(np.asarray(self.orders, dtype=np.float32)[cols])
+
+    def order(self, t: int, on_hand: np.ndarray, position: np.ndarray) -> np.ndarray:
+        return np.broadcast_to(self.orders[:, t], on_hand.shape)
+
+
+Policy = Union[OrderUpToPolicy, FixedOrders]
@@ -0,0 +1,235 @@
+"""
+Simulasi inventory vectorized untuk KPI fill-rate, stockout weeks, total cost
+(definisi di `docs/problem_contract.md`).
+
+Semua SKU-location dan semua skenario Monte Carlo dijalankan bersamaan:
+state berbentuk (S skenario, m pasangan) dan satu-satunya loop Python adalah
+loop minggu. Pasangan diproses per chunk kolom (`chunk_pairs`) supaya array
+kerja tetap kecil (muat cache) dan memori tidak tumbuh dengan n x S x H;
+hanya akumulator per (skenario, pasangan) yang disimpan, bukan trajektori.
+Pasangan diurutkan menurut lead time lebih dulu, sehingga di dalam chunk
+order masuk pipeline lewat slice kontigu per lead time, bukan fancy index.
+
+Urutan event per minggu t (konvensi LP `multi_period.py`: order dengan lead
+time L tiba dan bisa dipakai di minggu t + L):
+1. review: policy menentukan order dari on_hand & inventory position,
+2. order masuk pipeline (ring buffer) slot t + L_i,
+3. kedatangan slot t masuk on_hand (on_order awal tiba di minggu 0),
+4. demand dilayani dari on_hand; sisanya hilang (lost sales),
+5. stok akhir menjadi dasar biaya holding.
+
+Demand: `actuals` (n, H) -> satu skenario deterministik (backtest), atau
+distribusi forecast (mean (n,) / (n, H), std (n,)) -> S skenario normal
+terpotong di 0.
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from ..common.metrics import fill_rate, total_cost
+from .simple_policy import Policy
+
+PAIR_COLUMNS = (
+    "demand", "served", "fill_rate_mean", "fill_rate_p05", "stockout_weeks_mean",
+    "total_cost_mean", "total_cost_p95", "order_units_mean",
+)
+SCENARIO_COLUMNS = ("demand", "served", "lost", "holding_cost", "orders", "order_units", "total_cost", "purchase_cost")
+
+
+@dataclass
+class SimulationResult:
+    """
+    Attributes
+    ----------
+    pairs : pd.DataFrame
+        Satu baris per pasangan: rata-rata atas skenario + quantile risiko.
+    scenarios : pd.DataFrame
+        Satu baris per skenario: total portfolio dan fill-rate agregat.
+    seconds : float
+        Waktu simulasi.
+    """
+
+    pairs: pd.DataFrame
+    scenarios: pd.DataFrame
+    seconds: float
+
+    def summary(self) -> dict:
+        sc = self.scenarios
+        return {
+            "fill_rate_mean": float(sc["fill_rate"].mean()),
+            "fill_rate_p05": float(sc["fill_rate"].quantile(0.05)),
+            "stockout_weeks_per_pair": float(self.pairs["stockout_weeks_mean"].mean()),
+            "total_cost_mean": float(sc["total_cost"].mean()),
+            "total_cost_p95": float(sc["total_cost"].quantile(0.95)),
+            "purchase_cost_mean": float(sc["purchase_cost"].mean()),
+        }
+
+
+def _draw_demand(rng: np.random.Generator, mean_t: np.ndarray, std: np.ndarray, shape) -> np.ndarray:
+    d = rng.standard_normal(shape, dtype=np.float32)
+    d *= std
+    d += mean_t
+    return np.maximum(d, 0.0, out=d)
+
+
+def simulate(
+    policy: Policy,
+    on_hand: np.ndarray,
+    lead_time: np.ndarray,
+    horizon: int,
+    actuals: Optional[np.ndarray] = None,
+    demand_mean: Optional[np.ndarray] = None,
+    demand_std: Optional[np.ndarray] = None,
+    scenarios: int = 100,
+    on_order: Optional[np.ndarray] = None,
+    holding_cost=0.0,
+    shortage_cost=1.0,
+    order_cost=0.0,
+    unit_cost=0.0,
+    seed: int = 0,
+    chunk_pairs: int = 512,
+) -> SimulationResult:
+    """
+    Jalankan simulasi untuk semua pasangan sekaligus.
+
+    Parameters
+    ----------
+    policy : OrderUpToPolicy or FixedOrders
+        Kebijakan order per minggu (lihat `simple_policy.py`).
+    on_hand, lead_time : np.ndarray
+        (n,) stok awal dan lead time (minggu, int >= 0).
+    horizon : int
+        Jumlah minggu H.
+    actuals : np.ndarray, optional
+        (n, H) demand aktual -> satu skenario (backtest).
+    demand_mean, demand_std : np.ndarray, optional
+        Distribusi forecast: mean (n,) atau (n, H), std (n,); dipakai bila
+        `actuals` None.
+    scenarios : int
+        Jumlah skenario Monte Carlo (diabaikan bila `actuals` diberikan).
+    on_order : np.ndarray, optional
+        (n,) order yang sudah berjalan, tiba di minggu 0.
+    holding_cost, shortage_cost, order_cost, unit_cost : float or np.ndarray
+        Biaya per unit-minggu stok, per unit lost sale, per order, per unit
+        dibeli. Total cost = holding + stockout + ordering; pembelian
+        dilaporkan terpisah (`purchase_cost`).
+    seed : int
+        Seed RNG; chunk ke-c (setelah urut lead time) memakai
+        `default_rng([seed, c])`.
+    chunk_pairs : int
+        Jumlah pasangan per chunk.
+
+    Returns
+    -------
+    SimulationResult
+    """
+    t_start = time.perf_counter()
+    on_hand = np.asarray(on_hand, dtype=np.float32)
+    n = len(on_hand)
+    lead = np.asarray(lead_time, dtype=np.int64)
+    if actuals is not None:
+        S = 1
+        actuals = np.asarray(actuals, dtype=np.float32)
+    elif demand_mean is None or demand_std is None:
+        raise ValueError("simulate butuh `actuals` atau `demand_mean` + `demand_std`")
+    else:
+        S = int(scenarios)
+        demand_mean = np.asarray(demand_mean, dtype=np.float32)
+        demand_std = np.broadcast_to(np.asarray(demand_std, dtype=np.float32), (n,))
+    B = int(lead.max(initial=0)) + 1
+
+    def per_pair(v):
+        return np.broadcast_to(np.asarray(v, dtype=np.float32), (n,))
+
+    h_cost, s_cost, o_cost, u_cost = map(per_pair, (holding_cost, shortage_cost, order_cost, unit_cost))
+    on_order = np.zeros(n, dtype=np.float32) if on_order is None else per_pair(on_order)
+
+    pairs = {k: np.zeros(n) for k in PAIR_COLUMNS}
+    scen = {k: np.zeros(S) for k in SCENARIO_COLUMNS}
+    by_lead = np.argsort(lead, kind="stable")
+
+    for c, start in enumerate(range(0, n, chunk_pairs)):
+        sel = by_lead[start : start + chunk_pairs]
+        m = len(sel)
+        rng = np.random.default_rng([seed, c])
+        pol = policy.select(sel)
+        lead_c = lead[sel]
+        edges = np.flatnonzero(np.diff(lead_c)) + 1
+        runs = [(slice(a, b), int(lead_c[a])) for a, b in zip(np.r_[0, edges], np.r_[edges, m])]
+        if actuals is not None:
+            act_c = actuals[sel]
+        else:
+            mean_c = demand_mean[sel]
+            std_c = demand_std[sel]
+
+        oh = np.tile(on_hand[sel], (S, 1))
+        pipe = np.zeros((B, S, m), dtype=np.float32)
+        pipe[0] += on_order[sel]
+        position = oh + on_order[sel]
+        served = np.empty((S, m), dtype=np.float32)
+
+        tot_d = np.zeros((S, m), dtype=np.float32)
+        tot_served = np.zeros((S, m), dtype=np.float32)
+        tot_hold = np.zeros((S, m), dtype=np.float32)
+        tot_units = np.zeros((S, m), dtype=np.float32)
+        n_orders = np.zeros((S, m), dtype=np.int32)
+        so_weeks = np.zeros((S, m), dtype=np.int32)
+
+        for t in range(horizon):
+            q = pol.order(t, oh, position)
+            for sl, lt in runs:
+                pipe[(t + lt) % B, :, sl] += q[:, sl]
+            position += q
+            tot_units += q
+            n_orders += q > 0
+
+            arrive = pipe[t % B]
+            oh += arrive
+            arrive[:] = 0.0
+
+            if actuals is not None:
+                d = np.broadcast_to(act_c[:, t], (S, m))
+            else:
+                d = _draw_demand(rng, mean_c if mean_c.ndim == 1 else mean_c[:, t], std_c, (S, m))
+            np.minimum(oh, d, out=served)
+            oh -= served
+            position -= served
+            tot_d += d
+            tot_served += served
+            so_weeks += d > served
+            tot_hold += oh
+
+        lost = tot_d - tot_served
+        cost = total_cost(tot_hold, lost, n_orders, h_cost[sel], s_cost[sel], o_cost[sel])
+        fr = fill_rate(tot_d, tot_served)
+
+        pairs["demand"][sel] = tot_d.mean(axis=0)
+        pairs["served"][sel] = tot_served.mean(axis=0)
+        pairs["fill_rate_mean"][sel] = fr.mean(axis=0)
+        pairs["fill_rate_p05"][sel] = np.quantile(fr, 0.05, axis=0)
+        pairs["stockout_weeks_mean"][sel] = so_weeks.mean(axis=0)
+        pairs["total_cost_mean"][sel] = cost.mean(axis=0)
+        pairs["total_cost_p95"][sel] = np.quantile(cost, 0.95, axis=0)
+        pairs["order_units_mean"][sel] = tot_units.mean(axis=0)
+
+        scen["demand"] += tot_d.sum(axis=1)
+        scen["served"] += tot_served.sum(axis=1)
+        scen["lost"] += lost.sum(axis=1)
+        scen["holding_cost"] += (tot_hold * h_cost[sel]).sum(axis=1)
+        scen["orders"] += n_orders.sum(axis=1)
+        scen["order_units"] += tot_units.sum(axis=1)
+        scen["total_cost"] += cost.sum(axis=1)
+        scen["purchase_cost"] += (tot_units * u_cost[sel]).sum(axis=1)
+
+    scenario_frame = pd.DataFrame(scen)
+    scenario_frame.insert(0, "scenario", np.arange(S))
+    scenario_frame["fill_rate"] = fill_rate(scen["demand"], scen["served"])
+    return SimulationResult(
+        pairs=pd.DataFrame(pairs),
+        scenarios=scenario_frame,
+        seconds=time.perf_counter() - t_start,
+    )
@@ -9,6 +9,7 @@ Dashboard ini menampilkan:
 """
 
 import json
+import sys
 from pathlib import Path
 
 import pandas as pd
@@ -17,6 +18,9 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import streamlit as st
 
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+from src.common.io import read_features  # noqa: E402
+
 # Config
 st.set_page_config(
     page_title="Supply Chain ML Dashboard",
@@ -40,11 +44,17 @@ def load_predictions():
 
 
 @st.cache_data
-def load_features():
-    """Load weekly features jika ada."""
-    if FEAT_PATH.exists():
-        return pd.read_parquet(FEAT_PATH)
-    return None
+def load_features(store_id=None, product_id=None, columns=None):
+    """
+    Load weekly features jika ada. Filter store/product & kolom didorong ke
+    scan Parquet, jadi detail satu pasangan tidak membaca seluruh tabel.
+    """
+    return read_features(
+        FEAT_PATH,
+        columns=columns,
+        stores=None if store_id is None else [store_id],
+        products=None if product_id is None else [product_id],
+    )
 
 
 @st.cache_data
@@ -70,7 +80,6 @@ def main():
 
     # Load data
     pred_df = load_predictions()
-    feat_df = load_features()
     stats = load_stats()
 
     if pred_df is None:
@@ -187,6 +196,14 @@ def main():
 
         st.plotly_chart(fig, use_container_width=True)
 
+        # Riwayat penjualan pasangan ini (hanya row group store/product ini yang dibaca)
+        history = load_features(sid, pid, columns=["year", "week", "units_sold"])
+        if history is not None and len(history):
+            history = history.sort_values(["year", "week"])
+            history["period"] = history["year"].astype(str) + "-W" + history["week"].astype(str).str.zfill(2)
+            fig_hist = px.line(history, x="period", y="units_sold", title=f"Sales History: {sid} | {pid}")
+            st.plotly_chart(fig_hist, use_container_width=True)
+
     st.markdown("---")
 
     # --- Error Distribution ---
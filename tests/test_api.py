@@ -1,8 +1,54 @@
+import pytest
 from fastapi.testclient import TestClient
 from app.main import app
 
 client = TestClient(app)
 
+
+@pytest.fixture(autouse=True)
+def _run_dir(tmp_path, monkeypatch):
+    # run /replenish disimpan ke tmp_path, bukan ke data/runs di working tree
+    from app.services import runs
+
+    monkeypatch.setenv("REPLENISH_RUN_DIR", str(tmp_path / "runs"))
+    monkeypatch.setattr(runs, "_STORE", None)
+
+
+@pytest.fixture(scope="module")
+def _built_artifacts(tmp_path_factory):
+    """Data dummy kecil + ETL penuh di folder sementara (tidak bergantung pada data/)."""
+    import importlib.util
+    from pathlib import Path
+
+    def load(name):
+        path = Path(__file__).resolve().parents[1] / "etl" / f"{name}.py"
+        spec = importlib.util.spec_from_file_location(f"etl_{name}", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+    root = tmp_path_factory.mktemp("api_artifacts")
+    raw, proc = root / "raw", root / "processed"
+    load("generate_dummy").generate(n_stores=4, n_products=3, n_weeks=60, seed=11, out=raw)
+    load("build_features").build_full(raw, proc)
+    return {
+        "quantiles": root / "model_quantiles.pkl",
+        "features": proc / "weekly_features.parquet",
+        "inventory": proc / "inventory_latest.parquet",
+        "forecast_baseline": proc / "forecast_baseline.parquet",
+        "stores": raw / "stores.csv",
+    }
+
+
+@pytest.fixture
+def artifact_store(_built_artifacts, monkeypatch):
+    """ArtifactStore dari `_built_artifacts` (model & stats tetap yang di-track di repo)."""
+    from app.services import artifacts
+
+    store = artifacts.ArtifactStore(paths=_built_artifacts)
+    monkeypatch.setattr(artifacts, "_STORE", store)
+    return store
+
 def test_health():
     r = client.get("/health")
     assert r.status_code == 200
@@ -13,6 +59,196 @@ def test_forecast():
     assert r.status_code == 200
     body = r.json()
     assert body["horizon_weeks"] == 4
+    assert body["model_version"]
     assert len(body["forecasts"]) == 1
 
 
+
+def test_forecast_stream_ndjson():
+    import json
+
+    pairs = [{"store_id": "S001", "product_id": f"P{i:03d}"} for i in range(1, 4)]
+    r = client.post("/forecast?stream=true", json={"horizon_weeks": 2, "pairs": pairs})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in r.text.splitlines()]
+    assert [row["product_id"] for row in rows] == ["P001", "P002", "P003"]
+    assert all(len(row["forecast"]) == 2 for row in rows)
+
+def test_forecast_stream_runs_every_chunk_through_pool(monkeypatch):
+    import json
+
+    import app.main as main
+    from app.services.executor import WorkerPool
+
+    class CountingPool(WorkerPool):
+        calls = 0
+
+        async def run(self, fn, *args, **kwargs):
+            CountingPool.calls += 1
+            return await super().run(fn, *args, **kwargs)
+
+    pool = CountingPool(mode="thread", workers=1)
+    monkeypatch.setattr(main, "get_pool", lambda: pool)
+    monkeypatch.setattr(main, "STREAM_CHUNK_PAIRS", 1)
+    pairs = [{"store_id": "S001", "product_id": f"P{i:03d}"} for i in range(1, 4)]
+    try:
+        r = client.post("/forecast?stream=true", json={"horizon_weeks": 2, "pairs": pairs})
+    finally:
+        pool.shutdown()
+    assert r.status_code == 200
+    assert [json.loads(line)["product_id"] for line in r.text.splitlines()] == ["P001", "P002", "P003"]
+    assert CountingPool.calls == 3
+
+    # pool penuh -> 429 sebelum stream dimulai, sama seperti jalur non-stream
+    full = WorkerPool(mode="thread", workers=1, max_pending=1)
+    full._inflight = full.max_pending
+    monkeypatch.setattr(main, "get_pool", lambda: full)
+    r = client.post("/forecast?stream=true", json={"horizon_weeks": 2, "pairs": pairs})
+    assert r.status_code == 429
+
+
+def test_forecast_arrow_stream():
+    import pyarrow as pa
+
+    pairs = [{"store_id": "S001", "product_id": "P001"}, {"store_id": "S002", "product_id": "P002"}]
+    r = client.post(
+        "/forecast",
+        json={"horizon_weeks": 3, "pairs": pairs},
+        headers={"Accept": "application/vnd.apache.arrow.stream"},
+    )
+    assert r.status_code == 200
+    table = pa.ipc.open_stream(r.content).read_all()
+    assert table.column("store_id").to_pylist() == ["S001", "S002"]
+    assert table.schema.field("forecast").type.list_size == 3
+    assert table.schema.metadata[b"model_version"]
+
+
+def test_invalid_bodies_are_rejected_with_422():
+    bad = [
+        ("/forecast", {"horizon_weeks": 0, "pairs": []}),
+        ("/forecast", {"horizon_weeks": 4, "pairs": "S001"}),
+        ("/replenish", {"target_service": 1.5}),
+        ("/replenish/inventory", {"rows": [{"store_id": "S001", "product_id": "P001", "on_hand": -1}]}),
+    ]
+    for path, body in bad:
+        r = client.post(path, json=body)
+        assert r.status_code == 422, path
+        assert r.json()["detail"][0]["loc"][0] == "body"
+
+
+def test_records_builds_rows_column_wise():
+    import json
+
+    import numpy as np
+    import pandas as pd
+
+    from app.schemas import NumpyORJSONResponse
+    from app.services.formats import records
+
+    df = pd.DataFrame({
+        "store_id": ["S001", 'a,"b"', None],
+        "order_qty": [1.5, np.nan, 3.0],
+        "period": np.array([0, 1, 2], dtype=np.int32),
+        "urgent": [True, False, True],
+    })
+    expected = [
+        {"store_id": "S001", "order_qty": 1.5, "period": 0, "urgent": True},
+        {"store_id": 'a,"b"', "order_qty": None, "period": 1, "urgent": False},
+        {"store_id": None, "order_qty": 3.0, "period": 2, "urgent": True},
+    ]
+    assert json.loads(NumpyORJSONResponse({"rows": records(df)}).body) == {"rows": expected}
+    assert json.loads(NumpyORJSONResponse(records(df.iloc[:0])).body) == []
+
+
+def test_numpy_response_serializes_arrays_and_scalars():
+    import json
+
+    import numpy as np
+
+    from app.schemas import NumpyORJSONResponse
+
+    body = NumpyORJSONResponse({
+        "forecast": np.array([1.5, 2.0], dtype=np.float32),
+        "matrix": np.arange(4, dtype=np.int64).reshape(2, 2),
+        "qty": np.int64(7),
+        "cost": np.float64(0.25),
+        1: "non-str key",
+    }).body
+    assert json.loads(body) == {"forecast": [1.5, 2.0], "matrix": [[0, 1], [2, 3]], "qty": 7, "cost": 0.25, "1": "non-str key"}
+
+    # jalur /forecast JSON mengirim baris np.ndarray apa adanya
+    pairs = [{"store_id": "S001", "product_id": "P001"}, {"store_id": "S002", "product_id": "P002"}]
+    r = client.post("/forecast", json={"horizon_weeks": 3, "pairs": pairs})
+    assert r.status_code == 200
+    rows = r.json()["forecasts"]
+    assert [len(row["forecast"]) for row in rows] == [3, 3]
+    assert all(isinstance(v, float) for row in rows for v in row["forecast"])
+
+
+def test_inventory_delta_updates_plan_in_thread_mode(artifact_store):
+    r = client.post("/replenish", json={"target_service": 0.95, "capacity": 50000})
+    assert r.status_code == 200
+    order = r.json()["orders"][0]
+    delta = {"rows": [{"store_id": order["store_id"], "product_id": order["product_id"], "on_hand": 0, "on_order": 0}]}
+    r = client.post("/replenish/inventory", json=delta)
+    assert r.status_code == 200
+    assert r.json()["plans_updated"] >= 1
+    assert r.json()["model_version"] == artifact_store.current().version
+
+
+def test_inventory_delta_during_plan_build_is_not_lost(artifact_store, monkeypatch):
+    import pandas as pd
+
+    from app.services import optimizer
+
+    state = optimizer._PlannerState()
+    monkeypatch.setattr(optimizer, "_STATE", state)
+    art = artifact_store.current()
+    key = art.inventory.iloc[0]
+    delta = pd.DataFrame({"store_id": [key["store_id"]], "product_id": [key["product_id"]],
+                          "on_hand": [123.0], "on_order": [4.0]})
+    build_inputs = optimizer._replenishment_inputs
+
+    def inputs_then_push(art):
+        df = build_inputs(art)
+        # delta masuk setelah snapshot overlay dibaca, sebelum rencana dipasang
+        state.push(delta, art)
+        return df
+
+    monkeypatch.setattr(optimizer, "_replenishment_inputs", inputs_then_push)
+    plan = state.plan(0.95, 50000, art)
+    assert (plan.on_hand[0], plan.on_order[0]) == (123.0, 4.0)
+    assert state.plans and not state._log
+
+
+def test_inventory_delta_rejected_in_process_mode(monkeypatch):
+    import app.main as main
+    from app.services.executor import WorkerPool
+
+    # state rencana per proses worker -> delta ditolak, bukan 200 yang diam-diam hilang
+    monkeypatch.setattr(main, "get_pool", lambda: WorkerPool(mode="process", workers=1))
+    r = client.post("/replenish/inventory", json={"rows": [{"store_id": "S001", "product_id": "P001", "on_hand": 1}]})
+    assert r.status_code == 409
+
+
+def test_network_plan_pages_through_own_endpoint(artifact_store):
+    import warnings
+
+    body = {"periods": 2, "lanes": [{"store_id": "S001", "lead_weeks": 0, "cost": None}]}
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", FutureWarning)
+        r = client.post("/replenish/network?limit=5", json=body)
+    assert r.status_code == 200
+    first = r.json()
+    assert first["status"] == 0
+    assert len(first["transfers"]) <= 5
+    assert {"dc_id", "period", "transfer_qty"} <= set(first["transfers"][0])
+
+    r = client.get(f"/replenish/network/{first['run_id']}", params={"limit": 5, "cursor": first["next_cursor"]})
+    assert r.status_code == 200
+    page = r.json()
+    assert page["total_rows"] == first["total_rows"]
+    assert page["transfers"] and "order_qty" not in page["transfers"][0]
+    # run network bukan rencana order /replenish
+    assert client.get(f"/replenish/{first['run_id']}").status_code == 404
@@ -0,0 +1,139 @@
+import json
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from app.services.artifacts import ArtifactStore
+
+
+def _store(tmp_path):
+    paths = {
+        "model": tmp_path / "model.pkl",
+        "stats": tmp_path / "stats.json",
+        "features": tmp_path / "features.parquet",
+        "inventory": tmp_path / "inventory.parquet",
+        "forecast_baseline": tmp_path / "forecast_baseline.parquet",
+        "quantiles": tmp_path / "quantiles.pkl",
+        "stores": tmp_path / "stores.csv",
+    }
+    return ArtifactStore(paths=paths, poll_interval=0.05), paths
+
+
+def test_store_loads_once_and_reloads_on_content_change(tmp_path):
+    store, paths = _store(tmp_path)
+    paths["stats"].write_text(json.dumps({"mean": 7.0, "std": 1.0}))
+
+    snap = store.current()
+    assert snap.stats["mean"] == 7.0
+    assert snap.model is None and snap.features is None
+    assert store.refresh() is False
+    assert store.current() is snap
+
+    paths["stats"].write_text(json.dumps({"mean": 9.0, "std": 1.0}))
+    assert store.refresh() is True
+    new = store.current()
+    assert new.version != snap.version
+    assert new.stats["mean"] == 9.0
+    # snapshot lama tidak ikut berubah (swap, bukan mutasi)
+    assert snap.stats["mean"] == 7.0
+
+
+def test_touch_without_content_change_keeps_version(tmp_path):
+    store, paths = _store(tmp_path)
+    paths["stats"].write_text(json.dumps({"mean": 7.0, "std": 1.0}))
+    snap = store.current()
+
+    paths["stats"].write_text(json.dumps({"mean": 7.0, "std": 1.0}))
+    assert store.refresh() is False
+    assert store.current() is snap
+
+
+class _ScaledLag:
+    """Model quantile palsu: prediksi = factor x lag_1."""
+
+    def __init__(self, factor):
+        self.factor = factor
+
+    def predict(self, X):
+        return self.factor * X[:, 0]
+
+
+def test_quantile_models_drive_stock_levels(tmp_path):
+    from app.services import optimizer
+    from app.services.inference import quantile_arrays
+
+    store, paths = _store(tmp_path)
+    weeks = pd.DataFrame({"year": 2024, "week": np.arange(1, 11)})
+    feats = pd.concat([weeks.assign(store_id="S001", product_id=p, units_sold=u) for p, u in (("P001", 10.0), ("P002", 20.0))])
+    feats["lag_1"] = feats["units_sold"]
+    feats.to_parquet(paths["features"])
+    pd.DataFrame({
+        "store_id": ["S001", "S001", "S009"], "product_id": ["P001", "P002", "P001"],
+        "on_hand": [0.0, 0.0, 0.0], "on_order": [0.0, 0.0, 0.0], "demand_std": [1.0, 1.0, 1.0],
+    }).to_parquet(paths["inventory"])
+    pd.DataFrame({"store_id": ["S001", "S001", "S009"], "product_id": ["P001", "P002", "P001"],
+                  "forecast_next": [10.0, 20.0, 5.0]}).to_parquet(paths["forecast_baseline"])
+    # model P95 (1.2x) di bawah P90 (1.4x) -> quantile bersilangan diurutkan ulang per baris
+    joblib.dump({"quantiles": [0.5, 0.9, 0.95], "models": [_ScaledLag(1.0), _ScaledLag(1.4), _ScaledLag(1.2)],
+                 "feature_cols": ["lag_1"]}, paths["quantiles"])
+
+    art = store.current()
+    qs, values = quantile_arrays([("S001", "P002"), ("S404", "P001")], art)
+    np.testing.assert_allclose(qs, [0.5, 0.9, 0.95])
+    np.testing.assert_allclose(values[0], [20.0, 24.0, 28.0])
+    assert np.isnan(values[1]).all()
+
+    df = optimizer._replenishment_inputs(art)
+    levels = optimizer._stock_levels(df, [0.7, 0.99])
+    # 0.7 di antara P50 (10) dan P90 (12) -> 11; S009 tanpa riwayat -> forecast + z * std
+    np.testing.assert_allclose(levels[0, :2], [11.0, 22.0])
+    assert abs(levels[0, 2] - (5.0 + 0.5244)) < 1e-3
+    # di luar rentang quantile -> forecast + z * std
+    np.testing.assert_allclose(levels[1, :2], [10.0 + 2.3263, 20.0 + 2.3263], atol=1e-3)
+
+
+def test_partitioned_features_reload_on_new_partition(tmp_path):
+    import os
+
+    store, paths = _store(tmp_path)
+    part = pd.DataFrame({"store_id": ["S001"], "product_id": ["P001"], "year": [2024], "week": [1],
+                         "units_sold": [3.0], "lag_1": [2.0]})
+    paths["features"].mkdir()
+    part.to_parquet(paths["features"] / "part-20240101.parquet")
+    snap = store.current()
+    assert len(snap.features) == 1
+
+    # file sementara (awalan titik) diabaikan sampai di-rename
+    tmp = paths["features"] / ".part-20240108.parquet.tmp"
+    part.assign(week=2).to_parquet(tmp)
+    assert store.refresh() is False
+    os.replace(tmp, paths["features"] / "part-20240108.parquet")
+    assert store.refresh() is True
+    assert sorted(store.current().features["week"]) == [1, 2]
+
+    # touch partisi tanpa ubah konten -> versi tetap
+    os.utime(paths["features"] / "part-20240101.parquet")
+    assert store.refresh() is False
+
+
+def test_serving_window_keeps_seasonal_naive_without_model(tmp_path):
+    from app.services.inference import forecast_arrays
+    from src.common.io import write_feature_partitions
+
+    store, paths = _store(tmp_path)
+    dates = pd.date_range("2023-01-02", periods=70, freq="W-MON")
+    iso = dates.isocalendar()
+    feats = pd.DataFrame({
+        "store_id": "S001", "product_id": "P001",
+        "year": iso.year.to_numpy(dtype=np.int64), "week": iso.week.to_numpy(dtype=np.int64),
+        "units_sold": np.arange(70, dtype=float), "lag_1": np.r_[np.nan, np.arange(69, dtype=float)],
+    })
+    write_feature_partitions(feats, paths["features"])
+
+    art = store.current()
+    assert len(art.features) == 53
+    # tanpa model: seasonal naive = units_sold 52 minggu sebelum minggu terakhir
+    assert art.index.latest_lag_52[0] == 69.0 - 52
+    _, fc = forecast_arrays([{"store_id": "S001", "product_id": "P001"}], 3, artifacts=art, use_cache=False)
+    np.testing.assert_allclose(fc[0], [17.0, 17.0, 17.0])
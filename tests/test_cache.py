@@ -0,0 +1,79 @@
+from app.services.cache import ForecastCache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_ttl_and_version_invalidation():
+    clock = _Clock()
+    cache = ForecastCache(maxsize=2, ttl=10.0, clock=clock)
+    a, b, c = ("S1", "P1"), ("S1", "P2"), ("S1", "P3")
+
+    cache.put_many([a, b], 4, "v1", [[1.0] * 4, [2.0] * 4])
+    assert cache.get_many([a], 4, "v1") == [(1.0,) * 4]
+    # horizon lain = key lain
+    assert cache.get_many([a], 8, "v1") == [None]
+
+    # a baru dipakai -> b yang dievict
+    cache.put_many([c], 4, "v1", [[3.0] * 4])
+    assert cache.get_many([a, b, c], 4, "v1") == [(1.0,) * 4, None, (3.0,) * 4]
+    assert cache.evictions == 1
+
+    clock.now = 11.0
+    assert cache.get_many([a], 4, "v1") == [None]
+    assert cache.expirations == 1
+
+    cache.put_many([a], 4, "v1", [[1.0] * 4])
+    assert cache.get_many([a], 4, "v2") == [None]
+    # hot-swap: request in-flight dengan snapshot lama tetap kena hit, versi
+    # baru tidak mengosongkan cache
+    cache.put_many([a], 4, "v2", [[5.0] * 4])
+    assert cache.get_many([a], 4, "v1") == [(1.0,) * 4]
+    assert cache.get_many([a], 4, "v2") == [(5.0,) * 4]
+    # entry basi keluar lewat LRU begitu versi lama tidak lagi dipakai
+    cache.put_many([b], 4, "v2", [[6.0] * 4])
+    assert cache.get_many([a, b], 4, "v1") == [None, None]
+    assert cache.get_many([a, b], 4, "v2") == [(5.0,) * 4, (6.0,) * 4]
+
+
+def test_forecast_batch_serves_hits_and_only_predicts_misses():
+    import numpy as np
+    import pandas as pd
+
+    from app.services.artifacts import Artifacts
+    from app.services.inference import forecast_batch
+    from app.services.cache import get_forecast_cache
+    from src.forecasting.index import PairIndex
+
+    df = pd.DataFrame({
+        "store_id": ["S1"] * 3 + ["S2"] * 3,
+        "product_id": ["P1"] * 6,
+        "year": [2024] * 6,
+        "week": [1, 2, 3] * 2,
+        "units_sold": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+        "price": [10.0] * 6,
+    })
+
+    class Model:
+        rows = 0
+
+        def predict(self, X):
+            Model.rows += len(X)
+            return np.full(len(X), 2.0)
+
+    art = Artifacts(version="cache-test", model=Model(), stats={"mean": 5.0, "std": 2.0}, features=df,
+                    index=PairIndex(df), inventory=None, forecast_baseline=None, loaded_at=0.0)
+    cache = get_forecast_cache()
+    hits0 = cache.hits
+
+    forecast_batch([{"store_id": "S1", "product_id": "P1"}], 2, artifacts=art)
+    assert Model.rows == 2  # 1 pasangan x 2 langkah
+    out = forecast_batch([{"store_id": "S1", "product_id": "P1"}, {"store_id": "S2", "product_id": "P1"}], 2, artifacts=art)
+    assert Model.rows == 4  # hanya S2 yang dihitung
+    assert cache.hits == hits0 + 1
+    assert out[0]["forecast"] == [2.0, 2.0]
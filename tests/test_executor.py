@@ -0,0 +1,56 @@
+import asyncio
+import threading
+
+import pytest
+
+from app.services.executor import PoolSaturated, WorkerPool
+
+
+def test_pool_rejects_when_saturated():
+    pool = WorkerPool(mode="thread", workers=1, max_pending=1)
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.ensure_future(pool.run(release.wait, 5))
+        await asyncio.sleep(0.05)
+        assert pool.inflight == 1
+        with pytest.raises(PoolSaturated):
+            await pool.run(sum, [1, 2])
+        release.set()
+        assert await running is True
+        # slot kembali tersedia
+        assert await pool.run(sum, [1, 2]) == 3
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        pool.shutdown()
+    assert pool.rejected == 1
+
+
+def test_cancelled_request_keeps_slot_until_job_finishes():
+    pool = WorkerPool(mode="thread", workers=1, max_pending=1)
+    release = threading.Event()
+
+    async def scenario():
+        waiting = asyncio.ensure_future(pool.run(release.wait, 5))
+        await asyncio.sleep(0.05)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        # job masih jalan di worker: slot tetap terpakai
+        assert pool.inflight == 1
+        with pytest.raises(PoolSaturated):
+            await pool.run(sum, [1, 2])
+        release.set()
+        for _ in range(100):
+            if pool.inflight == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert pool.inflight == 0
+        assert await pool.run(sum, [1, 2]) == 3
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        pool.shutdown()
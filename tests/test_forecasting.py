@@ -0,0 +1,191 @@
+import numpy as np
+import pandas as pd
+
+from src.forecasting.index import PairIndex
+
+
+def _weekly_frame(n_weeks=60):
+    rows = []
+    for sid, pid, base in [("S002", "P001", 10), ("S001", "P002", 20), ("S001", "P001", 30)]:
+        for t in range(n_weeks):
+            rows.append({
+                "store_id": sid,
+                "product_id": pid,
+                "year": 2023 + t // 52,
+                "week": t % 52 + 1,
+                "units_sold": base + t,
+            })
+    # acak urutan supaya index benar-benar harus sort sendiri
+    return pd.DataFrame(rows).sample(frac=1.0, random_state=0).reset_index(drop=True)
+
+
+def test_pair_index_latest_and_history():
+    df = _weekly_frame()
+    idx = PairIndex(df)
+
+    assert len(idx) == 3
+    pos = idx.locate([("S001", "P001"), ("S002", "P001"), ("S999", "P001")])
+    assert pos[2] == -1
+
+    # baris terakhir = minggu ke-60 (t=59)
+    assert idx.latest_units[pos[0]] == 30 + 59
+    assert idx.latest_units[pos[1]] == 10 + 59
+    # lag_52 diturunkan dari histori: units_sold 52 minggu sebelum baris terakhir
+    assert idx.latest_lag_52[pos[0]] == 30 + 59 - 52
+
+    hist = idx.history(pos[0])
+    assert len(hist) == 60
+    assert np.all(np.diff(hist["year"].to_numpy() * 100 + hist["week"].to_numpy()) > 0)
+
+
+class _CountingModel:
+    def __init__(self):
+        self.calls = 0
+
+    def predict(self, X):
+        self.calls += 1
+        return X[:, 0] * 0.0 + 7.0
+
+
+def test_forecast_batch_single_predict_per_step():
+    from app.services.artifacts import Artifacts
+    from app.services.inference import forecast_batch
+
+    df = _weekly_frame()
+    df["lag_1"] = df["units_sold"]
+    idx = PairIndex(df)
+    model = _CountingModel()
+    art = Artifacts(version="t", model=model, stats={"mean": 5.0, "std": 2.0}, features=df,
+                    index=idx, inventory=None, forecast_baseline=None, loaded_at=0.0)
+
+    pairs = [{"store_id": s, "product_id": p} for s, p in idx.keys] + [{"store_id": "S999", "product_id": "P001"}]
+    out = forecast_batch(pairs, 4, artifacts=art, use_cache=False)
+
+    assert model.calls == 4
+    assert [r["store_id"] for r in out] == [p["store_id"] for p in pairs]
+    assert out[0]["forecast"] == [7.0] * 4
+    # pasangan tak dikenal -> global naive
+    assert out[-1]["forecast"] == [5.0, 5.0, 6.0, 6.0]
+
+
+class _Lag1PlusOne:
+    """Model dummy: y_hat = lag_1 + 1 (kolom pertama)."""
+
+    def predict(self, X):
+        return X[:, 0] + 1.0
+
+
+def test_recursive_forecaster_rolls_lags_forward():
+    from src.forecasting.recursive import RecursiveForecaster
+
+    cols = ["lag_1", "lag_2", "rollmean_4", "is_holiday", "price"]
+    engine = RecursiveForecaster(_Lag1PlusOne(), cols)
+    history = np.tile(np.arange(52, dtype=float), (2, 1))  # terbaru = 51
+    static = np.zeros((2, len(cols)))
+    static[:, 4] = [9.0, 3.0]
+
+    out = engine.forecast(history, np.array([2023, 2023]), np.array([45, 45]), static, horizon=3)
+    np.testing.assert_allclose(out, [[52, 53, 54], [52, 53, 54]])
+
+
+def test_advance_weeks_handles_iso_year_boundary():
+    from src.forecasting.recursive import advance_weeks
+
+    y, w = advance_weeks(np.array([2023, 2026, 2026]), np.array([52, 52, 53]), 1)
+    assert list(zip(y, w)) == [(2024, 1), (2026, 53), (2027, 1)]
+
+
+def test_micro_batcher_coalesces_concurrent_requests():
+    import asyncio
+
+    from app.services.artifacts import Artifacts
+    from app.services.inference import MicroBatcher
+
+    calls = []
+
+    async def run(pairs, horizon, artifacts):
+        calls.append(len(pairs))
+        return [{"store_id": p["store_id"], "forecast": [0.0] * horizon} for p in pairs]
+
+    art = Artifacts(version="mb", model=None, stats={}, features=None, index=None,
+                    inventory=None, forecast_baseline=None, loaded_at=0.0)
+    batcher = MicroBatcher(run, max_wait_ms=20, max_pairs=5)
+
+    async def scenario():
+        reqs = [[{"store_id": f"S{i}{j}"} for j in range(i + 1)] for i in range(3)]  # 1 + 2 + 3 pasangan
+        outs = await asyncio.gather(*(batcher.submit(r, 4, art) for r in reqs))
+        return reqs, outs
+
+    reqs, outs = asyncio.run(scenario())
+    # 1 + 2 = 3 pasangan masih < 5; request ketiga membuat total 6 -> flush langsung
+    assert calls == [6]
+    for req, out in zip(reqs, outs):
+        assert [o["store_id"] for o in out] == [p["store_id"] for p in req]
+
+
+def test_lag_engine_matches_per_group_pandas_and_serving_path():
+    from src.forecasting.features import add_lag_features, recent_window_features
+
+    df = _weekly_frame(n_weeks=60)
+    df["units_sold"] = df["units_sold"].astype(float)
+    df.loc[df.index[7], "units_sold"] = np.nan
+    out = add_lag_features(df)
+
+    ref = df.sort_values(["store_id", "product_id", "year", "week"]).reset_index(drop=True)
+    grouped = ref.groupby(["store_id", "product_id"])["units_sold"]
+    for k in (1, 2, 4, 52):
+        np.testing.assert_array_equal(out[f"lag_{k}"], grouped.shift(k))
+    for w in (4, 8, 12):
+        expected = grouped.transform(lambda s: s.shift(1).rolling(w).mean())
+        np.testing.assert_allclose(out[f"rollmean_{w}"], expected, rtol=1e-12)
+    # baris pertama tiap pasangan tidak boleh mewarisi nilai pasangan sebelumnya
+    first = out.groupby(["store_id", "product_id"]).head(4)
+    assert first["rollmean_4"].isna().all()
+
+    # jalur serving: fitur minggu target dari riwayat terbaru-dulu == baris ETL
+    pair = out[(out["store_id"] == "S001") & (out["product_id"] == "P002")]
+    target = pair.iloc[-1]
+    recent = pair["units_sold"].to_numpy()[:-1][::-1][None, :]
+    feats = recent_window_features(recent)
+    for name, value in feats.items():
+        assert np.isclose(value[0], target[name], equal_nan=True)
+
+
+def test_incremental_feature_build_matches_full_rebuild():
+    from src.forecasting.features import (
+        baseline_forecast, extend_features, feature_frame, prepare_sales, trailing_state, training_rows,
+    )
+
+    rng = np.random.default_rng(3)
+    dates = pd.date_range("2023-01-02", periods=70, freq="W-MON")
+    sales = pd.DataFrame({
+        "date": np.tile(dates, 6),
+        "store_id": np.repeat(["S001", "S002"], 3 * len(dates)),
+        "product_id": np.tile(np.repeat(["P001", "P002", "P003"], len(dates)), 2),
+        "units_sold": rng.poisson(6.0, 6 * len(dates)),
+    })
+    # pasangan baru yang baru muncul di minggu terakhir
+    sales = pd.concat([sales, pd.DataFrame({"date": [dates[-1]], "store_id": ["S003"],
+                                            "product_id": ["P001"], "units_sold": [4]})])
+    cal = pd.DataFrame({"date": dates[:-2], "is_holiday": (dates[:-2].isocalendar().week >= 47).astype(int)})
+    products = pd.DataFrame({"product_id": ["P001", "P002", "P003"], "price": [10.0, 20.0, 30.0]})
+
+    full_frame = feature_frame(prepare_sales(sales, cal, products))
+    full = training_rows(full_frame)
+
+    cut = dates[-4]
+    base = feature_frame(prepare_sales(sales[sales["date"] <= cut], cal, products))
+    parts, state = [training_rows(base)], trailing_state(base)
+    for d in dates[-3:]:
+        # run ulang minggu yang sama tidak menambah baris
+        new = sales[(sales["date"] > cut) & (sales["date"] <= d)]
+        rows, state, frame = extend_features(state, new, cal, products)
+        parts.append(rows)
+    inc = pd.concat(parts, ignore_index=True)
+
+    keys = ["store_id", "product_id", "year", "week"]
+    pd.testing.assert_frame_equal(
+        inc.sort_values(keys).reset_index(drop=True), full.sort_values(keys).reset_index(drop=True)
+    )
+    pd.testing.assert_frame_equal(state, trailing_state(full_frame))
+    pd.testing.assert_frame_equal(baseline_forecast(frame), baseline_forecast(full_frame))
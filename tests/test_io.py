@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from src.common.io import feature_weeks, read_features, replace_dir, write_feature_partitions
+
+
+def _table():
+    weeks = [(2024, 51), (2024, 52), (2025, 1), (2025, 2)]
+    rows = [
+        {"store_id": s, "product_id": p, "year": y, "week": w, "units_sold": float(i), "lag_1": float(i) - 1}
+        for i, (y, w) in enumerate(weeks)
+        for s in ("S002", "S001")
+        for p in ("P002", "P001")
+    ]
+    return pd.DataFrame(rows)
+
+
+def test_partitioned_features_roundtrip_with_pushdown(tmp_path, monkeypatch):
+    import src.common.io as io
+
+    monkeypatch.setattr(io, "ROW_GROUP_ROWS", 2)
+    path = tmp_path / "weekly_features.parquet"
+    df = _table()
+    assert write_feature_partitions(df, path) == 4
+    assert (path / "year=2025" / "week=1" / "part-0.parquet").exists()
+
+    # minggu ISO urut kronologis lintas tahun, dibaca dari path partisi
+    assert feature_weeks(path).tolist() == [202451, 202452, 202501, 202502]
+
+    out = read_features(path)
+    assert list(out.columns) == list(df.columns)
+    assert out["year"].dtype == np.int64 and out["week"].dtype == np.int64
+    keys = ["store_id", "product_id", "year", "week"]
+    pd.testing.assert_frame_equal(out.sort_values(keys, ignore_index=True), df.sort_values(keys, ignore_index=True))
+
+    one = read_features(path, stores=["S001"], products=["P002"], columns=["week", "units_sold"])
+    assert list(one.columns) == ["week", "units_sold"] and len(one) == 4
+    assert sorted(read_features(path, last_weeks=2)["week"].unique()) == [1, 2]
+    window = read_features(path, start=202452, end=202501)
+    assert sorted(set(zip(window["year"], window["week"]))) == [(2024, 52), (2025, 1)]
+
+    # full rebuild menggantikan file tunggal format lama
+    legacy = tmp_path / "legacy.parquet"
+    df.to_parquet(legacy)
+    assert len(read_features(legacy, last_weeks=1)) == 4
+    replace_dir(path, legacy)
+    assert legacy.is_dir() and not path.exists()
+    assert len(read_features(legacy)) == len(df)
@@ -0,0 +1,312 @@
+import numpy as np
+
+from src.optimizer.multi_period import MultiPeriodProblem, build_lp, solve_multi_period
+
+
+def _single_pair(**kw):
+    base = dict(
+        demand=np.array([[5.0, 5.0, 5.0]]),
+        on_hand=np.array([0.0]),
+        unit_cost=np.array([1.0]),
+        holding_cost=np.array([0.1]),
+        shortage_cost=np.array([10.0]),
+        lead_time=np.array([1]),
+    )
+    base.update(kw)
+    return MultiPeriodProblem(**base)
+
+
+def test_multi_period_respects_lead_time():
+    res = solve_multi_period(_single_pair())
+    assert res.success
+    # periode 0 tidak bisa dilayani (lead time 1), order terakhir tidak berguna
+    np.testing.assert_allclose(res.orders, [[5.0, 5.0, 0.0]], atol=1e-6)
+    np.testing.assert_allclose(res.shortage, [[5.0, 0.0, 0.0]], atol=1e-6)
+    assert abs(res.objective - 60.0) < 1e-6
+
+
+def test_multi_period_budget_and_store_capacity():
+    res = solve_multi_period(_single_pair(budget=np.array([3.0, 100.0, 100.0])))
+    np.testing.assert_allclose(res.orders[0, 0], 3.0, atol=1e-6)
+    np.testing.assert_allclose(res.shortage[0, 1], 2.0, atol=1e-6)
+
+    # dua pasangan di satu store; stok awal besar, kapasitas inventory akhir dibatasi
+    prob = MultiPeriodProblem(
+        demand=np.array([[1.0, 1.0], [1.0, 1.0]]),
+        on_hand=np.array([3.0, 3.0]),
+        unit_cost=np.ones(2),
+        holding_cost=np.ones(2),
+        shortage_cost=np.full(2, 10.0),
+        lead_time=np.zeros(2, dtype=int),
+        store_codes=np.array([0, 0]),
+        store_capacity=np.array([[4.0, 2.0]]),
+    )
+    lp = build_lp(prob)
+    assert lp.A_eq.format == "csr" and lp.A_ub.shape == (2, 12)
+    res = solve_multi_period(prob)
+    assert res.success
+    assert res.inventory.sum(axis=0)[1] <= 2.0 + 1e-6
+
+
+def test_shelf_life_disposes_excess_on_hand():
+    # stok awal 20 jauh di atas cap shelf-life (5) + demand (5): tanpa disposal LP infeasible
+    prob = _single_pair(on_hand=np.array([20.0]), shelf_life=1)
+    res = solve_multi_period(prob)
+    assert res.success
+    np.testing.assert_allclose(res.disposal, [[10.0, 0.0, 0.0]], atol=1e-6)
+    np.testing.assert_allclose(res.inventory, [[5.0, 0.0, 0.0]], atol=1e-6)
+    np.testing.assert_allclose(res.shortage, 0.0, atol=1e-6)
+    assert res.n_vars == 4 * 3 and solve_multi_period(_single_pair()).disposal is None
+
+
+def test_greedy_allocation_matches_lp():
+    from scipy.optimize import linprog
+
+    from src.optimizer.allocation import greedy_allocate
+
+    rng = np.random.default_rng(7)
+    for weighted in (False, True):
+        n = 200
+        need = rng.uniform(0, 20, n)
+        cost = rng.uniform(10, 100, n)
+        prio = rng.uniform(1, 50, n) if weighted else None
+        w = np.ones(n) if prio is None else prio
+        for budget in (0.0, 0.3 * (need * cost).sum(), 2.0 * (need * cost).sum()):
+            x = greedy_allocate(need, cost, budget, priority=prio)
+            lp = linprog(-w, A_ub=cost[None, :], b_ub=[budget],
+                         bounds=np.column_stack([np.zeros(n), need]), method="highs")
+            assert lp.success
+            assert np.all(x >= -1e-9) and np.all(x <= need + 1e-9)
+            assert (x * cost).sum() <= budget + 1e-6
+            np.testing.assert_allclose(w @ x, -lp.fun, rtol=1e-9, atol=1e-6)
+
+
+def test_budget_frontier_matches_pointwise_greedy():
+    from src.optimizer.allocation import budget_frontier, greedy_allocate
+
+    rng = np.random.default_rng(3)
+    n = 120
+    need = rng.uniform(0, 10, (3, n))
+    cost = rng.uniform(1, 5, n)
+    budgets = np.array([0.0, 10.0, 250.0, 1e3, 1e6])
+
+    f = budget_frontier(need, cost, budgets)
+    for s in range(3):
+        for i, b in enumerate(budgets):
+            x = greedy_allocate(need[s], cost, b)
+            assert abs(x.sum() - f["covered_need"][s, i]) < 1e-6
+            assert abs((x * cost).sum() - f["order_cost"][s, i]) < 1e-6
+    np.testing.assert_allclose(f["shortage"][:, -1], 0.0, atol=1e-9)
+
+
+def test_decomposed_matches_monolithic_and_respects_budget():
+    from src.optimizer.decomposition import solve_decomposed
+
+    rng = np.random.default_rng(11)
+    n, T = 40, 4
+    demand = rng.uniform(2, 8, (n, T))
+    price = rng.uniform(1, 3, n)
+    prob = MultiPeriodProblem(
+        demand=demand,
+        on_hand=np.zeros(n),
+        unit_cost=price,
+        holding_cost=0.05 * price,
+        shortage_cost=3.0 * price,
+        lead_time=np.zeros(n, dtype=int),
+        store_codes=np.arange(n) % 4,
+        store_capacity=np.full((4, T), 1e6),
+    )
+    # tanpa budget yang mengikat, dekomposisi per store eksak dalam satu iterasi
+    res = solve_decomposed(prob, prob.store_codes, compare_monolithic=True)
+    assert res.iterations == 1
+    assert abs(res.gap_vs_monolithic) < 1e-6
+
+    prob.budget = np.full(T, 0.6 * float((demand * price[:, None]).sum(axis=0).mean()))
+    res = solve_decomposed(prob, prob.store_codes, max_iter=40, compare_monolithic=True)
+    spend = (res.orders * price[:, None]).sum(axis=0)
+    assert np.all(spend <= prob.budget + 1e-6)
+    assert res.dual_bound <= res.monolithic_objective + 1e-6 <= res.objective + 2e-6
+    assert res.gap_vs_monolithic < 0.02
+
+
+def test_incremental_allocator_tracks_greedy():
+    from src.optimizer.allocation import greedy_allocate
+    from src.optimizer.incremental import IncrementalAllocator
+
+    rng = np.random.default_rng(5)
+    n = 500
+    need = rng.uniform(0, 10, n)
+    cost = rng.uniform(1, 5, n)
+    budget = 0.5 * (need * cost).sum()
+    alloc = IncrementalAllocator(need, cost, budget)
+    for _ in range(10):
+        idx = rng.choice(n, 20, replace=False)
+        alloc.update(idx, rng.uniform(0, 10, 20))
+        np.testing.assert_allclose(alloc.x, greedy_allocate(alloc.need, cost, budget), atol=1e-8)
+    alloc.set_budget(0.1 * budget)
+    np.testing.assert_allclose(alloc.x, greedy_allocate(alloc.need, cost, 0.1 * budget), atol=1e-8)
+
+
+def test_warm_start_lp_matches_rebuilt_problem():
+    from dataclasses import replace
+
+    from src.optimizer.incremental import WarmStartLP
+
+    prob = _single_pair(demand=np.array([[5.0, 5.0, 5.0], [2.0, 2.0, 2.0]]), on_hand=np.array([0.0, 1.0]),
+                        unit_cost=np.ones(2), holding_cost=np.full(2, 0.1), shortage_cost=np.full(2, 10.0),
+                        lead_time=np.array([1, 0]))
+    warm = WarmStartLP(prob, use_highspy=False)
+    warm.solve()
+    warm.update_inventory(np.array([0]), on_hand=np.array([4.0]))
+    res = warm.solve()
+    cold = solve_multi_period(replace(prob, on_hand=np.array([4.0, 1.0])))
+    assert res.success
+    assert abs(res.objective - cold.objective) < 1e-6
+
+
+def test_warm_start_lp_highspy_tracks_cold_solves():
+    from dataclasses import replace
+
+    import pytest
+
+    pytest.importorskip("highspy")
+    from src.optimizer.incremental import WarmStartLP
+
+    rng = np.random.default_rng(4)
+    n, T = 30, 4
+    prob = MultiPeriodProblem(
+        demand=rng.uniform(0, 10, (n, T)), on_hand=rng.uniform(0, 20, n), unit_cost=rng.uniform(1, 5, n),
+        holding_cost=np.full(n, 0.2), shortage_cost=np.full(n, 20.0), lead_time=rng.integers(0, 2, n),
+        budget=np.full(T, 150.0),
+    )
+    warm = WarmStartLP(prob, use_highspy=True)
+    assert warm.use_highspy
+    warm.solve()
+    on_hand = prob.on_hand.copy()
+    receipts = np.zeros((n, T))
+    for _ in range(3):
+        # beberapa delta berturut-turut: model HiGHS yang sama, hanya row bounds diganti
+        idx = rng.choice(n, 5, replace=False)
+        on_hand[idx] = rng.uniform(0, 20, 5)
+        receipts[idx, 1] = rng.uniform(0, 5, 5)
+        warm.update_inventory(idx, on_hand=on_hand[idx], receipts=receipts[idx])
+        res = warm.solve()
+        cold = solve_multi_period(replace(prob, on_hand=on_hand.copy(), receipts=receipts.copy()))
+        assert res.message == "Optimal (warm start)"
+        assert abs(res.objective - cold.objective) < 1e-6 * max(1.0, abs(cold.objective))
+
+
+def test_lot_size_respects_pack_moq_budget_and_tracks_milp():
+    from src.optimizer.allocation import greedy_allocate
+    from src.optimizer.lot_sizing import lot_cost, lot_size, milp_lot_size
+
+    # round up, bukan floor: 7.2 unit dengan pack 6 -> 12
+    assert lot_size(np.array([7.2]), np.array([1.0]), case_pack=6).tolist() == [12]
+    # di bawah MOQ: naik ke MOQ (shortage lebih mahal dari excess default 0)
+    assert lot_size(np.array([3.0]), np.array([1.0]), case_pack=2, moq=9).tolist() == [10]
+
+    rng = np.random.default_rng(2)
+    n = 20
+    for _ in range(5):
+        need = rng.gamma(2.0, 5.0, n)
+        cost = rng.uniform(10, 40, n)
+        pack = rng.choice([1, 6, 12], n)
+        moq = pack * rng.choice([1, 2], n)
+        budget = 0.5 * float((need * cost).sum())
+        x = lot_size(greedy_allocate(need, cost, budget), cost, budget, pack, moq, need=need)
+        assert (x * cost).sum() <= budget + 1e-6
+        assert np.all(x % pack == 0) and np.all((x == 0) | (x >= moq))
+        xm = milp_lot_size(need, cost, budget, pack, moq)
+        ones = np.ones(n)
+        gap = lot_cost(x, need, ones, 0 * ones) - lot_cost(xm, need, ones, 0 * ones)
+        assert -1e-6 <= gap <= 0.05 * need.sum()
+
+
+def test_multi_echelon_flow_and_per_product_split():
+    from src.optimizer.multi_echelon import EchelonProblem, solve_multi_echelon
+
+    # satu DC tanpa stok, satu store: supplier lead 1 + transfer lead 1 -> periode 0-1 short
+    single = EchelonProblem(
+        demand=np.array([[4.0, 4.0, 4.0, 4.0]]), store_on_hand=np.zeros(1),
+        pair_product=np.zeros(1, dtype=int), pair_dc=np.zeros(1, dtype=int), dc_on_hand=np.zeros((1, 1)),
+        unit_cost=np.ones(1), dc_holding_cost=np.full(1, 0.1), store_holding_cost=np.full(1, 0.1),
+        shortage_cost=np.full(1, 10.0), transfer_cost=np.full(1, 0.5),
+        supplier_lead=np.array([1]), transfer_lead=np.array([1]),
+    )
+    res = solve_multi_echelon(single)
+    assert res.success
+    np.testing.assert_allclose(res.shortage, [[4.0, 4.0, 0.0, 0.0]], atol=1e-6)
+    np.testing.assert_allclose(res.supplier_orders[0, 0], [4.0, 4.0, 0.0, 0.0], atol=1e-6)
+    np.testing.assert_allclose(res.transfers, [[0.0, 4.0, 4.0, 0.0]], atol=1e-6)
+
+    rng = np.random.default_rng(4)
+    S, P, D, T = 12, 3, 2, 4
+    store = np.repeat(np.arange(S), P)
+    prob = EchelonProblem(
+        demand=rng.uniform(1, 6, (S * P, T)), store_on_hand=rng.uniform(0, 5, S * P),
+        pair_product=np.tile(np.arange(P), S), pair_dc=(store % D), dc_on_hand=rng.uniform(0, 20, (D, P)),
+        unit_cost=np.array([1.0, 2.0, 3.0]), dc_holding_cost=np.full(P, 0.05), store_holding_cost=np.full(P, 0.1),
+        shortage_cost=np.full(P, 8.0), transfer_cost=rng.uniform(0.1, 0.5, S * P),
+        supplier_lead=np.array([1, 2]), transfer_lead=(store % 2),
+    )
+    joint = solve_multi_echelon(prob, per_product=False)
+    split = solve_multi_echelon(prob)
+    assert joint.success and split.success
+    assert abs(joint.objective - split.objective) < 1e-6 * abs(joint.objective)
+
+
+def test_multi_echelon_safety_stock_is_held_once():
+    from dataclasses import replace
+
+    from src.optimizer.multi_echelon import EchelonProblem, solve_multi_echelon
+
+    # DC cukup stok, tanpa lead time: demand rata-rata 10/minggu + buffer 6 di akhir horizon
+    base = EchelonProblem(
+        demand=np.full((2, 4), 10.0), store_on_hand=np.array([0.0, 3.0]),
+        pair_product=np.array([0, 1]), pair_dc=np.zeros(2, dtype=int), dc_on_hand=np.full((1, 2), 500.0),
+        unit_cost=np.ones(2), dc_holding_cost=np.full(2, 0.01), store_holding_cost=np.full(2, 0.1),
+        shortage_cost=np.full(2, 10.0), transfer_cost=np.full(2, 0.5),
+        supplier_lead=np.array([0]), transfer_lead=np.array([0, 0]), safety_stock=np.array([6.0, 6.0]),
+    )
+    res = solve_multi_echelon(base)
+    assert res.success
+    # buffer dikirim sekali, bukan 4 x 6 unit
+    np.testing.assert_allclose(res.transfers.sum(axis=1), [40.0 + 6.0, 40.0 + 6.0 - 3.0], atol=1e-6)
+    np.testing.assert_allclose(res.store_inventory[:, -1], [6.0, 6.0], atol=1e-6)
+    np.testing.assert_allclose(res.shortage, 0.0, atol=1e-6)
+    # per produk == LP gabungan dengan blok safety stock
+    joint = solve_multi_echelon(base, per_product=False)
+    assert abs(joint.objective - res.objective) < 1e-6 * abs(res.objective)
+    # tanpa safety stock: tidak ada stok sisa di akhir horizon
+    bare = solve_multi_echelon(replace(base, safety_stock=None))
+    np.testing.assert_allclose(bare.store_inventory[:, -1], 0.0, atol=1e-6)
+
+
+def test_simulation_matches_hand_trace_and_is_reproducible():
+    from src.optimizer.simple_policy import FixedOrders, OrderUpToPolicy
+    from src.optimizer.simulation import simulate
+
+    # stok 5, demand 3/minggu, order 3 tiap minggu dengan lead 1:
+    # minggu 0 dilayani dari stok awal, stok akhir selalu 2
+    res = simulate(
+        FixedOrders(np.array([[3.0, 3.0, 3.0, 3.0], [0.0, 0.0, 0.0, 0.0]])),
+        on_hand=np.array([5.0, 4.0]), lead_time=np.array([1, 2]), horizon=4,
+        actuals=np.full((2, 4), 3.0), holding_cost=1.0, shortage_cost=10.0, order_cost=2.0,
+    )
+    np.testing.assert_allclose(res.pairs["fill_rate_mean"], [1.0, 4.0 / 12.0])
+    np.testing.assert_allclose(res.pairs["stockout_weeks_mean"], [0, 3])
+    # pasangan 0: holding 4 x 2 + 4 order x 2; pasangan 1: holding 1 + 8 lost x 10
+    np.testing.assert_allclose(res.pairs["total_cost_mean"], [16.0, 81.0])
+    assert res.scenarios["fill_rate"].iloc[0] == 16.0 / 24.0
+
+    # Monte Carlo: seed yang sama -> hasil identik
+    rng = np.random.default_rng(0)
+    n = 300
+    mean, lead = rng.gamma(2.0, 4.0, n), rng.integers(0, 3, n)
+    pol = OrderUpToPolicy.from_forecast(mean, 0.3 * mean, lead, 1.64, case_pack=np.full(n, 6.0))
+    kw = dict(demand_mean=mean, demand_std=0.3 * mean, scenarios=40, seed=3, chunk_pairs=128)
+    a = simulate(pol, pol.levels, lead, 20, **kw)
+    b = simulate(pol, pol.levels, lead, 20, **kw)
+    assert a.pairs.equals(b.pairs)
+    assert len(a.scenarios) == 40
+    assert 0.9 < a.summary()["fill_rate_mean"] <= 1.0
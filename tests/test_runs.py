@@ -0,0 +1,39 @@
+import pandas as pd
+import pytest
+
+from app.services.runs import InvalidCursor, RunStore, page
+
+
+def _plan(n=250):
+    return pd.DataFrame({
+        "store_id": [f"S{i % 5:03d}" for i in range(n)],
+        "product_id": [f"P{i:03d}" for i in range(n)],
+        "order_qty": range(n),
+    })
+
+
+def test_page_cursor_and_filters():
+    df = _plan()
+    rows, total, nxt = page(df, limit=100)
+    assert total == 250 and len(rows) == 100 and nxt == "100"
+    rows, _, nxt = page(df, cursor="200", limit=100)
+    assert len(rows) == 50 and nxt is None
+
+    rows, total, nxt = page(df, store_id="S001", limit=30)
+    assert total == 50 and set(rows["store_id"]) == {"S001"} and nxt == "30"
+    rows, total, _ = page(df, store_id="S001", product_id="P006")
+    assert total == 1 and rows["order_qty"].iloc[0] == 6
+    with pytest.raises(InvalidCursor):
+        page(df, cursor="abc")
+
+
+def test_run_store_reads_back_from_parquet(tmp_path):
+    store = RunStore(directory=tmp_path, max_in_memory=1)
+    first = store.save(_plan(), {"model_version": "abc", "capacity": 10.0})
+    store.persist(first)
+    store.save(_plan(10), {"model_version": "abc"})  # menggeser run pertama dari memori
+
+    run = store.get(first.run_id)
+    assert run is not None and len(run.frame) == 250
+    assert run.meta["model_version"] == "abc" and run.meta["capacity"] == "10.0"
+    assert store.get("doesnotexist") is None